@@ -0,0 +1,29 @@
+# accounts/authentication.py
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .tokens import InvalidToken, authenticate_access
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    `Authorization: Bearer <access token>` (accounts/tokens.py), checked
+    without a database query once the user is cached. Requests without a
+    bearer token are left to the other authentication classes.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        try:
+            token = auth[1].decode()
+            return authenticate_access(token), token
+        except (InvalidToken, UnicodeError) as e:
+            raise AuthenticationFailed(str(e))
+
+    def authenticate_header(self, request):
+        return self.keyword
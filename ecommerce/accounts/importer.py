@@ -0,0 +1,206 @@
+# accounts/importer.py
+"""
+Streaming user import behind `manage.py import_users`.
+
+    records  -> normalize + hash passwords (in a process pool) -> insert users and profiles
+    (lazy)      (CPU-bound, no database)                          (bulk_create, one transaction per batch)
+
+Password hashing is what makes one-by-one registration slow: PBKDF2 is
+meant to cost tens of milliseconds of CPU per password. Here it runs in
+worker processes, next to row validation, while the parent inserts the
+previous batches. Rows may instead carry a `password_hash` already in
+Django's "<algorithm>$..." format (a legacy hash wrapped by a hasher listed
+in PASSWORD_HASHERS); it is stored as is, and check_password() upgrades it
+to the preferred hasher the first time the user logs in. Rows with neither
+get an unusable password.
+
+Users and their profiles are inserted with bulk_create, so no per-row
+signal runs. A row whose email or username is taken, in the database or
+earlier in the input, is reported and skipped.
+
+As in products/importer.py, model imports happen inside functions:
+normalize_batch() runs in worker processes.
+"""
+import json
+import time
+from collections import deque
+
+from products.importer import RowError, _boolean, _text, batched
+
+PROFILE_FIELDS = ("bio", "favorite_category")
+
+
+def init_worker():
+    """Pool initializer: spawned workers start without Django set up."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+# --- normalizing (runs in worker processes) ---
+
+def normalize(record, hasher="default"):
+    """Validate one parsed record and hash its password."""
+    from django.contrib.auth.base_user import BaseUserManager
+    from django.contrib.auth.hashers import identify_hasher, make_password
+    from django.contrib.auth.validators import UnicodeUsernameValidator
+    from django.core.exceptions import ValidationError
+    from django.core.validators import validate_email
+
+    if not isinstance(record, dict):
+        raise RowError("Expected an object.")
+    email = BaseUserManager.normalize_email(_text(record, "email"))
+    if not email:
+        raise RowError("email: This field is required.")
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise RowError(f"email: '{email}' is not a valid email address.")
+    username = _text(record, "username") or email
+    try:
+        UnicodeUsernameValidator()(username)
+    except ValidationError:
+        raise RowError(f"username: '{username}' is not a valid username.")
+    if len(email) > 254 or len(username) > 150:
+        raise RowError("email or username is too long.")
+
+    encoded, hashed = _text(record, "password_hash"), False
+    if encoded:
+        try:
+            identify_hasher(encoded)
+        except ValueError:
+            raise RowError("password_hash: Unknown hashing algorithm; add its hasher to PASSWORD_HASHERS.")
+    elif _text(record, "password"):
+        encoded, hashed = make_password(record["password"], hasher=hasher), True
+    else:
+        encoded = make_password(None)
+    return {
+        "email": email,
+        "username": username,
+        "first_name": _text(record, "first_name")[:150],
+        "last_name": _text(record, "last_name")[:150],
+        "is_active": _boolean(record.get("is_active"), True),
+        "password": encoded,
+        "hashed": hashed,
+        "profile": {field: _text(record, field) for field in PROFILE_FIELDS},
+    }
+
+
+def normalize_batch(batch, hasher="default"):
+    """[(line, raw)] -> [(line, values or None, error or None)]. Worker entry point."""
+    results = []
+    for line, raw in batch:
+        try:
+            if isinstance(raw, str):
+                try:
+                    raw = json.loads(raw)
+                except ValueError as exc:
+                    raise RowError(f"Invalid JSON: {exc}")
+            results.append((line, normalize(raw, hasher), None))
+        except RowError as exc:
+            results.append((line, None, str(exc)))
+    return results
+
+
+# --- writing ---
+
+class UserImporter:
+    def __init__(self, batch_size=1000, workers=0, hasher="default", max_errors=20):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.hasher = hasher
+        self.max_errors = max_errors
+        self.rows = 0
+        self.written = 0
+        self.hashed = 0
+        self.failed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def run(self, records):
+        start = time.perf_counter()
+        batches = batched(records, self.batch_size)
+        if self.workers:
+            from multiprocessing import Pool
+
+            with Pool(self.workers, initializer=init_worker) as pool:
+                for batch in self._bounded(pool, batches):
+                    self.write(batch)
+        else:
+            for batch in batches:
+                self.write(normalize_batch(batch, self.hasher))
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def _bounded(self, pool, batches):
+        # a couple of batches per worker in flight: workers stay busy hashing
+        # while this process inserts, and memory stays flat
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(normalize_batch, (batch, self.hasher)))
+            if len(pending) >= self.workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def _error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def write(self, batch):
+        from django.contrib.auth import get_user_model
+        from django.db import reset_queries, transaction
+        from django.db.models import Q
+        from .models import Profile
+
+        User = get_user_model()
+        reset_queries()
+        self.rows += len(batch)
+        valid = [(line, values) for line, values, error in batch if error is None]
+        for line, values, error in batch:
+            if error is not None:
+                self._error(line, error)
+        emails = {values["email"] for _, values in valid}
+        usernames = {values["username"] for _, values in valid}
+        taken_emails, taken_usernames = set(), set()
+        if valid:
+            for email, username in User._default_manager.filter(
+                Q(email__in=emails) | Q(username__in=usernames)
+            ).values_list("email", "username"):
+                taken_emails.add(email)
+                taken_usernames.add(username)
+
+        users, profiles, hashed = [], [], 0
+        for line, values in valid:
+            if values["email"] in taken_emails:
+                self._error(line, f"email: A user with email {values['email']} already exists.")
+                continue
+            if values["username"] in taken_usernames:
+                self._error(line, f"username: A user with username {values['username']} already exists.")
+                continue
+            taken_emails.add(values["email"])
+            taken_usernames.add(values["username"])
+            hashed += values.pop("hashed")
+            profiles.append(values.pop("profile"))
+            users.append(User(**values))
+
+        with transaction.atomic():
+            User._default_manager.bulk_create(users)
+            if users and users[0].pk is None:
+                # backends that can't return ids from a bulk insert
+                ids = dict(User._default_manager.filter(email__in=[user.email for user in users])
+                           .values_list("email", "pk"))
+                for user in users:
+                    user.pk = ids[user.email]
+            Profile.objects.bulk_create([
+                Profile(user_id=user.pk, **profile) for user, profile in zip(users, profiles)
+            ])
+        self.written += len(users)
+        self.hashed += hashed
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
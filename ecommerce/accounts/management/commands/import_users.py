@@ -0,0 +1,68 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importer import UserImporter
+from products.importer import read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream user accounts from a CSV or NDJSON file into the database, with their profiles. "
+        "Columns/keys: email, username, first_name, last_name, is_active, bio, favorite_category and "
+        "either password (plain text, hashed here) or password_hash (an existing Django-format hash)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=("auto", "csv", "ndjson"), default="auto",
+                            help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction (default: 1000).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Validate rows and hash passwords in this many worker processes; "
+                                 "0 runs inline (default: one per CPU).")
+        parser.add_argument("--hasher", default="default",
+                            help="Algorithm for plain-text passwords, from PASSWORD_HASHERS "
+                                 "(default: the first one).")
+        parser.add_argument("--max-errors", type=int, default=20, help="Row errors to print (default: 20).")
+
+    def handle(self, *args, **options):
+        from django.contrib.auth.hashers import get_hasher
+
+        path, fmt = options["path"], options["format"]
+        if fmt == "auto":
+            extension = os.path.splitext(path)[1].lower()
+            if extension == ".csv":
+                fmt = "csv"
+            elif extension in (".ndjson", ".jsonl"):
+                fmt = "ndjson"
+            else:
+                raise CommandError("Can't tell the format from the file name; pass --format.")
+        if options["batch_size"] < 1 or options["workers"] < 0:
+            raise CommandError("--batch-size must be positive and --workers can't be negative.")
+        try:
+            get_hasher(options["hasher"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            hasher=options["hasher"],
+            max_errors=options["max_errors"],
+        )
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            importer.run(read_records(stream, fmt))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for line, message in importer.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.written} of {importer.rows} users ({importer.failed} failed, "
+            f"{importer.hashed} passwords hashed) in {importer.seconds:.1f}s: "
+            f"{importer.rows_per_second:,.0f} users/s with {options['workers'] or 'no'} workers."
+        ))
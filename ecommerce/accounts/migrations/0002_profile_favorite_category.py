@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+def merge_product_profiles(apps, schema_editor):
+    Profile = apps.get_model('accounts', 'Profile')
+    UserProfile = apps.get_model('products', 'UserProfile')
+    for user_id, favorite_category in UserProfile.objects.values_list('user_id', 'favorite_category').iterator():
+        Profile.objects.update_or_create(user_id=user_id, defaults={'favorite_category': favorite_category})
+
+
+def split_product_profiles(apps, schema_editor):
+    Profile = apps.get_model('accounts', 'Profile')
+    UserProfile = apps.get_model('products', 'UserProfile')
+    UserProfile.objects.bulk_create([
+        UserProfile(user_id=user_id, favorite_category=favorite_category)
+        for user_id, favorite_category in Profile.objects.exclude(favorite_category='').values_list(
+            'user_id', 'favorite_category'
+        )
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('products', '0009_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='favorite_category',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(merge_product_profiles, split_product_profiles),
+    ]
@@ -1,11 +1,35 @@
 # app: accounts/models.py
+from datetime import timedelta
+
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import models
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from .tokens import invalidate_user
+
+
+class ProfileManager(models.Manager):
+    def for_user(self, user):
+        """
+        The user's profile, created on first access. Reads the one cached on
+        the user when it was loaded with select_related("account_profile").
+        """
+        try:
+            return user.account_profile
+        except self.model.DoesNotExist:
+            profile, _ = self.get_or_create(user=user)
+            user.account_profile = profile
+            return profile
+
 
 class Profile(models.Model):
+    """
+    The one profile of a user. Registration creates it with the user; users
+    created any other way get it on first access (Profile.objects.for_user),
+    so saving or logging in a user never touches this table.
+    """
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -13,12 +37,27 @@ class Profile(models.Model):
     )
     bio = models.TextField(blank=True)
     avatar_url = models.URLField(blank=True)
+    favorite_category = models.CharField(max_length=100, blank=True)
+
+    objects = ProfileManager()
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.create(user=instance)
-    else:
-        instance.profile.save()
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # password changes and deactivation must reach tokens resolved from the cache
+    invalidate_user(instance.pk)
+
 
-settings.AUTH_USER_MODEL
\ No newline at end of file
+def update_last_login(sender, user, **kwargs):
+    """
+    Stands in for django.contrib.auth's receiver (see AccountsConfig.ready):
+    writes last_login at most once per SESSION_REFRESH_INTERVAL seconds, with
+    an UPDATE of that column alone rather than a full save.
+    """
+    now = timezone.now()
+    interval = timedelta(seconds=getattr(settings, "SESSION_REFRESH_INTERVAL", 5 * 60))
+    if user.last_login is not None and now - user.last_login < interval:
+        return
+    get_user_model()._default_manager.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
@@ -1,21 +1,27 @@
 # accounts/serializers.py
-from django.contrib.auth import authenticate
-from django.contrib.auth.models import User
+from django.contrib.auth import authenticate, get_user_model
+from django.db import transaction
 from rest_framework import serializers
 from .models import Profile
 
+User = get_user_model()
+
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
-        fields = ["bio", "avatar_url"]
+        fields = ["bio", "avatar_url", "favorite_category"]
 
 class UserSerializer(serializers.ModelSerializer):
-    profile = ProfileSerializer(read_only=True)
+    """Load users with select_related("account_profile") to serialize them in one query."""
+    profile = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name", "profile"]
 
+    def get_profile(self, user):
+        return ProfileSerializer(Profile.objects.for_user(user)).data
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     password2 = serializers.CharField(write_only=True, min_length=8)
@@ -34,8 +40,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         password = validated_data.pop("password")
         user = User(**validated_data)
         user.set_password(password)
-        user.save()
-        # Profile will be created by the post_save signal
+        with transaction.atomic():
+            user.save()
+            user.account_profile = Profile.objects.create(user=user)
         return user
 
 class LoginSerializer(serializers.Serializer):
@@ -48,3 +55,6 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid credentials")
         data["user"] = user
         return data
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
@@ -1,9 +1,15 @@
 # accounts/tests/test_auth.py
 from django.urls import reverse
 from rest_framework.test import APITestCase
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from ecommerce.throttling import reset_limits
+
+User = get_user_model()
 
 class AuthTests(APITestCase):
+    def setUp(self):
+        reset_limits()
+
     def test_register_and_auto_login(self):
         url = reverse("register")
         data = {
@@ -21,9 +27,10 @@ class AuthTests(APITestCase):
         self.assertIn("bio", r.data)
 
     def test_login_logout(self):
-        User.objects.create_user(username="bob", password="pass12345")
+        User.objects.create_user(username="bob", email="bob@test.com", password="pass12345")
         login_url = reverse("login")
-        resp = self.client.post(login_url, {"username": "bob", "password": "pass12345"}, format="json")
+        # USERNAME_FIELD is email
+        resp = self.client.post(login_url, {"username": "bob@test.com", "password": "pass12345"}, format="json")
         self.assertEqual(resp.status_code, 200)
         # Access protected
         r = self.client.get(reverse("profile"))
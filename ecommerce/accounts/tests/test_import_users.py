@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from accounts.models import Profile
+from ecommerce.throttling import reset_limits
+
+User = get_user_model()
+MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+
+
+@override_settings(PASSWORD_HASHERS=[MD5])
+class ImportUsersTestCase(TestCase):
+    def setUp(self):
+        reset_limits()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_users', path, '--workers', '0', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_creates_users_and_profiles(self):
+        path = self.write('users.csv', (
+            'email,username,first_name,password,is_active,favorite_category\n'
+            'amy@Example.COM,amy,Amy,secret-1,true,Books\n'
+            'bob@example.com,,,,false,\n'
+        ))
+        with self.assertNumQueries(5):   # lookup, savepoint, users, profiles, release
+            out, _ = self.run_import(path)
+        self.assertIn('Imported 2 of 2 users (0 failed, 1 passwords hashed)', out)
+        self.assertIn('users/s', out)
+        amy = User.objects.get(email='amy@example.com')
+        self.assertTrue(amy.check_password('secret-1'))
+        self.assertEqual(amy.account_profile.favorite_category, 'Books')
+        bob = User.objects.get(username='bob@example.com')
+        self.assertFalse(bob.is_active)
+        self.assertFalse(bob.has_usable_password())
+        self.assertEqual(Profile.objects.count(), 2)
+
+    def test_duplicates_and_bad_rows_are_skipped(self):
+        User.objects.create_user(username='taken', email='taken@example.com', password='x')
+        path = self.write('users.ndjson', '\n'.join(json.dumps(row) for row in [
+            {'email': 'taken@example.com'},
+            {'email': 'new@example.com', 'username': 'taken'},
+            {'email': 'dup@example.com'},
+            {'email': 'dup@example.com'},
+            {'email': 'not-an-email'},
+            {'email': 'x@example.com', 'password_hash': 'legacy$abc'},
+        ]) + '\n[1]\n')
+        out, err = self.run_import(path)
+        self.assertIn('Imported 1 of 7 users (6 failed', out)
+        self.assertIn('line 1: email: A user with email taken@example.com already exists.', err)
+        self.assertIn('line 2: username:', err)
+        self.assertIn('line 4: email:', err)
+        self.assertIn('line 6: password_hash: Unknown hashing algorithm', err)
+        self.assertIn('line 7: Expected an object.', err)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_worker_pool_matches_inline(self):
+        rows = '\n'.join(json.dumps({'email': f'user{i}@example.com', 'password': f'pw{i}'}) for i in range(30))
+        path = self.write('users.ndjson', rows)
+        out, _ = self.run_import(path, '--workers', '2', '--batch-size', '7')
+        self.assertIn('Imported 30 of 30 users (0 failed, 30 passwords hashed)', out)
+        self.assertTrue(User.objects.get(email='user29@example.com').check_password('pw29'))
+        self.assertEqual(Profile.objects.count(), 30)
+
+    @override_settings(PASSWORD_HASHERS=[PBKDF2, MD5])
+    def test_legacy_hashes_are_upgraded_on_login(self):
+        path = self.write('users.csv', f'email,password_hash\nold@example.com,{make_password("pw", hasher="md5")}\n')
+        out, _ = self.run_import(path)
+        self.assertIn('0 passwords hashed', out)
+        response = self.client.post(reverse('login'), {'username': 'old@example.com', 'password': 'pw'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(email='old@example.com').password.startswith('pbkdf2_sha256$'))
+
+    def test_bad_options(self):
+        path = self.write('users.txt', '')
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+        with self.assertRaises(CommandError):
+            self.run_import(self.write('users.csv', ''), '--hasher', 'nope')
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from accounts.models import Profile
+from accounts.serializers import UserSerializer
+from ecommerce.throttling import reset_limits
+
+User = get_user_model()
+
+
+class ProfileTestCase(APITestCase):
+    def setUp(self):
+        reset_limits()
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+
+    def profile_queries(self, queries):
+        return [q['sql'] for q in queries if 'accounts_profile' in q['sql']]
+
+    def test_saves_and_logins_leave_the_profile_alone(self):
+        with self.assertNumQueries(1):
+            self.user.first_name = 'Bob'
+            self.user.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'username': 'bob@example.com', 'password': 'pass12345'},
+                                        format='json')
+        self.assertEqual(response.status_code, 200)
+        # the response reads (and here first creates) the profile; nothing is updated
+        self.assertFalse([sql for sql in self.profile_queries(queries) if sql.startswith('UPDATE')])
+        self.assertEqual(response.data['profile']['bio'], '')
+
+    def test_registration_creates_the_profile(self):
+        data = {'username': 'amy', 'email': 'amy@example.com', 'password': 'strongpassword1',
+                'password2': 'strongpassword1'}
+        response = self.client.post(reverse('register'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Profile.objects.filter(user__email='amy@example.com').exists())
+        self.assertEqual(response.data['profile']['favorite_category'], '')
+
+    def test_profile_is_created_on_first_access(self):
+        self.assertFalse(Profile.objects.exists())
+        self.client.force_authenticate(self.user)
+        response = self.client.put(reverse('profile'), {'bio': 'hello', 'favorite_category': 'Phones'},
+                                   format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['favorite_category'], 'Phones')
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('profile')).data['bio'], 'hello')
+
+    def test_user_and_profile_in_one_query(self):
+        Profile.objects.create(user=self.user, bio='hi')
+        with self.assertNumQueries(1):
+            user = User.objects.select_related('account_profile').get(pk=self.user.pk)
+            self.assertEqual(UserSerializer(user).data['profile']['bio'], 'hi')
+
+    def test_login_and_profile_read_join_the_profile(self):
+        Profile.objects.create(user=self.user, bio='hi')
+        # the user and profile, the new session (exists check and insert), last_login, the session's login data
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('login'), {'username': 'bob@example.com', 'password': 'pass12345'},
+                                        format='json')
+        self.assertEqual(response.data['profile']['bio'], 'hi')
+        # the session, then the user and profile
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(reverse('profile')).data['bio'], 'hi')
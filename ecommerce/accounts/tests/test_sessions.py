@@ -0,0 +1,142 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from ecommerce.sessions import SessionStore, writer
+from ecommerce.throttling import reset_limits
+
+User = get_user_model()
+
+
+def session_queries(queries):
+    return [q['sql'] for q in queries if 'django_session' in q['sql']]
+
+
+@override_settings(SESSION_ENGINE='ecommerce.sessions', SESSION_WRITE_BEHIND_INTERVAL=3600)
+class CachedSessionTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_limits()
+        writer.flush()
+        # never leave rows queued for a database that won't outlive the test
+        self.addCleanup(writer.flush)
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'username': 'bob@example.com', 'password': 'pass12345'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_sessions_are_read_from_the_cache_and_written_behind(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.login()
+        self.assertEqual(session_queries(queries), [])
+        self.assertEqual(len(writer), 1)
+        self.assertEqual(writer.flush(), 1)
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertEqual(Session.objects.get(session_key=key).get_decoded()['_auth_user_id'], str(self.user.pk))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('order-list')).status_code, 200)
+        self.assertEqual(session_queries(queries), [])
+        self.assertEqual(len(writer), 0)
+
+    def test_cache_misses_fall_back_to_the_database(self):
+        self.login()
+        writer.flush()
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('order-list')).status_code, 200)
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True, SESSION_REFRESH_INTERVAL=60)
+    def test_unchanged_sessions_are_refreshed_once_per_interval(self):
+        self.login()
+        writer.flush()
+        for _ in range(3):
+            self.client.get(reverse('order-list'))
+        self.assertEqual(len(writer), 0)
+        later = mock.patch('ecommerce.sessions.time.time', return_value=timezone.now().timestamp() + 61)
+        with later:
+            self.client.get(reverse('order-list'))
+            self.assertEqual(len(writer), 1)
+            self.client.get(reverse('order-list'))
+        self.assertEqual(writer.flush(), 1)
+
+    def test_logout_deletes_the_session(self):
+        self.login()
+        writer.flush()
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        writer.flush()
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertEqual(self.client.get(reverse('order-list')).status_code, 403)
+
+    def test_replayed_cookie_after_logout_is_rejected(self):
+        self.login()
+        writer.flush()
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = key
+        self.assertEqual(self.client.get(reverse('order-list')).status_code, 403)
+        writer.flush()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = key
+        self.assertEqual(self.client.get(reverse('order-list')).status_code, 403)
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+
+    def test_saves_after_a_logout_elsewhere_are_refused(self):
+        self.login()
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        # request A loaded the session before request B logged out
+        first = SessionStore(key)
+        self.assertEqual(first['_auth_user_id'], str(self.user.pk))
+        SessionStore(key).flush()
+        first['cart'] = [1]
+        with self.assertRaises(UpdateError):
+            first.save()
+        writer.flush()
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertEqual(SessionStore(key).load(), {})
+
+    def test_a_re_inserted_row_is_not_read_back(self):
+        self.login()
+        writer.flush()
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        row = Session.objects.get(session_key=key)
+        SessionStore(key).flush()
+        # a flush that had taken an earlier save of the session writes it back
+        row.save()
+        self.assertEqual(SessionStore(key).load(), {})
+
+
+class LastLoginTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_limits()
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+
+    def login(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('login'), {'username': 'bob@example.com', 'password': 'pass12345'},
+                             format='json')
+        return [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and 'last_login' in q['sql']]
+
+    @override_settings(SESSION_REFRESH_INTERVAL=60)
+    def test_last_login_is_coalesced(self):
+        self.assertEqual(len(self.login()), 1)
+        first = User.objects.get().last_login
+        self.assertEqual(self.login(), [])
+        self.assertEqual(User.objects.get().last_login, first)
+
+        User.objects.update(last_login=first - timedelta(minutes=2))
+        self.assertEqual(len(self.login()), 1)
+        self.assertGreater(User.objects.get().last_login, first)
@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.tokens import (
+    InvalidToken, authenticate_access, invalidate_user, issue_tokens, refresh_tokens, user_cache,
+)
+
+from ecommerce.throttling import reset_limits
+
+User = get_user_model()
+
+
+class SignedTokenTestCase(APITestCase):
+    def setUp(self):
+        reset_limits()
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+
+    def obtain(self, password='pass12345'):
+        return self.client.post(reverse('token-obtain'), {'username': 'bob@example.com', 'password': password},
+                                format='json')
+
+    def get_orders(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(reverse('order-list'))
+
+    def test_obtain_and_use(self):
+        response = self.obtain()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token_type'], 'Bearer')
+        self.assertEqual(self.get_orders(response.data['access']).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.obtain('wrong').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_verification_needs_no_query_once_cached(self):
+        access = issue_tokens(self.user)['access']
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate_access(access), self.user)
+        with self.assertNumQueries(0):
+            user = authenticate_access(access)
+        # each request gets its own instance
+        self.assertIsNot(user, authenticate_access(access))
+
+    def test_bad_tokens_are_rejected(self):
+        tokens = issue_tokens(self.user)
+        for token in (tokens['access'][:-2] + 'xx', tokens['refresh'], 'garbage'):
+            with self.subTest(token=token[-10:]), self.assertRaises(InvalidToken):
+                authenticate_access(token)
+        self.assertIn(self.get_orders('garbage').status_code,
+                      (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        with override_settings(TOKEN_ACCESS_LIFETIME=-1), self.assertRaisesMessage(InvalidToken, 'expired'):
+            authenticate_access(tokens['access'])
+
+    def test_refresh(self):
+        tokens = issue_tokens(self.user)
+        response = self.client.post(reverse('token-refresh'), {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(authenticate_access(response.data['access']), self.user)
+        response = self.client.post(reverse('token-refresh'), {'refresh': tokens['access']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_every_token(self):
+        first, second = issue_tokens(self.user), issue_tokens(self.user)
+        authenticate_access(first['access'])   # cached
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {first["access"]}')
+        self.assertEqual(self.client.post(reverse('logout')).status_code, status.HTTP_200_OK)
+        for tokens in (first, second):
+            with self.assertRaises(InvalidToken):
+                authenticate_access(tokens['access'])
+            with self.assertRaises(InvalidToken):
+                refresh_tokens(tokens['refresh'])
+        self.assertEqual(self.get_orders(issue_tokens(User.objects.get())['access']).status_code, status.HTTP_200_OK)
+
+    def test_password_change_and_deactivation(self):
+        access = issue_tokens(self.user)['access']
+        authenticate_access(access)
+        User.objects.filter(pk=self.user.pk).update(password=make_password('new-pass-123'))
+        invalidate_user(self.user.pk)
+        with self.assertRaises(InvalidToken):
+            authenticate_access(access)
+
+        access = issue_tokens(User.objects.get())['access']
+        authenticate_access(access)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_user(self.user.pk)
+        with self.assertRaises(InvalidToken):
+            authenticate_access(access)
+
+    @override_settings(TOKEN_USER_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        users = [self.user] + [
+            User.objects.create_user(username=f'u{i}', email=f'u{i}@example.com', password='x') for i in range(2)
+        ]
+        for user in users:
+            authenticate_access(issue_tokens(user)['access'])
+        self.assertEqual(len(user_cache), 2)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_saves_revoke_through_the_cache(self):
+        access = issue_tokens(self.user)['access']
+        authenticate_access(access)
+        self.user.set_password('new-pass-123')
+        self.user.save()
+        with self.assertRaises(InvalidToken):
+            authenticate_access(access)
+
+        access = issue_tokens(self.user)['access']
+        authenticate_access(access)
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(InvalidToken):
+            authenticate_access(access)
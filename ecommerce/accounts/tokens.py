@@ -0,0 +1,168 @@
+# accounts/tokens.py
+"""
+Signed bearer tokens.
+
+    tokens = issue_tokens(user)         # {"access": ..., "refresh": ..., "expires_in": ...}
+    user = authenticate_access(token)   # or InvalidToken
+    tokens = refresh_tokens(refresh)
+
+A token is a django.core.signing payload: HMAC-SHA256 over the user id,
+the user's token_version and a digest of its password hash, signed with
+SECRET_KEY under a salt per token type, plus a timestamp for expiry.
+Checking an access token is a signature check and a dict lookup: the user
+comes from `user_cache`, a small in-process LRU whose entries live
+TOKEN_USER_CACHE_TTL seconds, so a steady client costs no query at all.
+
+A token stops working when its user
+- changes password (the digest no longer matches),
+- is deactivated,
+- logs out: revoke_tokens() bumps token_version, which revokes every token
+  issued to the user so far.
+Saves and revocations evict the user from this process's cache at once.
+Other processes notice when their entry expires, so TOKEN_USER_CACHE_TTL
+bounds how long an access token can outlive them there; refresh tokens are
+always checked against the database.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import transaction
+from django.db.models import F
+from django.utils.crypto import salted_hmac
+
+ACCESS_SALT = "accounts.tokens.access"
+REFRESH_SALT = "accounts.tokens.refresh"
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def access_lifetime():
+    return getattr(settings, "TOKEN_ACCESS_LIFETIME", 5 * 60)
+
+
+def refresh_lifetime():
+    return getattr(settings, "TOKEN_REFRESH_LIFETIME", 7 * 24 * 60 * 60)
+
+
+def _password_digest(user):
+    return salted_hmac("accounts.tokens.password", user.password, algorithm="sha256").hexdigest()[:16]
+
+
+class UserCache:
+    """LRU of {user id: (user, password digest)} with a TTL per entry; thread-safe."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by every eviction; a load that raced one isn't stored
+        self.epoch = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, value, epoch):
+        with self._lock:
+            if epoch != self.epoch:
+                return
+            self._entries[user_id] = (time.monotonic() + getattr(settings, "TOKEN_USER_CACHE_TTL", 60), value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > getattr(settings, "TOKEN_USER_CACHE_SIZE", 1024):
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self.epoch += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id):
+    """Forget a user in this process, now and again when the current transaction commits."""
+    user_cache.evict(user_id)
+    transaction.on_commit(lambda: user_cache.evict(user_id))
+
+
+def _sign(user, salt):
+    return signing.dumps({"uid": user.pk, "ver": user.token_version, "pwd": _password_digest(user)}, salt=salt)
+
+
+def issue_tokens(user):
+    return {
+        "access": _sign(user, ACCESS_SALT),
+        "refresh": _sign(user, REFRESH_SALT),
+        "token_type": "Bearer",
+        "expires_in": access_lifetime(),
+    }
+
+
+def _load(token, salt, max_age):
+    try:
+        return signing.loads(token, salt=salt, max_age=max_age)
+    except signing.SignatureExpired:
+        raise InvalidToken("Token has expired.")
+    except signing.BadSignature:
+        raise InvalidToken("Invalid token.")
+
+
+def _check(payload, user, digest):
+    if not user.is_active or payload.get("ver") != user.token_version or payload.get("pwd") != digest:
+        raise InvalidToken("Token has been revoked.")
+
+
+def authenticate_access(token):
+    """The active user an access token was issued to; queries only on a cache miss."""
+    payload = _load(token, ACCESS_SALT, access_lifetime())
+    entry = user_cache.get(payload["uid"])
+    if entry is None:
+        epoch = user_cache.epoch
+        user = get_user_model()._default_manager.filter(pk=payload["uid"]).first()
+        if user is None:
+            raise InvalidToken("Invalid token.")
+        entry = (user, _password_digest(user))
+        user_cache.set(user.pk, entry, epoch)
+    user, digest = entry
+    _check(payload, user, digest)
+    # a copy per request: views may change the instance they are given
+    return copy.copy(user)
+
+
+def refresh_tokens(token):
+    """A new token pair for a valid refresh token, checked against the database."""
+    payload = _load(token, REFRESH_SALT, refresh_lifetime())
+    user = get_user_model()._default_manager.filter(pk=payload["uid"]).first()
+    if user is None:
+        raise InvalidToken("Invalid token.")
+    _check(payload, user, _password_digest(user))
+    return issue_tokens(user)
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to `user` so far (logout)."""
+    get_user_model()._default_manager.filter(pk=user.pk).update(token_version=F("token_version") + 1)
+    user.token_version += 1
+    invalidate_user(user.pk)
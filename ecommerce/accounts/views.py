@@ -3,11 +3,16 @@ from django.contrib.auth import login, logout
 from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, ProfileSerializer
+from .models import Profile
+from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, ProfileSerializer, TokenRefreshSerializer
+from .tokens import InvalidToken, issue_tokens, refresh_tokens, revoke_tokens
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from ecommerce.throttling import IPRateThrottle, UsernameRateThrottle
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "register"
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -19,30 +24,65 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    # checked before authenticate() spends a password hash on the attempt
+    throttle_classes = [IPRateThrottle, UsernameRateThrottle]
+    throttle_scope = "login"
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
         login(request, user)
-        return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
+        data = UserSerializer(user).data
+        data["tokens"] = issue_tokens(user)
+        return Response(data, status=status.HTTP_200_OK)
 
 class LogoutView(APIView):
+    """Ends the session and revokes every token issued to the user."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        user = request.user
         logout(request)
+        revoke_tokens(user)
         return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
 
+class TokenObtainView(APIView):
+    """POST {"username": <email>, "password": ...} -> signed access and refresh tokens, no session."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = [IPRateThrottle, UsernameRateThrottle]
+    throttle_scope = "login"
+
+    def post(self, request):
+        serializer = LoginSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(issue_tokens(serializer.validated_data["user"]), status=status.HTTP_200_OK)
+
+class TokenRefreshView(APIView):
+    """POST {"refresh": ...} -> a new token pair, while the user is still allowed to have one."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = TokenRefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            tokens = refresh_tokens(serializer.validated_data["refresh"])
+        except InvalidToken as e:
+            return Response({"detail": str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(tokens, status=status.HTTP_200_OK)
+
 class ProfileView(APIView):
+    """The signed-in user's profile, created on first access."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        profile = request.user.profile
+        profile = Profile.objects.for_user(request.user)
         return Response(ProfileSerializer(profile).data)
 
     def put(self, request):
-        profile = request.user.profile
+        profile = Profile.objects.for_user(request.user)
         serializer = ProfileSerializer(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -0,0 +1,10 @@
+"""
+Benchmarks for hot paths in the API.
+
+Run from the project directory (next to manage.py), e.g.:
+
+    python -m benchmarks.bench_slugs
+
+Each benchmark runs against a throwaway test database and prints its
+results as JSON so runs can be diffed.
+"""
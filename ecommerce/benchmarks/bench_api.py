@@ -0,0 +1,244 @@
+"""
+Drive the main API paths through the Django test client against the
+deterministic dataset from `manage.py generate_dataset` and report, per
+scenario, latency percentiles, queries per request and throughput as JSON.
+Redirect the output to a file and diff two runs in review:
+
+    python -m benchmarks.bench_api [--products 20000] [--users 2000] [-n 200] > run.json
+    python -m benchmarks.bench_api --scenario product_list --scenario product_search
+    python -m benchmarks.bench_api --existing   # a database you generated yourself
+
+By default a throwaway test database is created and filled (the command's
+defaults, 1M products and 100k users, take a few minutes, so the benchmark
+defaults are smaller). --existing skips that and runs against the configured
+database; bulk_create and checkout write to it.
+
+Request paths and parameters come from a seeded RNG, so two runs with the
+same options issue the same requests.
+"""
+import argparse
+import io
+import random
+import statistics
+import time
+from contextlib import nullcontext
+
+from benchmarks.utils import report, setup_django, test_database
+
+SEARCH_TERMS = ("lamp", "wireless mouse", "portable speaker", "camera", "premium quality", "steel bottle")
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, round(q / 100 * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def summarize(latencies, queries, statuses, seconds):
+    latencies = sorted(latencies)
+    ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "statuses": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "mean": ms(statistics.fmean(latencies)) if latencies else None,
+            "max": ms(latencies[-1]) if latencies else None,
+        },
+        "queries": {
+            "mean": round(statistics.fmean(queries), 2) if queries else None,
+            "max": max(queries, default=None),
+        },
+        "throughput_rps": round(len(latencies) / seconds, 1) if seconds else None,
+    }
+
+
+class Runner:
+    """Times requests one by one and counts the queries each one runs."""
+
+    def __init__(self, client, warmup=5):
+        self.client = client
+        self.warmup = warmup
+        self.queries = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def run(self, requests):
+        from django.db import connection
+
+        requests = list(requests)
+        for method, path, kwargs in requests[:self.warmup]:
+            getattr(self.client, method)(path, **kwargs)
+        latencies, queries, statuses = [], [], []
+        with connection.execute_wrapper(self.count_query):
+            start = time.perf_counter()
+            for method, path, kwargs in requests:
+                before, began = self.queries, time.perf_counter()
+                response = getattr(self.client, method)(path, **kwargs)
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+                latencies.append(time.perf_counter() - began)
+                queries.append(self.queries - before)
+                statuses.append(response.status_code)
+            seconds = time.perf_counter() - start
+        return summarize(latencies, queries, statuses, seconds)
+
+
+# --- scenarios: each returns [(client method, path, kwargs)] ---
+
+def product_list(ctx, rng, n):
+    from django.urls import reverse
+
+    pages = max(1, min(ctx["active_products"] // 15, 200))  # the first 200 pages, 15 per page
+    return [("get", reverse("product-list"), {"data": {"page": rng.randint(1, pages)}}) for _ in range(n)]
+
+
+def product_list_cursor(ctx, rng, n):
+    from django.urls import reverse
+
+    return [("get", reverse("product-list"), {"data": {"pagination": "cursor"}}) for _ in range(n)]
+
+
+def product_detail(ctx, rng, n):
+    from django.urls import reverse
+
+    ids = ctx["product_ids"]
+    return [("get", reverse("product-detail", args=[rng.choice(ids)]), {}) for _ in range(n)]
+
+
+def product_search(ctx, rng, n):
+    from django.urls import reverse
+
+    return [("get", reverse("product-search"), {"data": {"q": rng.choice(SEARCH_TERMS)}}) for _ in range(n)]
+
+
+def category_list(ctx, rng, n):
+    from django.urls import reverse
+
+    pages = max(1, ctx["categories"] // 15)  # StandardResultsSetPagination.page_size
+    return [
+        ("get", reverse("category-list"), {"data": {"page": rng.randint(1, pages), "include_products": "true",
+                                                     "products_limit": 5}})
+        for _ in range(n)
+    ]
+
+
+def category_products(ctx, rng, n):
+    from django.urls import reverse
+
+    return [
+        ("get", reverse("category-category-products", args=[rng.choice(ctx["category_ids"])]),
+         {"data": {"include_descendants": "true"}})
+        for _ in range(n)
+    ]
+
+
+def bulk_create(ctx, rng, n, rows=100):
+    from django.urls import reverse
+
+    requests = []
+    for request in range(max(1, n // 10)):
+        body = [
+            {"name": f"Bench bulk {request}-{row}", "price": f"{rng.randint(100, 9999) / 100:.2f}",
+             "stock": rng.randint(0, 100), "category": rng.choice(ctx["category_ids"])}
+            for row in range(rows)
+        ]
+        requests.append(("post", reverse("product-bulk"), {"data": body, "format": "json"}))
+    return requests
+
+
+def checkout(ctx, rng, n):
+    from django.urls import NoReverseMatch, reverse
+
+    try:
+        url = reverse("checkout")
+    except NoReverseMatch:
+        return None
+    ids = ctx["stocked_product_ids"]
+    return [
+        ("post", url, {"data": {"items": [{"product": pk, "quantity": 1} for pk in sorted(rng.sample(ids, 3))]},
+                       "format": "json"})
+        for _ in range(n)
+    ]
+
+
+SCENARIOS = {
+    "product_list": product_list,
+    "product_list_cursor": product_list_cursor,
+    "product_detail": product_detail,
+    "product_search": product_search,
+    "category_list_include_products": category_list,
+    "category_products": category_products,
+    "bulk_create": bulk_create,
+    "checkout": checkout,
+}
+
+
+def context():
+    """Ids the scenarios pick from, sampled once so every scenario sees the same dataset view."""
+    from django.contrib.auth import get_user_model
+    from products.models import Category, Product
+
+    active = Product.objects.filter(is_active=True)
+    return {
+        "active_products": active.count(),
+        "product_ids": list(active.order_by("pk").values_list("pk", flat=True)[:50000]),
+        "stocked_product_ids": list(active.filter(stock__gte=50).order_by("pk").values_list("pk", flat=True)[:5000]),
+        "categories": Category.objects.count(),
+        "category_ids": list(Category.objects.order_by("pk").values_list("pk", flat=True)),
+        "user": get_user_model().objects.filter(is_active=True).order_by("pk").first(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-n", "--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument("--cache", action="store_true", help="keep the product response cache on")
+    parser.add_argument("--existing", action="store_true", help="use the configured database as is")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with nullcontext() if args.existing else test_database():
+        from django.core.management import call_command
+        from django.test.utils import override_settings
+        from rest_framework.test import APIClient
+
+        if not args.existing:
+            start = time.perf_counter()
+            call_command("generate_dataset", products=args.products, users=args.users, seed=args.seed, verbosity=0,
+                         stdout=io.StringIO())
+            generated = round(time.perf_counter() - start, 2)
+        ctx = context()
+        client = APIClient()
+        client.force_authenticate(ctx["user"])
+
+        results = {}
+        with override_settings(PRODUCT_CACHE_ENABLED=args.cache, ALLOWED_HOSTS=["*"]):
+            for name in args.scenario or SCENARIOS:
+                requests = SCENARIOS[name](ctx, random.Random(f"{args.seed}:{name}"), args.requests)
+                results[name] = {"skipped": "endpoint not available"} if requests is None \
+                    else Runner(client).run(requests)
+
+        report(
+            "api",
+            dataset=None if args.existing else {
+                "products": args.products, "users": args.users, "seed": args.seed, "generate_seconds": generated,
+            },
+            cache=args.cache,
+            scenarios=results,
+        )
+
+
+if __name__ == "__main__":
+    main()
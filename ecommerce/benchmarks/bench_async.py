@@ -0,0 +1,162 @@
+"""
+Compare the sync product list under WSGI with the async one under ASGI
+when many slow clients are connected at once.
+
+    python -m benchmarks.bench_async [--clients 300] [--requests 2] [--client-delay-ms 200] [--threads 16]
+
+Each of --clients clients sends --requests GET /products/?page=N requests
+one after another, and reads every response body slowly (--client-delay-ms
+per body chunk), as clients on poor networks do. No server process is
+involved: the Django handlers are called in-process.
+
+- wsgi:            WSGIHandler on a pool of --threads worker threads (think
+                   gunicorn --threads); a worker stays busy until its slow
+                   client has read the whole response.
+- asgi_sync_view:  ASGIHandler, sync DRF view, so every request hops to a
+                   thread and back.
+- asgi_async_view: ASGIHandler, /api/async/products/; slow reads are awaited
+                   on the event loop and hold no thread.
+
+Latency is measured from the moment a client sends a request, so time spent
+queued for a WSGI worker counts. With the defaults ASGI roughly doubles
+throughput over 16 WSGI threads; the async view itself is on par with the
+sync view under ASGI, because every query still runs on an executor thread.
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_api import percentile
+from benchmarks.utils import report, setup_django, test_database
+
+HOST = "testserver"
+
+
+def summarize(latencies, statuses, seconds):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if status != 200),
+        "latency_ms": {
+            name: round(percentile(latencies, q) * 1000, 2) for name, q in (("p50", 50), ("p95", 95), ("p99", 99))
+        } | {"mean": round(statistics.fmean(latencies) * 1000, 2)},
+        "throughput_rps": round(len(latencies) / seconds, 1),
+    }
+
+
+def wsgi_call(app, path, query, delay):
+    status = []
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": HOST, "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": HOST,
+        "REMOTE_ADDR": "127.0.0.1", "wsgi.input": io.BytesIO(), "wsgi.errors": io.StringIO(),
+        "wsgi.url_scheme": "http", "wsgi.version": (1, 0), "wsgi.multithread": True,
+        "wsgi.multiprocess": False, "wsgi.run_once": False,
+    }
+    body = app(environ, lambda code, headers, exc_info=None: status.append(int(code.split()[0])))
+    try:
+        for _ in body:
+            time.sleep(delay)  # the worker thread blocks while the slow client reads
+    finally:
+        getattr(body, "close", lambda: None)()
+    return status[0]
+
+
+async def asgi_call(app, path, query, delay):
+    status = []
+    finished = asyncio.Event()
+    sent_body = False
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body":
+            await asyncio.sleep(delay)  # the slow client, awaited without a thread
+            if not message.get("more_body"):
+                finished.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", HOST.encode())], "server": (HOST, 80), "client": ("127.0.0.1", 50000),
+    }
+    await app(scope, receive, send)
+    finished.set()
+    return status[0]
+
+
+async def drive(call, args, pages):
+    """Run the clients concurrently; call(query) -> awaitable status."""
+    latencies, statuses = [], []
+
+    async def client(number):
+        rng = random.Random(number)
+        for _ in range(args.requests):
+            began = time.perf_counter()
+            statuses.append(await call(f"page={rng.randint(1, pages)}"))
+            latencies.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(args.clients)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=2, help="requests per client")
+    parser.add_argument("--client-delay-ms", type=float, default=200.0)
+    parser.add_argument("--threads", type=int, default=16, help="WSGI worker threads")
+    parser.add_argument("--cache", action="store_true", help="keep the product response cache on")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from django.core.handlers.asgi import ASGIHandler
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.core.management import call_command
+        from django.test.utils import override_settings
+        from django.urls import reverse
+
+        call_command("generate_dataset", products=args.products, users=10, verbosity=0, stdout=io.StringIO())
+        pages = max(1, args.products // 15 // 2)
+        delay = args.client_delay_ms / 1000
+        sync_path, async_path = reverse("product-list"), reverse("async-product-list")
+        wsgi, asgi = WSGIHandler(), ASGIHandler()
+        pool = ThreadPoolExecutor(max_workers=args.threads)
+
+        async def run_all():
+            loop = asyncio.get_running_loop()
+            return {
+                "wsgi": await drive(
+                    lambda query: loop.run_in_executor(pool, wsgi_call, wsgi, sync_path, query, delay), args, pages),
+                "asgi_sync_view": await drive(lambda query: asgi_call(asgi, sync_path, query, delay), args, pages),
+                "asgi_async_view": await drive(lambda query: asgi_call(asgi, async_path, query, delay), args, pages),
+            }
+
+        with override_settings(PRODUCT_CACHE_ENABLED=args.cache):
+            results = asyncio.run(run_all())
+        pool.shutdown()
+
+        report(
+            "sync_vs_async",
+            clients=args.clients, requests_per_client=args.requests, client_delay_ms=args.client_delay_ms,
+            wsgi_threads=args.threads, cache=args.cache, products=args.products, modes=results,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Cost of authenticating a request: signed bearer tokens (accounts/tokens.py)
+against Django sessions.
+
+    python -m benchmarks.bench_auth [-n 2000] [--users 200]
+
+`auth_only` times resolving the user of a request and nothing else:
+- token_warm: the user is in the in-process cache (steady clients);
+- token_cold: the cache is cleared before every check (a query each);
+- session: django.contrib.auth.get_user() on a signed-in session, which
+  loads the session row and then the user row.
+`endpoint` makes authenticated GET /api/orders/ requests (an empty order
+list) through the full middleware and DRF stack, cycling through --users
+users, and reports microseconds and queries per request for each scheme.
+"""
+import argparse
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def make_session(user):
+    """A signed-in session, built directly so no login signal runs."""
+    from django.conf import settings
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.sessions.backends.db import SessionStore
+
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def per_call(result, n):
+    result.update(
+        us_per_request=round(result["seconds"] / n * 1e6, 1),
+        queries_per_request=round(result["queries"] / n, 2),
+    )
+    return result
+
+
+def auth_only(tokens, session_keys, n):
+    from django.contrib.auth import get_user
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.test import RequestFactory
+    from accounts.tokens import authenticate_access, user_cache
+
+    results = {}
+    user_cache.clear()
+    for token in tokens:
+        authenticate_access(token)
+    with measure() as result:
+        for i in range(n):
+            authenticate_access(tokens[i % len(tokens)])
+    results["token_warm"] = per_call(result, n)
+
+    with measure() as result:
+        for i in range(n):
+            user_cache.clear()
+            authenticate_access(tokens[i % len(tokens)])
+    results["token_cold"] = per_call(result, n)
+
+    factory = RequestFactory()
+    with measure() as result:
+        for i in range(n):
+            request = factory.get("/")
+            request.session = SessionStore(session_keys[i % len(session_keys)])
+            assert get_user(request).is_authenticated
+    results["session"] = per_call(result, n)
+    return results
+
+
+def endpoint(tokens, session_keys, n):
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+    from accounts.tokens import user_cache
+
+    url = reverse("order-list")
+    client = Client()
+    results = {}
+
+    user_cache.clear()
+    with measure() as result:
+        for i in range(n):
+            response = client.get(url, HTTP_AUTHORIZATION=f"Bearer {tokens[i % len(tokens)]}")
+            assert response.status_code == 200, response.content
+    results["token"] = per_call(result, n)
+
+    with measure() as result:
+        for i in range(n):
+            client.cookies[settings.SESSION_COOKIE_NAME] = session_keys[i % len(session_keys)]
+            response = client.get(url)
+            assert response.status_code == 200, response.content
+    client.cookies.clear()
+    results["session"] = per_call(result, n)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=2000, help="requests per scheme")
+    parser.add_argument("--users", type=int, default=200, help="distinct users the requests cycle through")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.hashers import make_password
+        from accounts.tokens import issue_tokens
+
+        User = get_user_model()
+        password = make_password("x")
+        User.objects.bulk_create([
+            User(username=f"user{i}", email=f"user{i}@example.com", password=password)
+            for i in range(args.users)
+        ])
+        users = list(User.objects.order_by("pk"))
+        tokens = [issue_tokens(user)["access"] for user in users]
+        session_keys = [make_session(user) for user in users]
+
+        report(
+            "authentication",
+            requests=args.n,
+            users=args.users,
+            auth_only=auth_only(tokens, session_keys, args.n),
+            endpoint=endpoint(tokens, session_keys, args.n),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Push N products through POST /api/products/bulk/ as one JSON array and as
+NDJSON, and report wall time and queries.
+
+    python -m benchmarks.bench_bulk [-n 10000]
+"""
+import argparse
+import json
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def summarize(result, response, n):
+    result["status"] = response.status_code
+    result["created"] = response.data.get("created")
+    result["failed"] = response.data.get("failed")
+    result["products_per_second"] = round(n / result["seconds"], 1) if result["seconds"] else None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=10000, help="products per request")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from products.models import Category
+
+        user = get_user_model().objects.create_user(username="seller", email="seller@example.com", password="x")
+        categories = [Category.objects.create(name=f"Category {i}", slug=f"category-{i}").pk for i in range(20)]
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("product-bulk")
+
+        def rows(prefix):
+            return [
+                {"name": f"{prefix} product {i % (args.n // 4 or 1)}", "price": "19.99", "stock": i % 50,
+                 "category": categories[i % len(categories)], "description": "Synthetic seller feed row"}
+                for i in range(args.n)
+            ]
+
+        with measure() as as_json:
+            json_response = client.post(url, rows("JSON"), format="json")
+        body = "\n".join(json.dumps(row) for row in rows("NDJSON")).encode()
+        with measure() as as_ndjson:
+            ndjson_response = client.post(url, body, content_type="application/x-ndjson")
+
+        report(
+            "bulk_product_endpoint",
+            products=args.n,
+            json_array=summarize(as_json, json_response, args.n),
+            ndjson=summarize(as_ndjson, ndjson_response, args.n),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Export N products through export_products' streaming path and report
+throughput and peak Python memory, which should stay flat as N grows.
+
+    python -m benchmarks.bench_export [-n 100000] [--format csv|ndjson]
+"""
+import argparse
+import tracemalloc
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=100000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from products import export
+        from products.models import Category, Product
+
+        category = Category.objects.create(name="Bulk", slug="bulk")
+        Product.objects.bulk_create(
+            (Product(name=f"Product {i}", slug=f"product-{i}", price=9, category=category) for i in range(args.n)),
+            batch_size=5000,
+        )
+
+        size = 0
+        tracemalloc.start()
+        with measure() as result:
+            for chunk in export.iter_export(args.format, export.iter_rows(export.export_queryset())):
+                size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result.update(
+            products=args.n,
+            bytes=size,
+            rows_per_second=round(args.n / result["seconds"], 1) if result["seconds"] else None,
+            peak_python_memory_kb=round(peak / 1024, 1),
+        )
+        report("catalog_export", format=args.format, export=result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+CPU per 100-row page for the product and category list payloads, DRF
+serializers vs the .values() fast path in products/row_serializers.py.
+
+    python -m benchmarks.bench_serializers [--products 5000] [--page-size 100] [--rounds 200]
+
+"serialize" times building the payload from rows already in memory (model
+instances for DRF, dicts for the fast path); "fetch_and_serialize" also runs
+the query and builds the instances or dicts. CPU time is process time, so
+nothing else on the machine skews it.
+"""
+import argparse
+import io
+import time
+
+from benchmarks.utils import report, setup_django, test_database
+
+
+def cpu_per_round(fn, rounds):
+    fn()  # warm up: compile the row serializer, fill caches
+    start = time.process_time()
+    for _ in range(rounds):
+        fn()
+    return (time.process_time() - start) / rounds
+
+
+def compare(rounds, drf_rows, drf_serialize, fast_rows, fast_serialize):
+    instances, dicts = list(drf_rows()), list(fast_rows())
+    result = {}
+    for name, drf, fast in (
+        ("serialize", lambda: drf_serialize(instances), lambda: fast_serialize(dicts)),
+        ("fetch_and_serialize", lambda: drf_serialize(list(drf_rows())), lambda: fast_serialize(list(fast_rows()))),
+    ):
+        drf_ms, fast_ms = cpu_per_round(drf, rounds) * 1000, cpu_per_round(fast, rounds) * 1000
+        result[name] = {"drf_ms": round(drf_ms, 3), "rows_ms": round(fast_ms, 3), "speedup": round(drf_ms / fast_ms, 1)}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from django.core.management import call_command
+
+        from products.api.views import CategoryViewSet
+        from products.models import Category
+        from products.views import ProductViewSet
+
+        call_command("generate_dataset", products=args.products, users=100, verbosity=0, stdout=io.StringIO())
+        size = args.page_size
+        products = ProductViewSet.queryset.order_by("-created_at", "-id")
+        categories = Category.objects.order_by("name")
+        product_rows, category_rows = ProductViewSet.row_serializer, CategoryViewSet.row_serializer
+
+        report(
+            "list_serialization",
+            products=args.products, page_size=size, rounds=args.rounds,
+            product_list=compare(
+                args.rounds,
+                lambda: products[:size], lambda rows: ProductViewSet.serializer_class(rows, many=True).data,
+                lambda: product_rows.queryset(products)[:size], product_rows.serialize,
+            ),
+            category_list=compare(
+                args.rounds,
+                lambda: categories[:size], lambda rows: CategoryViewSet.serializer_class(rows, many=True).data,
+                lambda: category_rows.queryset(categories)[:size], category_rows.serialize,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Database queries per request for each session engine: Django's db and
+cached_db against ecommerce.sessions (cache reads, write-behind).
+
+    python -m benchmarks.bench_sessions [--users 100] [--requests 20]
+
+For each engine, --users users log in through /api/accounts/login/ and
+then make --requests authenticated GET /api/orders/ calls each (an empty
+order list: one query of its own), once as configured and once with
+SESSION_SAVE_EVERY_REQUEST (sliding expiry). `queries_per_request` counts
+what ran inside the requests; `background` is what the session writer
+flushed afterwards, rows and queries, for ecommerce.sessions only. Password
+hashing uses MD5 and throttles are off, so the numbers are about sessions.
+"""
+import argparse
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'ecommerce.sessions',
+)
+
+
+def per_request(result, n):
+    result.update(
+        requests=n,
+        us_per_request=round(result['seconds'] / n * 1e6, 1),
+        queries_per_request=round(result['queries'] / n, 2),
+    )
+    return result
+
+
+def background(engine):
+    if engine != 'ecommerce.sessions':
+        return None
+    from ecommerce.sessions import writer
+
+    before = writer.rows_written + writer.rows_deleted
+    with measure() as result:
+        writer.flush()
+    result['rows'] = writer.rows_written + writer.rows_deleted - before
+    return result
+
+
+def run(engine, users, requests, save_every_request):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    cache.clear()
+    # every run pays for its users' last_login update, which coalesces for later logins
+    get_user_model().objects.update(last_login=None)
+    with override_settings(
+        SESSION_ENGINE=engine,
+        SESSION_SAVE_EVERY_REQUEST=save_every_request,
+        SESSION_WRITE_BEHIND_INTERVAL=3600,   # flushed by background() instead
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+    ):
+        clients = [Client() for _ in users]
+        login, orders = reverse('login'), reverse('order-list')
+        with measure() as result:
+            for client, user in zip(clients, users):
+                response = client.post(login, {'username': user.email, 'password': 'x'},
+                                       content_type='application/json')
+                assert response.status_code == 200, response.content
+        results = {'login': per_request(result, len(users)), 'login_background': background(engine)}
+        with measure() as result:
+            for _ in range(requests):
+                for client in clients:
+                    assert client.get(orders).status_code == 200
+        results['browse'] = per_request(result, requests * len(users))
+        results['browse_background'] = background(engine)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100, help='users logging in')
+    parser.add_argument('--requests', type=int, default=20, help='authenticated requests per user')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']), test_database():
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.hashers import make_password
+        from accounts.models import Profile
+
+        User = get_user_model()
+        password = make_password('x')
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com', password=password) for i in range(args.users)
+        ])
+        users = list(User.objects.order_by('pk'))
+        Profile.objects.bulk_create([Profile(user=user) for user in users])
+        report(
+            'sessions',
+            users=args.users,
+            requests_per_user=args.requests,
+            engines={
+                engine: {
+                    'default': run(engine, users, args.requests, False),
+                    'save_every_request': run(engine, users, args.requests, True),
+                }
+                for engine in ENGINES
+            },
+        )
+
+
+if __name__ == '__main__':
+    main()
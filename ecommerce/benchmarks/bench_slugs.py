@@ -0,0 +1,58 @@
+"""
+Create N products with the same name and compare the old probe-for-a-free-
+suffix loop with the SlugCounter allocator used by Product.save.
+
+    python -m benchmarks.bench_slugs [-n 5000] [--legacy-n 500]
+
+The legacy loop is quadratic, so it runs on a smaller sample by default.
+"""
+import argparse
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def legacy_create(Product, name):
+    # the pre-SlugCounter Product.save, kept here for comparison
+    from django.utils.text import slugify
+    base_slug = slugify(name)
+    slug = base_slug
+    counter = 1
+    while Product.objects.filter(slug=slug).exists():
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return Product.objects.create(name=name, slug=slug, price=1)
+
+
+def summarize(result, n):
+    result["products"] = n
+    result["products_per_second"] = round(n / result["seconds"], 1) if result["seconds"] else None
+    result["queries_per_product"] = round(result["queries"] / n, 2) if n else None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=5000, help="products created with the SlugCounter allocator")
+    parser.add_argument("--legacy-n", type=int, default=500, help="products created with the old loop (0 to skip)")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from products.models import Product
+
+        with measure() as legacy:
+            for _ in range(args.legacy_n):
+                legacy_create(Product, "Legacy iPhone Case")
+        with measure() as allocator:
+            for _ in range(args.n):
+                Product.objects.create(name="iPhone Case", price=1)
+
+        report(
+            "slug_allocation",
+            legacy=summarize(legacy, args.legacy_n),
+            slug_counter=summarize(allocator, args.n),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Webhook ingestion throughput: POST signed gateway events for -n PROCESSING
+payments to /api/payments/webhook/ and report events per second and queries
+per event.
+
+    python -m benchmarks.bench_webhooks [-n 2000] [--duplicates 0.3] [--batch 100]
+
+Every payment gets a "processing" and a "succeeded" event; --duplicates of
+them are delivered twice, and the whole stream is shuffled, so late and
+repeated events arrive as they do from real gateways. It is delivered once
+an event per request and once in --batch sized deliveries, each against its
+own set of payments. `consistent` checks that every payment ended
+succeeded and every order paid exactly once.
+"""
+import argparse
+import json
+import random
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def make_payments(user, product, n):
+    from orders.services import place_order
+    from payments.models import Payment
+
+    orders = [place_order(user, [(product.pk, 1)]) for _ in range(n)]
+    return Payment.objects.bulk_create([
+        Payment(order=order, user=user, idempotency_key=order.reference, fingerprint="bench",
+                amount=order.total, currency="usd", status=Payment.PROCESSING)
+        for order in orders
+    ])
+
+
+def make_events(gateway, payments, duplicates, rng):
+    events = []
+    for payment in payments:
+        for type in ("payment.processing", "payment.succeeded"):
+            events.append(gateway.event(type, payment.reference, gateway_reference=f"ch_{payment.reference[:8]}"))
+    events += rng.sample(events, int(len(events) * duplicates))
+    rng.shuffle(events)
+    return events
+
+
+def deliver(client, gateway, events, batch):
+    from django.urls import reverse
+
+    url = reverse("payment-webhook")
+    new = 0
+    for start in range(0, len(events), batch):
+        chunk = events[start:start + batch]
+        body = json.dumps(chunk[0] if batch == 1 else {"events": chunk}).encode()
+        response = client.post(url, body, content_type="application/json",
+                                HTTP_X_FAKE_SIGNATURE=gateway.sign(body))
+        assert response.status_code == 200, response.content
+        new += response.data["new"]
+    return new
+
+
+def run(client, gateway, user, product, args, batch, rng):
+    from orders.models import Order
+    from payments.models import Payment
+
+    payments = make_payments(user, product, args.n)
+    events = make_events(gateway, payments, args.duplicates, rng)
+    with measure() as result:
+        new = deliver(client, gateway, events, batch)
+    references = [payment.reference for payment in payments]
+    succeeded = Payment.objects.filter(reference__in=references, status=Payment.SUCCEEDED).count()
+    paid = Order.objects.filter(payments__reference__in=references, status=Order.PAID).count()
+    result.update(
+        events=len(events),
+        new_events=new,
+        events_per_second=round(len(events) / result["seconds"], 1),
+        queries_per_event=round(result["queries"] / len(events), 2),
+        consistent=new == args.n * 2 and succeeded == paid == args.n,
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=2000, help="payments")
+    parser.add_argument("--duplicates", type=float, default=0.3, help="share of events delivered twice")
+    parser.add_argument("--batch", type=int, default=100, help="events per batched delivery")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from payments.gateways import get_gateway
+        from products.models import Product
+
+        rng = random.Random(42)
+        gateway = get_gateway()
+        user = get_user_model().objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        product = Product.objects.create(name="Bench item", price=10, stock=args.n * 2)
+        client = APIClient()
+
+        report(
+            "webhook_ingestion",
+            payments=args.n,
+            duplicates=args.duplicates,
+            single=run(client, gateway, user, product, args, 1, rng),
+            batched=run(client, gateway, user, product, args, args.batch, rng),
+        )
+
+
+if __name__ == "__main__":
+    main()
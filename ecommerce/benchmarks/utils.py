@@ -0,0 +1,50 @@
+# benchmarks/utils.py
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def setup_django(settings_module="ecommerce.settings"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0):
+    """Create a throwaway test database, so benchmarks never touch db.sqlite3."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+@contextmanager
+def measure():
+    """Collect wall time and query count for the wrapped block."""
+    from django.db import connection
+
+    result = {"queries": 0}
+
+    def count_queries(execute, sql, params, many, context):
+        result["queries"] += 1
+        return execute(sql, params, many, context)
+
+    # an execute_wrapper rather than CaptureQueriesContext, which caps at 9000 queries
+    with connection.execute_wrapper(count_queries):
+        start = time.perf_counter()
+        yield result
+        result["seconds"] = round(time.perf_counter() - start, 4)
+
+
+def report(name, **results):
+    json.dump({"benchmark": name, **results}, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
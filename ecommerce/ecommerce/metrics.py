@@ -0,0 +1,332 @@
+# ecommerce/metrics.py
+"""
+Opt-in per-request instrumentation.
+
+With REQUEST_METRICS_ENABLED = True, RequestMetricsMiddleware records for
+every request:
+
+- the number of SQL queries and the time spent in them (through an
+  execute_wrapper installed on every database connection);
+- the time spent building serializer `.data` or inside serializing() blocks
+  (outermost only, so nested serializers aren't counted twice);
+- the total time spent in the view and the middleware below this one.
+
+Each request gets a `Server-Timing` header, a JSON log line on the
+`ecommerce.metrics` logger, and an observation in an in-process histogram
+keyed by URL name, which staff can read from /api/_metrics/. Histograms
+are per process: with several workers, each reports its own traffic.
+
+When the setting is off the middleware raises MiddlewareNotUsed, so Django
+drops it from the chain and requests pay nothing. Timing for streaming
+responses stops when the view returns, not when the body is sent.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('ecommerce.metrics')
+
+# upper bounds of the latency buckets, in milliseconds; the last one catches the rest
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def is_enabled():
+    return getattr(settings, 'REQUEST_METRICS_ENABLED', False)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_seconds', 'serializer_seconds', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+
+def current():
+    """The metrics of the request being handled, or None outside an instrumented request."""
+    return _current.get()
+
+
+# --- collection ---
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - start
+
+
+def _install_query_timer(sender=None, connection=None, **kwargs):
+    # Installed on every connection rather than around each request: under
+    # ASGI the async ORM runs queries on executor threads with their own
+    # connections, which the request's context (and _current) reaches anyway.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def instrument_connections():
+    """Time queries on open and future connections. Idempotent."""
+    connection_created.connect(_install_query_timer, dispatch_uid='ecommerce.metrics')
+    for connection in connections.all(initialized_only=True):
+        _install_query_timer(connection=connection)
+
+
+@contextmanager
+def collecting():
+    """
+    Collect metrics for the wrapped block as the middleware does for a
+    request (background jobs); yields the RequestMetrics.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def serializing():
+    """
+    Count the wrapped block as serializer time, for code that builds payloads
+    without DRF serializers. Nested blocks and serializers count once.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serializer_seconds += time.perf_counter() - start
+
+
+def _timed_data(fget):
+    def data(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return fget(self)
+        metrics.serializing = True
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_seconds += time.perf_counter() - start
+    data.instrumented = True
+    return property(data)
+
+
+_instrument_lock = threading.Lock()
+
+
+def instrument_serializers():
+    """Wrap Serializer.data and ListSerializer.data with a timer. Idempotent."""
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    with _instrument_lock:
+        for cls in (Serializer, ListSerializer):
+            prop = cls.__dict__['data']
+            if not getattr(prop.fget, 'instrumented', False):
+                cls.data = _timed_data(prop.fget)
+
+
+# --- histograms ---
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+
+    def observe(self, total_ms, queries, db_ms, serializer_ms):
+        self.buckets[bisect_left(BUCKETS_MS, total_ms)] += 1
+        self.count += 1
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        self.db_ms += db_ms
+        self.serializer_ms += serializer_ms
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (capped at the observed max)."""
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self):
+        count = self.count or 1
+        return {
+            'count': self.count,
+            'latency_ms': {
+                'mean': round(self.total_ms / count, 3),
+                'p50': round(self.percentile(50), 3),
+                'p95': round(self.percentile(95), 3),
+                'p99': round(self.percentile(99), 3),
+                'max': round(self.max_ms, 3),
+            },
+            'db_ms_mean': round(self.db_ms / count, 3),
+            'serializer_ms_mean': round(self.serializer_ms / count, 3),
+            'queries_mean': round(self.queries / count, 2),
+            'queries_max': self.max_queries,
+            'buckets': {
+                ('+Inf' if bound == float('inf') else str(bound)): n
+                for bound, n in zip(BUCKETS_MS, self.buckets)
+            },
+        }
+
+
+class Registry:
+    """Histograms by name (URL name, job task name), shared by all threads of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, name, total_ms, queries, db_ms, serializer_ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(total_ms, queries, db_ms, serializer_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+registry = Registry()
+
+
+# --- middleware ---
+
+def url_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or 'unresolved'
+
+
+def server_timing(metrics, total_seconds):
+    return ', '.join([
+        f'db;dur={metrics.db_seconds * 1000:.3f};desc="{metrics.queries} queries"',
+        f'serialize;dur={metrics.serializer_seconds * 1000:.3f}',
+        f'total;dur={total_seconds * 1000:.3f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """
+    Put this first in MIDDLEWARE so the total covers everything below it.
+    Works in both sync and async chains, so it doesn't add a thread hop
+    in front of the async views under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        instrument_connections()
+        instrument_serializers()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    @staticmethod
+    def record(request, response, metrics, total):
+        name = url_name(request)
+        response['Server-Timing'] = server_timing(metrics, total)
+        registry.observe(
+            name, total * 1000, metrics.queries, metrics.db_seconds * 1000, metrics.serializer_seconds * 1000,
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'url_name': name,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_seconds * 1000, 3),
+            'serializer_ms': round(metrics.serializer_seconds * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+        }))
+        return response
+
+
+class MetricsView(APIView):
+    """
+    GET /api/_metrics/ — per-URL-name request histograms of this process,
+    and the depth and lag of the background job queues. DELETE clears the
+    histograms.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from jobs.backends import get_backend
+
+        return Response({'enabled': is_enabled(), 'endpoints': registry.snapshot(), 'jobs': get_backend().stats()})
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=204)
@@ -0,0 +1,220 @@
+# ecommerce/sessions.py
+"""
+Session engine that serves sessions from the cache and writes them to the
+database behind the request:
+
+    SESSION_ENGINE = 'ecommerce.sessions'
+
+django.contrib.sessions.backends.cached_db already reads from the cache, but
+it writes every save to the database inside the request, and the middleware
+saves on every login, every change and, with SESSION_SAVE_EVERY_REQUEST, on
+every request to slide the expiry. Here:
+
+- a save updates the cache (SESSION_CACHE_ALIAS) at once and hands the row
+  to `writer`, a per-process write-behind queue that a daemon thread flushes
+  every SESSION_WRITE_BEHIND_INTERVAL seconds as one bulk upsert; several
+  saves of one session in between become one row write;
+- a save that doesn't change the data is skipped unless the entry is older
+  than SESSION_REFRESH_INTERVAL, so sliding expiry costs one write per
+  session per interval instead of one per request;
+- new session keys are reserved with cache.add() rather than a database
+  lookup.
+
+The database copy is what a cache miss (eviction, restart) falls back to.
+Writes still queued when a process dies are lost from the database only;
+the cache keeps serving them until they expire. Deletions (logout) reach
+the cache and the database at once: a row left behind would let a replayed
+cookie load the session back from it. The cache keeps a tombstone in the
+deleted entry's place, so a request that loaded the session before the
+logout can't save it back afterwards (SessionInterrupted, as with Django's
+own backends), and a row a running flush re-inserts is never read.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import DatabaseError, close_old_connections, router, transaction
+
+logger = logging.getLogger('ecommerce.sessions')
+
+KEY_PREFIX = 'ecommerce.sessions'
+
+# what a deleted session's cache entry becomes, for as long as its cookie could live
+DELETED = 'deleted'
+
+
+def write_behind_interval():
+    return getattr(settings, 'SESSION_WRITE_BEHIND_INTERVAL', 1.0)
+
+
+def refresh_interval():
+    return getattr(settings, 'SESSION_REFRESH_INTERVAL', 5 * 60)
+
+
+class SessionWriter:
+    """Session rows waiting for the database, keyed by session key; None deletes the row."""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.rows_written = 0
+        self.rows_deleted = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, session_key, row):
+        with self._lock:
+            if self._pid != os.getpid():
+                # a forked worker: the parent's thread and queue didn't come along
+                self._pending, self._thread, self._pid = {}, None, os.getpid()
+            self._pending[session_key] = row
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='session-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(write_behind_interval())
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write every queued row now, in the calling thread. Returns the rows written and deleted."""
+        from django.contrib.sessions.models import Session
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        deleted = [key for key, row in pending.items() if row is None]
+        rows = [
+            Session(session_key=key, session_data=row[0], expire_date=row[1])
+            for key, row in pending.items() if row is not None
+        ]
+        try:
+            with transaction.atomic(using=router.db_for_write(Session)):
+                if deleted:
+                    Session.objects.filter(session_key__in=deleted).delete()
+                if rows:
+                    Session.objects.bulk_create(
+                        rows, update_conflicts=True,
+                        unique_fields=['session_key'], update_fields=['session_data', 'expire_date'],
+                    )
+        except DatabaseError:
+            logger.exception('Writing %d sessions failed; retrying with the next flush.', len(pending))
+            with self._lock:
+                # requeue, unless a newer save of the same session came in meanwhile
+                self._pending = {**pending, **self._pending}
+            return 0
+        self.rows_written += len(rows)
+        self.rows_deleted += len(deleted)
+        return len(pending)
+
+
+writer = SessionWriter()
+atexit.register(writer.flush)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # what the last load or save saw, to skip saves that change nothing
+        self._stored = None
+        self._saved_at = None
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # invalid keys raise on some backends (memcached); start afresh as cached_db does
+            entry = None
+        if entry == DELETED:
+            self._session_key = None
+            return {}
+        if entry is None:
+            session = self._get_session_from_db()
+            if session is None:
+                return {}
+            data = self.decode(session.session_data)
+            entry = {'data': data, 'saved_at': None}
+            self._cache.set(self.cache_key, entry, self.get_expiry_age(expiry=session.expire_date))
+        self._stored = self.serializer().dumps(entry['data'])
+        self._saved_at = entry['saved_at']
+        return entry['data']
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    def exists(self, session_key):
+        return bool(session_key) and (self.cache_key_prefix + session_key) in self._cache
+
+    async def aexists(self, session_key):
+        return await sync_to_async(self.exists)(session_key)
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    async def acreate(self):
+        await sync_to_async(self.create)()
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        stored = self.serializer().dumps(data)
+        now = time.time()
+        if (not must_create and stored == self._stored and self._saved_at is not None
+                and now - self._saved_at < refresh_interval()):
+            return
+        expire_date = self.get_expiry_date()
+        entry = {'data': data, 'saved_at': now}
+        age = self.get_expiry_age(expiry=expire_date)
+        if must_create:
+            if not self._cache.add(self.cache_key, entry, age):
+                raise CreateError
+        else:
+            if self._cache.get(self.cache_key) == DELETED:
+                raise UpdateError
+            self._cache.set(self.cache_key, entry, age)
+        self._stored, self._saved_at = stored, now
+        writer.put(self.session_key, (self.encode(data), expire_date))
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.set(self.cache_key_prefix + session_key, DELETED, settings.SESSION_COOKIE_AGE)
+        self.model.objects.filter(session_key=session_key).delete()
+        # a save of this session already taken by a running flush can insert
+        # the row again; the next flush deletes it for good
+        writer.put(session_key, None)
+
+    async def adelete(self, session_key=None):
+        await sync_to_async(self.delete)(session_key)
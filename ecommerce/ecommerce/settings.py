@@ -45,11 +45,16 @@ INSTALLED_APPS = [
     "orders",
     "payments",
     "inventory",
+    "jobs",
 ]
 
 AUTH_USER_MODEL = "products.User"
 
+# loads users together with their profile (accounts/backends.py)
+AUTHENTICATION_BACKENDS = ["accounts.backends.ProfileBackend"]
+
 MIDDLEWARE = [
+    'ecommerce.metrics.RequestMetricsMiddleware',  # no-op unless REQUEST_METRICS_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +70,12 @@ ROOT_URLCONF = 'ecommerce.urls'
 
 
 REST_FRAMEWORK = {
+    # session first: its (absent) WWW-Authenticate keeps anonymous API errors at 403
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'accounts.authentication.SignedTokenAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
@@ -72,6 +83,14 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 15,
+    # "<view throttle_scope>.<ip|username|user>" for the throttles in
+    # ecommerce/throttling.py; a scope without a rate isn't limited
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': '20/min',
+        'login.username': '5/min',
+        'register.ip': '10/hour',
+        'products.write.user': '120/min',
+    },
 }
 
 
@@ -100,7 +119,13 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
             'propagate': False,
-        }
+        },
+        # one JSON line per request while REQUEST_METRICS_ENABLED is on
+        'ecommerce.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     }
 }
 
@@ -146,6 +171,83 @@ DATABASES = {
 }
 
 
+# Caches
+# LocMem locally and in tests; production.py points this at Redis.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ecommerce-default',
+    },
+    # rate limit counters (THROTTLE_CACHE), apart so clearing one doesn't reset the other
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ecommerce-throttle',
+    },
+}
+
+# Versioned read-through cache for product list/detail responses (products/cache.py).
+# Entries are invalidated by version bumps, so no timeout is needed.
+PRODUCT_CACHE_ENABLED = True
+PRODUCT_CACHE_TIMEOUT = None
+# Writes touching more products than this drop every cached detail response
+# instead of bumping one version key per product.
+PRODUCT_CACHE_INVALIDATE_THRESHOLD = 100
+
+# Seconds a stock reservation (inventory.Reservation) is held before the
+# release_expired_reservations sweeper returns it to stock.
+INVENTORY_RESERVATION_TTL = 15 * 60
+
+# Payment gateway class (payments/gateways.py) and the secret its webhooks are
+# signed with. FakeGateway charges in-process; production.py reads both from the environment.
+PAYMENT_GATEWAY = 'payments.gateways.FakeGateway'
+PAYMENT_WEBHOOK_SECRET = 'dev-insecure-webhook-secret'
+PAYMENT_CURRENCY = 'usd'
+
+# Background jobs (jobs/): queued in the jobs_job table, or in Redis with
+# 'jobs.backends.RedisBackend' and JOBS_REDIS_URL, and run by `manage.py run_workers`.
+# JOBS_EAGER runs them in-process when the transaction commits instead (tests).
+JOBS_BACKEND = 'jobs.backends.DatabaseBackend'
+JOBS_EAGER = False
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 2            # seconds before the first retry, doubled after each failure
+JOBS_VISIBILITY_TIMEOUT = 5 * 60  # seconds before a claimed job whose worker vanished runs again
+
+# Signed bearer tokens (accounts/tokens.py): lifetimes in seconds, and the
+# per-process cache of the users they resolve to. TOKEN_USER_CACHE_TTL bounds
+# how long another process can still accept the access tokens of a user who
+# logged out, changed password or was deactivated.
+TOKEN_ACCESS_LIFETIME = 5 * 60
+TOKEN_REFRESH_LIFETIME = 7 * 24 * 60 * 60
+TOKEN_USER_CACHE_SIZE = 1024
+TOKEN_USER_CACHE_TTL = 60
+
+# Rate limit counters (ecommerce/throttling.py) live in this cache, so all
+# worker processes share them; it needs an atomic incr(). With a RedisCache,
+# THROTTLE_BACKEND = 'ecommerce.throttling.RedisTokenBucketLimiter' makes each
+# check a single Lua call.
+THROTTLE_BACKEND = 'ecommerce.throttling.SlidingWindowLimiter'
+THROTTLE_CACHE = 'throttle'
+
+# SESSION_ENGINE = 'ecommerce.sessions' serves sessions from the cache and
+# writes them to the database in the background, every
+# SESSION_WRITE_BEHIND_INTERVAL seconds. It needs a cache shared by all
+# workers, so only production.py turns it on. With it, an unchanged session
+# is re-saved (sliding expiry) at most once per SESSION_REFRESH_INTERVAL
+# seconds; last_login is updated at most that often with any engine.
+SESSION_WRITE_BEHIND_INTERVAL = 1.0
+SESSION_REFRESH_INTERVAL = 5 * 60
+
+# Outgoing mail is printed locally; production.py sends it over SMTP.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'shop@localhost'
+
+# Per-request query count / DB / serializer / total timings (ecommerce/metrics.py):
+# Server-Timing headers, JSON log lines and histograms at /api/_metrics/.
+# Off by default; the middleware removes itself when disabled.
+REQUEST_METRICS_ENABLED = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -2,6 +2,16 @@ from .base import *  # import common/base settings
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+
+def required_env(name):
+    value = os.environ.get(name)
+    if not value:
+        raise ImproperlyConfigured(f"Set the {name} environment variable.")
+    return value
+
+
 # ---------------------------------------
 # Security
 # ---------------------------------------
@@ -37,6 +47,38 @@ CACHES = {
     }
 }
 
+# ---------------------------------------
+# Sessions: read from Redis, written to Postgres in the background
+# ---------------------------------------
+SESSION_ENGINE = "ecommerce.sessions"
+SESSION_CACHE_ALIAS = "default"
+SESSION_WRITE_BEHIND_INTERVAL = 1.0
+SESSION_REFRESH_INTERVAL = 5 * 60
+
+# ---------------------------------------
+# Throttling
+# ---------------------------------------
+THROTTLE_BACKEND = os.environ.get("THROTTLE_BACKEND", "ecommerce.throttling.RedisTokenBucketLimiter")
+THROTTLE_CACHE = "default"
+
+# ---------------------------------------
+# Payments
+# ---------------------------------------
+# no defaults: a deploy without them must not start (FakeGateway approves every charge)
+PAYMENT_GATEWAY = required_env("PAYMENT_GATEWAY")
+PAYMENT_WEBHOOK_SECRET = required_env("PAYMENT_WEBHOOK_SECRET")
+PAYMENT_CURRENCY = os.environ.get("PAYMENT_CURRENCY", "usd")
+
+# ---------------------------------------
+# Background jobs
+# ---------------------------------------
+JOBS_BACKEND = os.environ.get("JOBS_BACKEND", "jobs.backends.DatabaseBackend")
+JOBS_REDIS_URL = os.environ.get("JOBS_REDIS_URL", os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/2"))
+JOBS_EAGER = False
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 2
+JOBS_VISIBILITY_TIMEOUT = 5 * 60
+
 # ---------------------------------------
 # Static & Media Files
 # ---------------------------------------
@@ -0,0 +1,256 @@
+# ecommerce/throttling.py
+"""
+Rate limits whose state lives in a shared cache, so every worker process
+enforces the same limit.
+
+DRF's own SimpleRateThrottle keeps a list of timestamps per client and
+rewrites it with a get/set pair: two round trips, and concurrent requests
+in other processes overwrite each other's hits. Here each check is one
+atomic update in the cache, made by the backend named in THROTTLE_BACKEND:
+
+- SlidingWindowLimiter (default) works with any cache whose incr() is
+  atomic (Redis, Memcached, and LocMemCache within one process). It counts
+  hits in fixed windows and weighs the previous window's count by how much
+  of it still overlaps the sliding window. On a RedisCache a check is one
+  Lua call that increments the window, sets its expiry on the first hit
+  and reads the previous window. Elsewhere it is one incr() (plus an add()
+  on a window's first hit), and the count of a closed window is read once
+  per key and window, then remembered.
+- RedisTokenBucketLimiter runs a token bucket in a Lua script on a
+  RedisCache: one EVALSHA per check, timed by the Redis server's clock.
+
+Views opt in with throttle_classes and a throttle_scope; each throttle
+class looks up its own rate in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+under "<scope>.ip", "<scope>.username" or "<scope>.user", and a missing
+rate disables it. Views sharing a scope share their counters. A denied
+request gets 429 with a Retry-After header.
+"""
+import hashlib
+import math
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+KEY_PREFIX = 'throttle'
+
+
+class RateLimiter:
+    """One shared counter per key; hit() records a request and decides on it."""
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'THROTTLE_CACHE', 'default')]
+        self._scripts = {}
+
+    def hit(self, key, limit, period):
+        """Count a request against `limit` per `period` seconds -> (allowed, seconds to wait)."""
+        raise NotImplementedError
+
+    def is_redis(self):
+        from django.core.cache.backends.redis import RedisCache
+
+        return isinstance(self.cache, RedisCache)
+
+    def _script(self, source, key):
+        # the cache may shard keys over several servers; one registered script per client
+        client = self.cache._cache.get_client(key, write=True)
+        script = self._scripts.get((id(client), source))
+        if script is None:
+            script = self._scripts[id(client), source] = client.register_script(source)
+        return script
+
+
+class SlidingWindowLimiter(RateLimiter):
+    # remembered counts of closed windows, at most this many before starting over
+    max_closed = 10000
+
+    def __init__(self):
+        super().__init__()
+        self._redis = self.is_redis()
+        self._closed = {}
+        self._lock = threading.Lock()
+
+    def _counts(self, key, previous_key, period):
+        """The window's count with this hit, and the previous window's count."""
+        if self._redis:
+            keys = [self.cache.make_and_validate_key(key), self.cache.make_and_validate_key(previous_key)]
+            count, previous = self._script(_SLIDING_WINDOW, keys[0])(keys=keys, args=[2 * period * 1000])
+            return int(count), int(previous)
+        return self._count(key, period), self._closed_count(previous_key)
+
+    def _count(self, key, period):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # the window's first hit; add() is a no-op if another process won the race
+            self.cache.add(key, 0, timeout=2 * period)
+            return self.cache.incr(key)
+
+    def _closed_count(self, key):
+        with self._lock:
+            count = self._closed.get(key)
+        if count is None:
+            # a closed window doesn't change any more, so this process reads it once
+            count = self.cache.get(key, 0)
+            with self._lock:
+                if len(self._closed) >= self.max_closed:
+                    self._closed.clear()
+                self._closed[key] = count
+        return count
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        window, elapsed = divmod(now, period)
+        count, previous = self._counts(f'{key}:{int(window)}', f'{key}:{int(window) - 1}', period)
+        overlap = 1 - elapsed / period
+        if previous * overlap + count <= limit:
+            return True, 0
+        if count > limit or not previous:
+            return False, period - elapsed
+        # the previous window slides out until its share fits under the limit
+        return False, period * (1 - (limit - count) / previous) - elapsed
+
+
+# KEYS = this window, the previous one; ARGV[1] = milliseconds this window's key lives.
+# The expiry is set by the same atomic call that creates the key, so it can't be lost.
+_SLIDING_WINDOW = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return {count, tonumber(redis.call('GET', KEYS[2]) or 0)}
+"""
+
+
+# KEYS[1] = bucket; ARGV = capacity, tokens per second.
+# Returns {allowed, seconds to wait}; the wait as a string, Lua numbers would truncate.
+_TOKEN_BUCKET = """
+local capacity, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or capacity
+local at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisTokenBucketLimiter(RateLimiter):
+    """
+    Buckets of `limit` tokens refilled at limit/period per second: bursts up
+    to the limit, then the sustained rate. Needs THROTTLE_CACHE to be a
+    django.core.cache.backends.redis.RedisCache.
+    """
+
+    def __init__(self):
+        super().__init__()
+        if not self.is_redis():
+            raise ImproperlyConfigured('RedisTokenBucketLimiter needs THROTTLE_CACHE to be a RedisCache.')
+
+    def hit(self, key, limit, period):
+        key = self.cache.make_and_validate_key(key)
+        allowed, wait = self._script(_TOKEN_BUCKET, key)(keys=[key], args=[limit, limit / period])
+        return bool(allowed), float(wait)
+
+
+@lru_cache(maxsize=None)
+def get_limiter():
+    """The configured limiter; one instance per process."""
+    return import_string(getattr(settings, 'THROTTLE_BACKEND', 'ecommerce.throttling.SlidingWindowLimiter'))()
+
+
+def reset_limits():
+    """Forget every count: clears THROTTLE_CACHE and the limiter's memory of closed windows. For tests."""
+    get_limiter().cache.clear()
+    get_limiter.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_limiter(setting, **kwargs):
+    if setting in ('THROTTLE_BACKEND', 'THROTTLE_CACHE', 'CACHES'):
+        get_limiter.cache_clear()
+
+
+# --- DRF throttles ---
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """
+    A SimpleRateThrottle counted by get_limiter(). Subclasses set `kind` and
+    get_ident_value(); the rate is DEFAULT_THROTTLE_RATES["<view.throttle_scope>.<kind>"].
+    """
+    kind = None
+
+    def __init__(self):
+        # the rate depends on the view; it's looked up in allow_request()
+        pass
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        scope = getattr(view, 'throttle_scope', None)
+        self.scope = f'{scope}.{self.kind}'
+        # read per request rather than at import, so override_settings applies
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if scope is None or self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        ident = self.get_ident_value(request)
+        if ident is None:
+            return True
+        digest = hashlib.sha256(str(ident).encode()).hexdigest()[:32]
+        allowed, wait = get_limiter().hit(f'{KEY_PREFIX}:{self.scope}:{digest}', self.num_requests, self.duration)
+        if not allowed:
+            self.retry_after = max(1, math.ceil(wait))
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPRateThrottle(SharedRateThrottle):
+    """Per client address (honours NUM_PROXIES like DRF's throttles)."""
+    kind = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class UsernameRateThrottle(SharedRateThrottle):
+    """Per username being signed in to, whatever the address: slows down distributed guessing."""
+    kind = 'username'
+
+    def get_ident_value(self, request):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if username is None:
+            return None
+        return str(username).strip().lower() or None
+
+
+class UserRateThrottle(SharedRateThrottle):
+    """Per signed-in user; anonymous requests count per address."""
+    kind = 'user'
+
+    def get_ident_value(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
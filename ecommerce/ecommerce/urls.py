@@ -23,6 +23,8 @@ from rest_framework.decorators import api_view
 from django.http import HttpResponse
 from django.views.generic import RedirectView
 
+from ecommerce.metrics import MetricsView
+
 @api_view(['GET'])
 def api_root(request, format=None):
     return Response({
@@ -35,9 +37,14 @@ def home(request):
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/_metrics/', MetricsView.as_view(), name='request-metrics'),
     path('', home),
     path("api/accounts/", include("accounts.urls")),
     path('api/', include('products.urls')),
     path('', RedirectView.as_view(url='/api/accounts/')),
     path('api/', include('products.api.urls')),
+    path('api/', include('orders.urls')),
+    path('api/', include('payments.urls')),
+    # ASGI-native copies of the hot catalog reads (products/async_views.py)
+    path('api/async/', include('products.async_urls')),
 ]
@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import Reservation
 
-# Register your models here.
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "quantity", "status", "reference", "expires_at")
+    list_filter = ("status",)
+    search_fields = ("reference",)
+    raw_id_fields = ("product",)
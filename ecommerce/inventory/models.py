@@ -1,3 +1,65 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, "INVENTORY_RESERVATION_TTL", 15 * 60))
+
+
+def default_expiry():
+    return timezone.now() + reservation_ttl()
+
+
+# -------------------------
+# Reservation
+# -------------------------
+class Reservation(models.Model):
+    """
+    Stock held for a cart or order.
+
+    The product's stock is decremented when the reservation is made, so
+    Product.stock is always what is still available to sell. Committing keeps
+    the decrement; releasing or expiring puts the quantity back. Status only
+    ever leaves HELD once, through a conditional UPDATE, so a reservation
+    can't be both committed and returned to stock.
+    """
+
+    HELD = "held"
+    COMMITTED = "committed"
+    RELEASED = "released"
+    EXPIRED = "expired"
+    STATUS_CHOICES = [
+        (HELD, "Held"),
+        (COMMITTED, "Committed"),
+        (RELEASED, "Released"),
+        (EXPIRED, "Expired"),
+    ]
+
+    product = models.ForeignKey(
+        "products.Product",
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=HELD)
+    reference = models.CharField(max_length=64, blank=True, db_index=True)
+    expires_at = models.DateTimeField(default=default_expiry)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # the sweeper's scan: held reservations past their expiry
+            models.Index(fields=["status", "expires_at"], name="reservation_status_exp_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x product {self.product_id} ({self.status})"
 
-# Create your models here.
+    @property
+    def is_expired(self):
+        return self.status == self.HELD and self.expires_at <= timezone.now()
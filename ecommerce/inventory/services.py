@@ -0,0 +1,209 @@
+# inventory/services.py
+"""
+Stock reservation service.
+
+Product.stock is only ever moved by single conditional UPDATEs:
+
+    UPDATE products_product SET stock = stock - qty WHERE id = ... AND stock >= qty
+
+so concurrent reservations serialize on the row inside the database and
+can never drive stock below zero; the loser simply matches no row. A cart
+is reserved with one such statement for all of its products (the quantity
+comes from a CASE on the id), all-or-nothing.
+
+    reservations = reserve_many({product_id: qty, ...}, reference="cart-42")
+    commit_many(reservations)     # sold: keep the decrement
+    release_many(reservations)    # abandoned: put the stock back
+
+Reservations that are neither committed nor released before expires_at are
+returned to stock by release_expired() (manage.py release_expired_reservations).
+"""
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from products.models import Product
+from .models import Reservation, reservation_ttl
+
+
+class InventoryError(Exception):
+    pass
+
+
+class InsufficientStock(InventoryError):
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Insufficient stock for product(s): {', '.join(map(str, self.product_ids))}")
+
+
+class ReservationNotHeld(InventoryError):
+    """The reservation was already committed, released or expired."""
+
+    def __init__(self, reservation_ids):
+        self.reservation_ids = sorted(reservation_ids)
+        super().__init__(f"Reservation(s) no longer held: {', '.join(map(str, self.reservation_ids))}")
+
+
+class _Shortfall(Exception):
+    pass
+
+
+def _normalize(items):
+    """{product_id: qty} from a mapping or (product_id, qty) pairs, duplicates summed."""
+    pairs = items.items() if hasattr(items, "items") else items
+    quantities = defaultdict(int)
+    for product_id, qty in pairs:
+        if int(qty) <= 0:
+            raise ValueError(f"Quantity for product {product_id} must be positive.")
+        quantities[int(product_id)] += int(qty)
+    if not quantities:
+        raise ValueError("Nothing to reserve.")
+    # ascending id order, the same order every writer touches rows in
+    return dict(sorted(quantities.items()))
+
+
+def _per_product(quantities):
+    """A CASE expression yielding each product's quantity, or a plain value for one product."""
+    if len(quantities) == 1:
+        return Value(next(iter(quantities.values())))
+    return Case(
+        *[When(pk=product_id, then=Value(qty)) for product_id, qty in quantities.items()],
+        output_field=models.PositiveIntegerField(),
+    )
+
+
+def _take_stock(quantities):
+    """Decrement stock where enough is left; returns how many products were decremented."""
+    requested = _per_product(quantities)
+    return Product.objects.filter(pk__in=quantities, stock__gte=requested).update_stock(
+        quantities, F("stock") - requested
+    )
+
+
+def _return_stock(quantities):
+    requested = _per_product(quantities)
+    Product.objects.filter(pk__in=quantities).update_stock(quantities, F("stock") + requested)
+
+
+def _reservation_ids(reservations):
+    return [getattr(reservation, "pk", reservation) for reservation in reservations]
+
+
+def reserve(product_id, qty, reference="", ttl=None):
+    """Hold `qty` units of one product; raises InsufficientStock if they aren't there."""
+    return reserve_many({product_id: qty}, reference=reference, ttl=ttl)[0]
+
+
+def reserve_many(items, reference="", ttl=None):
+    """
+    Hold every line of a cart or none of them, with one UPDATE for the whole set.
+    Returns one Reservation per distinct product, in product id order.
+    """
+    quantities = _normalize(items)
+    expires_at = timezone.now() + (ttl if ttl is not None else reservation_ttl())
+    try:
+        with transaction.atomic():
+            if _take_stock(quantities) != len(quantities):
+                raise _Shortfall  # roll back the lines that did fit
+            return Reservation.objects.bulk_create([
+                Reservation(product_id=product_id, quantity=qty, reference=reference, expires_at=expires_at)
+                for product_id, qty in quantities.items()
+            ])
+    except _Shortfall:
+        stock = dict(Product.objects.filter(pk__in=quantities).values_list("pk", "stock"))
+        short = [pid for pid, qty in quantities.items() if stock.get(pid, 0) < qty]
+        # stock may have been returned since; still report the whole cart as failed
+        raise InsufficientStock(short or quantities) from None
+
+
+def commit(reservation):
+    commit_many([reservation])
+
+
+def commit_many(reservations):
+    """Mark held, unexpired reservations as sold. All or nothing."""
+    ids = _reservation_ids(reservations)
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Reservation.objects.filter(
+            pk__in=ids, status=Reservation.HELD, expires_at__gt=now,
+        ).update(status=Reservation.COMMITTED, updated_at=now)
+        if updated != len(set(ids)):
+            raise _not_held(ids, Reservation.COMMITTED, now)
+    _mark(reservations, Reservation.COMMITTED)
+
+
+def release(reservation):
+    release_many([reservation])
+
+
+def release_many(reservations):
+    """Return held reservations to stock. All or nothing."""
+    ids = _reservation_ids(reservations)
+    now = timezone.now()
+    with transaction.atomic():
+        # flip the status first: only the caller that wins this UPDATE restocks
+        updated = Reservation.objects.filter(pk__in=ids, status=Reservation.HELD).update(
+            status=Reservation.RELEASED, updated_at=now,
+        )
+        if updated != len(set(ids)):
+            raise _not_held(ids, Reservation.RELEASED, now)
+        _return_stock(_quantities(Reservation.objects.filter(pk__in=ids)))
+    _mark(reservations, Reservation.RELEASED)
+
+
+def release_expired(now=None, batch_size=500):
+    """Return every held reservation past its expiry to stock; returns how many were released."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            # skip rows another sweeper (or a commit/release) is working on
+            batch = list(
+                Reservation.objects.select_for_update(skip_locked=True)
+                .filter(status=Reservation.HELD, expires_at__lte=now)
+                .order_by("pk")
+                .values_list("pk", "product_id", "quantity")[:batch_size]
+            )
+            if not batch:
+                break
+            ids = [pk for pk, _, _ in batch]
+            expired = Reservation.objects.filter(pk__in=ids, status=Reservation.HELD).update(
+                status=Reservation.EXPIRED, updated_at=now,
+            )
+            if expired != len(batch):
+                # without row locks (SQLite) a concurrent commit/release can win some rows
+                batch = list(
+                    Reservation.objects.filter(pk__in=ids, status=Reservation.EXPIRED, updated_at=now)
+                    .values_list("pk", "product_id", "quantity")
+                )
+            if batch:
+                _return_stock(_quantities(batch))
+        released += len(batch)
+        if len(ids) < batch_size:
+            break
+    return released
+
+
+def _quantities(rows):
+    quantities = defaultdict(int)
+    if isinstance(rows, models.QuerySet):
+        rows = rows.values_list("pk", "product_id", "quantity")
+    for _, product_id, qty in rows:
+        quantities[product_id] += qty
+    return dict(sorted(quantities.items()))
+
+
+def _not_held(ids, status, now):
+    # called before the surrounding atomic block rolls back: the rows this call
+    # just moved to `status` were held, the rest were not
+    changed = Reservation.objects.filter(pk__in=ids, status=status, updated_at=now).values_list("pk", flat=True)
+    return ReservationNotHeld(set(ids) - set(changed))
+
+
+def _mark(reservations, status):
+    for reservation in reservations:
+        if isinstance(reservation, Reservation):
+            reservation.status = status
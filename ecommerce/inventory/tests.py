@@ -1,3 +1,185 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from products.models import Product
+from inventory import services
+from inventory.models import Reservation
+
+
+class ReservationServiceTestCase(TestCase):
+    def setUp(self):
+        self.phone = Product.objects.create(name="Phone", price=10, stock=5)
+        self.case = Product.objects.create(name="Case", price=2, stock=1)
+
+    def assertStock(self, product, expected):
+        product.refresh_from_db()
+        self.assertEqual(product.stock, expected)
+
+    def test_reserve_decrements_stock(self):
+        reservation = services.reserve(self.phone.pk, 3, reference="cart-1")
+        self.assertEqual(reservation.status, Reservation.HELD)
+        self.assertEqual(reservation.reference, "cart-1")
+        self.assertStock(self.phone, 2)
+
+    def test_reserve_more_than_stock_fails_without_change(self):
+        with self.assertRaises(services.InsufficientStock) as ctx:
+            services.reserve(self.phone.pk, 6)
+        self.assertEqual(ctx.exception.product_ids, [self.phone.pk])
+        self.assertStock(self.phone, 5)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_invalid_quantity(self):
+        with self.assertRaises(ValueError):
+            services.reserve(self.phone.pk, 0)
+
+    def test_commit_keeps_decrement(self):
+        reservation = services.reserve(self.phone.pk, 2)
+        services.commit(reservation)
+        self.assertEqual(reservation.status, Reservation.COMMITTED)
+        self.assertStock(self.phone, 3)
+        with self.assertRaises(services.ReservationNotHeld):
+            services.release(reservation)
+        self.assertStock(self.phone, 3)
+
+    def test_release_restocks_once(self):
+        reservation = services.reserve(self.phone.pk, 2)
+        services.release(reservation.pk)
+        self.assertStock(self.phone, 5)
+        with self.assertRaises(services.ReservationNotHeld):
+            services.release(reservation.pk)
+        self.assertStock(self.phone, 5)
+
+    def test_expired_reservation_cannot_be_committed(self):
+        reservation = services.reserve(self.phone.pk, 1, ttl=timedelta(seconds=-1))
+        with self.assertRaises(services.ReservationNotHeld):
+            services.commit(reservation)
+
+    def test_reserve_many_is_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            reservations = services.reserve_many([(self.phone.pk, 2), (self.case.pk, 1), (self.phone.pk, 1)])
+        updates = [q for q in ctx if q['sql'].startswith('UPDATE "products_product"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual([(r.product_id, r.quantity) for r in reservations], [(self.phone.pk, 3), (self.case.pk, 1)])
+        self.assertStock(self.phone, 2)
+        self.assertStock(self.case, 0)
+
+    def test_reserve_many_is_all_or_nothing(self):
+        with self.assertRaises(services.InsufficientStock) as ctx:
+            services.reserve_many({self.phone.pk: 2, self.case.pk: 2})
+        self.assertEqual(ctx.exception.product_ids, [self.case.pk])
+        self.assertStock(self.phone, 5)
+        self.assertStock(self.case, 1)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_commit_many_is_all_or_nothing(self):
+        held, released = services.reserve_many({self.phone.pk: 1, self.case.pk: 1})
+        services.release(released)
+        with self.assertRaises(services.ReservationNotHeld) as ctx:
+            services.commit_many([held, released])
+        self.assertEqual(ctx.exception.reservation_ids, [released.pk])
+        held.refresh_from_db()
+        self.assertEqual(held.status, Reservation.HELD)
+
+    def test_sweeper_releases_only_expired(self):
+        past = timedelta(seconds=-1)
+        services.reserve(self.phone.pk, 2, ttl=past)
+        services.reserve(self.phone.pk, 1, ttl=past)
+        services.reserve(self.case.pk, 1)
+        out = StringIO()
+        call_command('release_expired_reservations', '--batch-size', '1', stdout=out)
+        self.assertIn('Released 2 expired reservations', out.getvalue())
+        self.assertStock(self.phone, 5)
+        self.assertStock(self.case, 0)
+        self.assertEqual(Reservation.objects.filter(status=Reservation.EXPIRED).count(), 2)
+        self.assertEqual(services.release_expired(), 0)
+
+
+class ReservationConcurrencyTestCase(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS = 10
+    STOCK = 25
+
+    def run_threads(self, target):
+        errors = []
+
+        def worker():
+            try:
+                target()
+            except Exception as exc:  # surfaced in the main thread below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    @staticmethod
+    def retry_locked(func, *args):
+        # SQLite allows one writer at a time and reports contention as an error
+        # instead of waiting; PostgreSQL would block on the row lock instead
+        while True:
+            try:
+                return func(*args)
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                time.sleep(0.001)
+
+    def test_concurrent_reservations_never_oversell(self):
+        product = Product.objects.create(name="Hot item", price=10, stock=self.STOCK)
+        other = Product.objects.create(name="Accessory", price=1, stock=self.STOCK * 10)
+        outcomes = []
+
+        def buy():
+            for i in range(self.ATTEMPTS):
+                try:
+                    if i % 2:
+                        self.retry_locked(services.reserve, product.pk, 1)
+                    else:
+                        self.retry_locked(services.reserve_many, {product.pk: 2, other.pk: 1})
+                    outcomes.append('ok')
+                except services.InsufficientStock:
+                    outcomes.append('short')
+
+        self.run_threads(buy)
+
+        product.refresh_from_db()
+        other.refresh_from_db()
+        held = sum(Reservation.objects.filter(product=product).values_list('quantity', flat=True))
+        self.assertGreaterEqual(product.stock, 0)
+        self.assertEqual(product.stock + held, self.STOCK)
+        self.assertEqual(other.stock + sum(
+            Reservation.objects.filter(product=other).values_list('quantity', flat=True)
+        ), self.STOCK * 10)
+        self.assertIn('short', outcomes)  # demand exceeded supply, so some buyers lost
+        self.assertLessEqual(product.stock, 1)
+
+    def test_concurrent_release_and_sweep_restock_once(self):
+        product = Product.objects.create(name="Hot item", price=10, stock=self.STOCK)
+        reservations = [
+            services.reserve(product.pk, 1, ttl=timedelta(seconds=-1)) for _ in range(self.STOCK)
+        ]
+
+        def release_all():
+            for reservation in reservations:
+                try:
+                    self.retry_locked(services.release, reservation.pk)
+                except services.ReservationNotHeld:
+                    pass
+            self.retry_locked(services.release_expired, timezone.now(), 5)
+
+        self.run_threads(release_all)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, self.STOCK)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "queue", "status", "attempts", "available_at", "enqueued_at")
+    list_filter = ("status", "queue", "name")
+    search_fields = ("name",)
@@ -0,0 +1,247 @@
+# jobs/backends.py
+"""
+Where queued jobs live. settings.JOBS_BACKEND names the class.
+
+- DatabaseBackend (default): the jobs_job table. enqueue() inserts in the
+  caller's transaction, so workers see the job exactly when the data it
+  refers to is committed, and never if that transaction rolls back.
+- RedisBackend: a sorted set per queue scored by the time a job becomes
+  available, plus a hash of payloads. enqueue() pushes from
+  transaction.on_commit. Claims are one Lua script, atomic across workers.
+  Needs the `redis` package and JOBS_REDIS_URL.
+
+Claiming a job moves its availability one visibility timeout ahead under a
+new claim token; a worker that dies leaves the job to be claimed again
+after that, and a late complete()/retry() from it (stale token) is ignored.
+Delivery is therefore at-least-once: tasks must be idempotent.
+"""
+import json
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+class JobBackend:
+    def enqueue(self, job):
+        """Queue an unsaved Job once the current transaction commits."""
+        raise NotImplementedError
+
+    def enqueue_many(self, jobs):
+        for job in jobs:
+            self.enqueue(job)
+
+    def claim(self, queues, limit, visibility_timeout):
+        """Up to `limit` due jobs of `queues`, now invisible to other workers for `visibility_timeout`."""
+        raise NotImplementedError
+
+    def complete(self, job):
+        raise NotImplementedError
+
+    def retry(self, job, available_at, error):
+        raise NotImplementedError
+
+    def fail(self, job, error):
+        raise NotImplementedError
+
+    def stats(self):
+        """{queue: {"ready", "running", "scheduled", "failed", "lag_seconds"}}, across all workers."""
+        raise NotImplementedError
+
+
+class DatabaseBackend(JobBackend):
+    def enqueue(self, job):
+        job.save()
+
+    def enqueue_many(self, jobs):
+        Job.objects.bulk_create(jobs)
+
+    @staticmethod
+    def _due(now):
+        # QUEUED and due, or RUNNING past its visibility timeout (the worker was lost)
+        return Q(status__in=[Job.QUEUED, Job.RUNNING], available_at__lte=now)
+
+    def claim(self, queues, limit, visibility_timeout):
+        now = timezone.now()
+        ids = list(
+            Job.objects.filter(self._due(now), queue__in=queues)
+            .order_by("available_at", "id")
+            .values_list("pk", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        # conditional: of two workers that read the same ids, each job goes to one
+        Job.objects.filter(self._due(now), pk__in=ids).update(
+            status=Job.RUNNING, claim_token=token, available_at=now + visibility_timeout,
+            attempts=F("attempts") + 1, started_at=now,
+        )
+        return list(Job.objects.filter(pk__in=ids, claim_token=token))
+
+    @staticmethod
+    def _claimed(job):
+        return Job.objects.filter(pk=job.pk, claim_token=job.claim_token)
+
+    def complete(self, job):
+        self._claimed(job).delete()
+
+    def retry(self, job, available_at, error):
+        self._claimed(job).update(status=Job.QUEUED, available_at=available_at, claim_token="", last_error=error)
+
+    def fail(self, job, error):
+        self._claimed(job).update(status=Job.FAILED, claim_token="", last_error=error)
+
+    def stats(self):
+        now = timezone.now()
+        due = self._due(now)
+        rows = (
+            Job.objects.order_by("queue").values("queue").annotate(
+                ready=Count("pk", filter=due),
+                running=Count("pk", filter=Q(status=Job.RUNNING, available_at__gt=now)),
+                scheduled=Count("pk", filter=Q(status=Job.QUEUED, available_at__gt=now)),
+                failed=Count("pk", filter=Q(status=Job.FAILED)),
+                oldest=Min("available_at", filter=due),
+            )
+        )
+        return {
+            row.pop("queue"): {
+                **row, "lag_seconds": round((now - row.pop("oldest")).total_seconds(), 3) if row["oldest"] else 0.0,
+            }
+            for row in rows
+        }
+
+
+# KEYS: queue zset, payload hash, attempts hash; ARGV: now, limit, claimed-until (all ms)
+_CLAIM = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[1], ARGV[3], id)
+    table.insert(claimed, id)
+    table.insert(claimed, redis.call('HGET', KEYS[2], id))
+    table.insert(claimed, redis.call('HINCRBY', KEYS[3], id, 1))
+end
+return claimed
+"""
+
+# KEYS: queue zset, payload hash, attempts hash, failed hash; ARGV: id, token, action, [available_at, error]
+_SETTLE = """
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+if ARGV[3] == 'retry' then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+    return 1
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+if ARGV[3] == 'fail' then
+    redis.call('HSET', KEYS[4], ARGV[1], ARGV[5])
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return 1
+"""
+
+
+def _ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+class RedisBackend(JobBackend):
+    prefix = "jobs"
+
+    def __init__(self, url=None):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBackend needs the redis package.")
+        self.client = redis.Redis.from_url(url or settings.JOBS_REDIS_URL, decode_responses=True)
+        self._claim = self.client.register_script(_CLAIM)
+        self._settle = self.client.register_script(_SETTLE)
+
+    def _keys(self, queue):
+        return [f"{self.prefix}:{queue}:{part}" for part in ("ready", "payloads", "attempts", "failed")]
+
+    def enqueue(self, job):
+        job.pk = uuid.uuid4().hex
+        payload = json.dumps({
+            "name": job.name, "args": job.args, "kwargs": job.kwargs,
+            "max_attempts": job.max_attempts, "enqueued_at": _ms(job.enqueued_at),
+        })
+        ready, payloads = self._keys(job.queue)[:2]
+
+        def push():
+            with self.client.pipeline() as pipe:
+                pipe.sadd(f"{self.prefix}:queues", job.queue)
+                pipe.hset(payloads, job.pk, payload)
+                pipe.zadd(ready, {job.pk: _ms(job.available_at)})
+                pipe.execute()
+        transaction.on_commit(push)
+
+    def claim(self, queues, limit, visibility_timeout):
+        now = timezone.now()
+        until = _ms(now + visibility_timeout)
+        jobs = []
+        for queue in queues:
+            if len(jobs) >= limit:
+                break
+            claimed = self._claim(keys=self._keys(queue)[:3], args=[_ms(now), limit - len(jobs), until])
+            for pk, payload, attempts in zip(claimed[::3], claimed[1::3], claimed[2::3]):
+                data = json.loads(payload)
+                jobs.append(Job(
+                    pk=pk, queue=queue, name=data["name"], args=data["args"], kwargs=data["kwargs"],
+                    max_attempts=data["max_attempts"], attempts=int(attempts), status=Job.RUNNING,
+                    enqueued_at=datetime.fromtimestamp(data["enqueued_at"] / 1000, dt_timezone.utc),
+                    started_at=now, claim_token=str(until),
+                ))
+        return jobs
+
+    def complete(self, job):
+        self._settle(keys=self._keys(job.queue), args=[job.pk, job.claim_token, "complete"])
+
+    def retry(self, job, available_at, error):
+        self._settle(keys=self._keys(job.queue), args=[job.pk, job.claim_token, "retry", _ms(available_at), ""])
+
+    def fail(self, job, error):
+        failed = json.dumps({"name": job.name, "args": job.args, "kwargs": job.kwargs, "error": error})
+        self._settle(keys=self._keys(job.queue), args=[job.pk, job.claim_token, "fail", 0, failed])
+
+    def stats(self):
+        now = int(time.time() * 1000)
+        stats = {}
+        for queue in sorted(self.client.smembers(f"{self.prefix}:queues")):
+            ready, _, _, failed = self._keys(queue)
+            oldest = self.client.zrange(ready, 0, 0, withscores=True)
+            due = self.client.zcount(ready, "-inf", now)
+            stats[queue] = {
+                "ready": due,
+                # claimed and retrying jobs share the sorted set; they aren't told apart here
+                "running": None,
+                "scheduled": self.client.zcount(ready, f"({now}", "+inf"),
+                "failed": self.client.hlen(failed),
+                "lag_seconds": round((now - oldest[0][1]) / 1000, 3) if due else 0.0,
+            }
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """The configured backend; one instance per process."""
+    return import_string(settings.JOBS_BACKEND)()
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    if setting in ("JOBS_BACKEND", "JOBS_REDIS_URL"):
+        get_backend.cache_clear()
@@ -0,0 +1,104 @@
+import json
+import logging
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.backends import get_backend
+from jobs.worker import Worker
+
+logger = logging.getLogger("jobs.worker")
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (jobs/) on a pool of threads, optionally in several processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queues", default="default",
+            help="Comma-separated queues to take jobs from, in priority order (default: default).",
+        )
+        parser.add_argument("--threads", type=int, default=4, help="Jobs run at once per process (default: 4).")
+        parser.add_argument(
+            "--processes", type=int, default=1,
+            help="Worker processes, each with --threads threads (default: 1).",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when no job is due (default: 1).",
+        )
+        parser.add_argument(
+            "--visibility-timeout", type=int, default=None,
+            help="Seconds a claimed job stays hidden from other workers (default: JOBS_VISIBILITY_TIMEOUT).",
+        )
+        parser.add_argument(
+            "--stats-interval", type=float, default=60.0,
+            help="Seconds between JSON stats log lines, 0 to disable (default: 60).",
+        )
+        parser.add_argument(
+            "--burst", action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] <= 1:
+            self.work(options)
+            return
+        # children inherit no open connection; each opens its own
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        children = [context.Process(target=self.work, args=(options,)) for _ in range(options["processes"])]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
+
+    def work(self, options):
+        worker = Worker(
+            queues=[queue.strip() for queue in options["queues"].split(",") if queue.strip()],
+            concurrency=options["threads"],
+            poll_interval=options["poll_interval"],
+            visibility_timeout=options["visibility_timeout"],
+        )
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            # finish the running jobs, then exit
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous[signum] = signal.signal(signum, lambda signum, frame: worker.stop())
+
+        stop_reporting = threading.Event()
+        if options["stats_interval"] > 0:
+            def report():
+                while not stop_reporting.wait(options["stats_interval"]):
+                    self.log_stats(worker)
+            threading.Thread(target=report, daemon=True).start()
+
+        try:
+            worker.run(burst=options["burst"])
+        finally:
+            stop_reporting.set()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.log_stats(worker)
+        counts = worker.counts
+        self.stdout.write(self.style.SUCCESS(
+            f"Jobs: {counts['succeeded']} succeeded, {counts['retried']} retried, {counts['failed']} failed."
+        ))
+
+    @staticmethod
+    def log_stats(worker):
+        try:
+            queues = get_backend().stats()
+        finally:
+            close_old_connections()
+        logger.info(json.dumps({**worker.stats(), "queues": queues}))
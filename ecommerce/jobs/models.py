@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+def default_max_attempts():
+    return getattr(settings, "JOBS_MAX_ATTEMPTS", 5)
+
+
+# -------------------------
+# Job
+# -------------------------
+class Job(models.Model):
+    """
+    A queued call of a registered task (jobs/registry.py).
+
+    A worker claims a job by moving `available_at` one visibility timeout
+    ahead under a new `claim_token`. If the worker dies, the job becomes
+    available again once that time passes. A finished job is deleted; one
+    that used up its attempts stays FAILED with its last error.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=200)
+    queue = models.CharField(max_length=64, default="default")
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=default_max_attempts)
+    available_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["available_at", "id"]
+        indexes = [
+            # the workers' scan: due jobs of a queue, oldest first
+            models.Index(fields=["queue", "status", "available_at"], name="job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status}, attempt {self.attempts})"
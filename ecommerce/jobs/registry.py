@@ -0,0 +1,94 @@
+# jobs/registry.py
+"""
+Background tasks.
+
+A task is a function in some app's tasks.py (imported by JobsConfig.ready),
+registered under its dotted path:
+
+    from jobs.registry import task
+
+    @task(max_attempts=3)
+    def send_receipt(order_id):
+        ...
+
+    send_receipt.delay(order.pk)    # after the current transaction commits
+    send_receipt.delay_many([(pk,) for pk in order_ids])
+
+Arguments must be JSON values (pass ids, not model instances); delay()
+checks this at the call site, whatever the backend. `manage.py run_workers`
+runs the queued jobs, retrying failures with exponential backoff.
+
+With JOBS_EAGER = True (tests, local scripts) nothing is queued: the task
+runs in-process when the transaction commits, and its exceptions propagate.
+"""
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .backends import get_backend
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class Task:
+    def __init__(self, func, name, queue, max_attempts):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+    def delay(self, *args, **kwargs):
+        return self.schedule(args, kwargs)
+
+    def delay_many(self, calls):
+        """delay() for each args tuple in `calls`, queued in one write where the backend allows it."""
+        jobs = [self._job(args, {}, 0) for args in calls]
+        jobs = [job for job in jobs if job is not None]
+        if jobs:
+            get_backend().enqueue_many(jobs)
+        return jobs
+
+    def schedule(self, args=(), kwargs=None, countdown=0):
+        """Queue a call, to run `countdown` seconds from now at the earliest and never before the commit."""
+        job = self._job(args, kwargs, countdown)
+        if job is not None:
+            get_backend().enqueue(job)
+        return job
+
+    def _job(self, args, kwargs, countdown):
+        # the round trip rejects (and normalizes) what the queue couldn't store
+        args, kwargs = json.loads(json.dumps([list(args), kwargs or {}]))
+        if getattr(settings, "JOBS_EAGER", False):
+            transaction.on_commit(lambda: self.func(*args, **kwargs))
+            return None
+        now = timezone.now()
+        job = Job(
+            name=self.name, queue=self.queue, args=args, kwargs=kwargs,
+            available_at=now + timedelta(seconds=countdown), enqueued_at=now,
+        )
+        if self.max_attempts is not None:
+            job.max_attempts = self.max_attempts
+        return job
+
+
+def task(func=None, *, name=None, queue="default", max_attempts=None):
+    """Register `func` as a task; usable as @task or @task(queue=..., max_attempts=...)."""
+    def register(func):
+        registered = Task(func, name or f"{func.__module__}.{func.__qualname__}", queue, max_attempts)
+        if registry.setdefault(registered.name, registered) is not registered:
+            raise ValueError(f"Task {registered.name} is already registered.")
+        return registered
+    return register(func) if func is not None else register
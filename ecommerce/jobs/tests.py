@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from jobs.backends import get_backend
+from jobs.models import Job
+from jobs.registry import task
+from jobs.worker import Worker, backoff
+
+calls = []
+
+
+@task(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='jobs.tests.flaky', max_attempts=3)
+def flaky(failures):
+    calls.append('run')
+    if calls.count('run') <= failures:
+        raise RuntimeError('not yet')
+
+
+class JobTestCase(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def work(self):
+        worker = Worker(concurrency=2, poll_interval=0.01)
+        worker.run(burst=True)
+        return worker
+
+    def test_jobs_are_queued_with_the_transaction(self):
+        with transaction.atomic():
+            record.delay('kept')
+        try:
+            with transaction.atomic():
+                record.delay('lost')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(list(Job.objects.values_list('args', flat=True)), [['kept']])
+
+        worker = self.work()
+        self.assertEqual(calls, ['kept'])
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(worker.counts, {'succeeded': 1, 'retried': 0, 'failed': 0})
+        self.assertEqual(worker.stats()['runs']['jobs.tests.record']['count'], 1)
+
+    def test_delay_many_queues_in_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            record.delay_many([(i,) for i in range(3)])
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('INSERT')]), 1)
+        self.assertEqual(sorted(Job.objects.values_list('args', flat=True)), [[0], [1], [2]])
+        self.work()
+        self.assertEqual(sorted(calls), [0, 1, 2])
+
+    def test_run_workers_command(self):
+        for i in range(5):
+            record.delay(i)
+        with self.assertLogs('jobs.worker', 'INFO') as logs:
+            call_command('run_workers', '--burst', '--threads', '2', '--poll-interval', '0.01', stdout=StringIO())
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertIn('"succeeded": 5', logs.output[-1])
+
+    def test_arguments_must_be_json(self):
+        with self.assertRaises(TypeError):
+            record.delay(object())
+
+    def test_failures_are_retried_with_backoff(self):
+        flaky.delay(1)
+        before = timezone.now()
+        self.work()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('not yet', job.last_error)
+        self.assertGreaterEqual(job.available_at, before + timedelta(seconds=backoff(1) / 1.25 - 1))
+
+        self.work()   # not due yet
+        self.assertEqual(calls, ['run'])
+        Job.objects.update(available_at=timezone.now())
+        self.work()
+        self.assertEqual(calls, ['run', 'run'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_exhausted_jobs_fail(self):
+        flaky.delay(10)
+        for _ in range(3):
+            Job.objects.update(available_at=timezone.now())
+            worker = self.work()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertEqual(worker.counts['failed'], 1)
+
+    def test_lost_jobs_come_back_after_the_visibility_timeout(self):
+        record.delay('once')
+        backend = get_backend()
+        [lost] = backend.claim(['default'], 10, timedelta(minutes=5))
+        self.assertEqual(backend.claim(['default'], 10, timedelta(minutes=5)), [])
+
+        Job.objects.update(available_at=timezone.now())
+        [again] = backend.claim(['default'], 10, timedelta(minutes=5))
+        self.assertEqual(again.attempts, 2)
+        backend.complete(lost)   # the first worker wakes up late: ignored
+        self.assertTrue(Job.objects.exists())
+        backend.complete(again)
+        self.assertFalse(Job.objects.exists())
+
+    def test_queue_stats(self):
+        record.delay('now')
+        record.schedule(['later'], countdown=60)
+        Job.objects.filter(args=['now']).update(available_at=timezone.now() - timedelta(seconds=30))
+        stats = get_backend().stats()['default']
+        self.assertEqual((stats['ready'], stats['scheduled'], stats['running'], stats['failed']), (1, 1, 0, 0))
+        self.assertGreaterEqual(stats['lag_seconds'], 30)
+
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x',
+                                                      is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        self.assertEqual(client.get(reverse('request-metrics')).data['jobs']['default']['ready'], 1)
+
+
+@override_settings(JOBS_EAGER=True)
+class EagerJobTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_eager_jobs_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay('eager')
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['eager'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_paid_orders_are_confirmed_by_mail(self):
+        from orders.services import place_order
+        from payments.services import apply_updates
+        from payments.models import Payment
+        from products.models import Product
+
+        user = get_user_model().objects.create_user(username='buyer', email='buyer@example.com', password='x')
+        product = Product.objects.create(name="Phone", price=10, stock=1)
+        order = place_order(user, [(product.pk, 1)])
+        payment = Payment.objects.create(order=order, user=user, idempotency_key='k', fingerprint='x',
+                                         amount=order.total, currency='usd')
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_updates([(payment.reference, Payment.SUCCEEDED, 'ch_1', '')])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['buyer@example.com'])
+        self.assertIn('1 x Phone', mail.outbox[0].body)
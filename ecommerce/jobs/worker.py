@@ -0,0 +1,157 @@
+# jobs/worker.py
+"""
+The loop behind `manage.py run_workers`.
+
+A Worker claims due jobs (never more than it has idle threads, so a claimed
+job doesn't sit out its visibility timeout in a local backlog), runs each on
+a thread pool and settles it: success deletes the job; an exception
+schedules a retry after JOBS_RETRY_BACKOFF * 2 ** (attempt - 1) seconds,
+with jitter and capped at MAX_BACKOFF, or marks the job failed once its
+attempts are used up.
+
+Each run is measured like a request (ecommerce.metrics): time, queries and
+DB time by task name, and the wait from enqueue to first start by queue, in
+per-process histograms that stats() returns and run_workers logs. Queue
+depth and lag span all workers and come from the backend's stats().
+"""
+import logging
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ecommerce import metrics
+from .backends import get_backend
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 60 * 60
+
+
+def backoff(attempts):
+    """Seconds before retrying a job that failed its `attempts`-th run."""
+    delay = min(getattr(settings, "JOBS_RETRY_BACKOFF", 2) * 2 ** (attempts - 1), MAX_BACKOFF)
+    # jitter spreads out the retries of jobs that failed together
+    return delay * random.uniform(1, 1.25)
+
+
+class Worker:
+    def __init__(self, queues=("default",), concurrency=4, poll_interval=1.0, visibility_timeout=None,
+                 backend=None):
+        self.queues = list(queues)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.visibility_timeout = timedelta(
+            seconds=visibility_timeout or getattr(settings, "JOBS_VISIBILITY_TIMEOUT", 5 * 60),
+        )
+        self.backend = backend or get_backend()
+        self.runs = metrics.Registry()    # by task name
+        self.waits = metrics.Registry()   # by queue
+        self.counts = {"succeeded": 0, "retried": 0, "failed": 0}
+        self.stopping = threading.Event()
+        self._idle = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self._running = 0
+
+    def stop(self):
+        """Stop claiming; jobs already running finish first."""
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """Process jobs until stop(), or with `burst` until none are due or running."""
+        metrics.instrument_connections()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="jobs") as pool:
+            while not self.stopping.is_set():
+                if not self._idle.acquire(timeout=self.poll_interval):
+                    continue
+                free = 1
+                while free < self.concurrency and self._idle.acquire(blocking=False):
+                    free += 1
+                try:
+                    jobs = self.backend.claim(self.queues, free, self.visibility_timeout)
+                except Exception:
+                    logger.exception("Claiming jobs failed")
+                    jobs = []
+                    self.stopping.wait(self.poll_interval)
+                for _ in range(free - len(jobs)):
+                    self._idle.release()
+                with self._lock:
+                    self._running += len(jobs)
+                for job in jobs:
+                    pool.submit(self._run, job)
+                if jobs:
+                    continue
+                with self._lock:
+                    running = self._running
+                if burst and not running:
+                    break
+                self.stopping.wait(0.01 if burst else self.poll_interval)
+        close_old_connections()
+
+    def _run(self, job):
+        try:
+            self.execute(job)
+        except Exception:
+            # the backend failed to settle it; the visibility timeout hands it out again
+            logger.exception("Settling job %s failed", job.pk)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._running -= 1
+            self._idle.release()
+
+    def execute(self, job):
+        now = timezone.now()
+        if job.attempts == 1:
+            self.waits.observe(job.queue, (now - job.enqueued_at).total_seconds() * 1000, 0, 0, 0)
+        task = registry.get(job.name)
+        if task is None:
+            return self._fail(job, f"Unknown task {job.name!r}.")
+        if job.attempts > job.max_attempts:
+            return self._fail(job, f"Gave up after {job.max_attempts} attempts; the last worker was lost.")
+
+        error = None
+        start = time.perf_counter()
+        with metrics.collecting() as collected:
+            try:
+                task.func(*job.args, **job.kwargs)
+            except Exception:
+                error = traceback.format_exc()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.runs.observe(
+            job.name, elapsed_ms, collected.queries, collected.db_seconds * 1000, collected.serializer_seconds * 1000,
+        )
+
+        if error is None:
+            self.backend.complete(job)
+            self._count("succeeded")
+            logger.info("Job %s %s done in %.1f ms (attempt %s)", job.pk, job.name, elapsed_ms, job.attempts)
+        elif job.attempts >= job.max_attempts:
+            self._fail(job, error)
+        else:
+            delay = backoff(job.attempts)
+            self.backend.retry(job, timezone.now() + timedelta(seconds=delay), error)
+            self._count("retried")
+            logger.warning("Job %s %s failed (attempt %s/%s), retrying in %.1fs:\n%s",
+                           job.pk, job.name, job.attempts, job.max_attempts, delay, error)
+
+    def _fail(self, job, error):
+        self.backend.fail(job, error)
+        self._count("failed")
+        logger.error("Job %s %s failed for good:\n%s", job.pk, job.name, error)
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {"jobs": counts, "runs": self.runs.snapshot(), "waits": self.waits.snapshot()}
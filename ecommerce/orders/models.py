@@ -1,3 +1,83 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+def new_reference():
+    return uuid.uuid4().hex
+
+
+# -------------------------
+# Order
+# -------------------------
+class Order(models.Model):
+    """
+    A placed order. Its stock is held by inventory reservations carrying
+    `reservation_reference` until payment commits or expiry releases them.
+    """
+
+    PENDING = "pending"
+    PAID = "paid"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (PENDING, "Pending payment"),
+        (PAID, "Paid"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="orders",
+    )
+    reference = models.CharField(max_length=32, unique=True, default=new_reference, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # a customer's order history, newest first
+            models.Index(fields=["user", "-created_at"], name="order_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Order {self.reference} ({self.status})"
+
+    @property
+    def reservation_reference(self):
+        return f"order:{self.reference}"
+
+
+# -------------------------
+# Order line
+# -------------------------
+class OrderItem(models.Model):
+    """One product of an order, with its name and price as they were at checkout."""
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(
+        "products.Product",
+        on_delete=models.SET_NULL,   # the snapshot below keeps the line readable
+        related_name="order_items",
+        null=True,
+    )
+    product_name = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["order", "product_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["order", "product"], name="order_item_unique_product"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name}"
+
+    @property
+    def line_total(self):
+        return self.unit_price * self.quantity
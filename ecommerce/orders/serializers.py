@@ -0,0 +1,35 @@
+# orders/serializers.py
+from rest_framework import serializers
+
+from .models import Order, OrderItem
+from .services import MAX_LINES
+
+
+class CheckoutLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    items = CheckoutLineSerializer(many=True, allow_empty=False, max_length=MAX_LINES)
+
+    def lines(self):
+        return [(line['product'], line['quantity']) for line in self.validated_data['items']]
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['product', 'product_name', 'unit_price', 'quantity', 'line_total']
+        read_only_fields = fields
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'reference', 'status', 'total', 'items', 'created_at']
+        read_only_fields = fields
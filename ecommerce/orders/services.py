@@ -0,0 +1,92 @@
+# orders/services.py
+"""
+Checkout: a cart becomes an Order in one transaction, with the same handful
+of statements whatever the cart size:
+
+    SELECT ... FROM products_product WHERE id IN (...) ORDER BY id FOR UPDATE
+    UPDATE products_product SET stock = stock - CASE ... END WHERE ...   (inventory.reserve_many)
+    INSERT INTO inventory_reservation ...                                 (one row per line)
+    INSERT INTO orders_order ...
+    INSERT INTO orders_orderitem ...                                      (bulk_create)
+
+The product rows are locked in ascending id order before anything is
+written, so two checkouts sharing products always queue on the same first
+row instead of each holding one the other needs (no deadlocks on PostgreSQL;
+SQLite, which has no row locks, serializes writers anyway). Prices are
+snapshotted from those locked rows. The conditional stock UPDATE remains the
+guard against overselling: a cart that doesn't fit fails as a whole with
+InsufficientStock and nothing is written.
+
+    order = place_order(user, [(product_id, qty), ...])
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from inventory.services import reserve_many
+from products.models import Product
+from .models import Order, OrderItem, new_reference
+
+MAX_LINES = 100
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class ProductUnavailable(CheckoutError):
+    """Products that don't exist or aren't for sale."""
+
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Product(s) not available: {', '.join(map(str, self.product_ids))}")
+
+
+def _normalize(items):
+    """{product_id: qty} in ascending id order, duplicate lines summed."""
+    quantities = defaultdict(int)
+    for product_id, qty in items:
+        if int(qty) <= 0:
+            raise CheckoutError(f"Quantity for product {product_id} must be positive.")
+        quantities[int(product_id)] += int(qty)
+    if not quantities:
+        raise CheckoutError("The cart is empty.")
+    if len(quantities) > MAX_LINES:
+        raise CheckoutError(f"A cart can hold at most {MAX_LINES} products.")
+    return dict(sorted(quantities.items()))
+
+
+def place_order(user, items):
+    """
+    Reserve stock for every (product_id, qty) line and record the order, or
+    raise ProductUnavailable / InsufficientStock without changing anything.
+    """
+    quantities = _normalize(items)
+    reference = new_reference()
+    with transaction.atomic():
+        products = {
+            product.pk: product
+            for product in Product.objects.select_for_update()
+            .filter(pk__in=quantities, is_active=True)
+            .order_by("pk")
+            .only("pk", "name", "price")
+        }
+        unavailable = quantities.keys() - products.keys()
+        if unavailable:
+            raise ProductUnavailable(unavailable)
+
+        reserve_many(quantities, reference=f"order:{reference}")
+
+        lines = [
+            OrderItem(product_id=pk, product_name=products[pk].name, unit_price=products[pk].price, quantity=qty)
+            for pk, qty in quantities.items()
+        ]
+        order = Order.objects.create(
+            user=user, reference=reference,
+            total=sum((line.line_total for line in lines), Decimal("0.00")),
+        )
+        for line in lines:
+            line.order = order
+        OrderItem.objects.bulk_create(lines)
+    return order
@@ -0,0 +1,19 @@
+# orders/tasks.py
+from django.conf import settings
+from django.core.mail import send_mail
+
+from jobs.registry import task
+from .models import Order
+
+
+@task(max_attempts=8)
+def send_order_confirmation(order_id):
+    """Mail the customer once their order is paid; retried while the mail server is unreachable."""
+    order = Order.objects.select_related("user").prefetch_related("items").get(pk=order_id)
+    lines = "\n".join(f"  {item.quantity} x {item.product_name}  {item.line_total}" for item in order.items.all())
+    send_mail(
+        subject=f"Order {order.reference[:8]} confirmed",
+        message=f"Thank you for your order.\n\n{lines}\n\nTotal: {order.total}\n",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[order.user.email],
+    )
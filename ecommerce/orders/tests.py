@@ -1,3 +1,167 @@
-from django.test import TestCase
+import threading
+import time
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from inventory import services as inventory
+from inventory.models import Reservation
+from orders import services
+from orders.models import Order, OrderItem
+from products.models import Product
+
+User = get_user_model()
+
+
+class CheckoutTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.phone = Product.objects.create(name="Phone", price=Decimal('199.99'), stock=5)
+        self.case = Product.objects.create(name="Case", price=Decimal('9.50'), stock=10)
+
+    def checkout(self, *lines):
+        return self.client.post(reverse('checkout'), {
+            'items': [{'product': product.pk, 'quantity': qty} for product, qty in lines],
+        }, format='json')
+
+    def assertStock(self, product, expected):
+        product.refresh_from_db()
+        self.assertEqual(product.stock, expected)
+
+    def test_checkout_places_order(self):
+        response = self.checkout((self.case, 2), (self.phone, 1), (self.case, 1))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], Order.PENDING)
+        self.assertEqual(response.data['total'], '228.49')
+        self.assertEqual(
+            [(item['product'], item['quantity'], item['unit_price']) for item in response.data['items']],
+            [(self.phone.pk, 1, '199.99'), (self.case.pk, 3, '9.50')],
+        )
+        self.assertStock(self.phone, 4)
+        self.assertStock(self.case, 7)
+        order = Order.objects.get()
+        self.assertEqual(
+            set(Reservation.objects.values_list('reference', 'product_id', 'quantity', 'status')),
+            {(order.reservation_reference, self.phone.pk, 1, Reservation.HELD),
+             (order.reservation_reference, self.case.pk, 3, Reservation.HELD)},
+        )
+
+    def test_prices_are_snapshotted(self):
+        self.checkout((self.phone, 1))
+        self.phone.price = Decimal('149.00')
+        self.phone.save()
+        item = OrderItem.objects.get()
+        self.assertEqual((item.product_name, item.unit_price), ("Phone", Decimal('199.99')))
+
+    def test_insufficient_stock_writes_nothing(self):
+        response = self.checkout((self.case, 1), (self.phone, 6))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['product_ids'], [self.phone.pk])
+        self.assertStock(self.case, 10)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_unavailable_products(self):
+        hidden = Product.objects.create(name="Hidden", price=1, stock=5, is_active=False)
+        response = self.checkout((self.phone, 1), (hidden, 1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['product_ids'], [hidden.pk])
+        self.assertStock(self.phone, 5)
+
+        response = self.client.post(reverse('checkout'), {'items': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.checkout((self.phone, 0))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_cart(self):
+        products = Product.objects.bulk_create(
+            [Product(name=f"Item {i}", slug=f"item-{i}", price=i + 1, stock=5) for i in range(30)]
+        )
+        counts = []
+        for size in (1, 30):
+            with CaptureQueriesContext(connection) as ctx:
+                services.place_order(self.user, [(product.pk, 1) for product in products[:size]])
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[1], 10)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.checkout((self.phone, 1)).status_code,
+                      (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_order_history_is_per_user(self):
+        self.checkout((self.phone, 1))
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        services.place_order(other, [(self.case.pk, 1)])
+        response = self.client.get(reverse('order-list'))
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['items'][0]['product_name'], "Phone")
+
+
+class CheckoutConcurrencyTestCase(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS = 10
+    STOCK = 30
+
+    @staticmethod
+    def retry_locked(func, *args):
+        # SQLite allows one writer at a time and reports contention as an error;
+        # PostgreSQL would queue on the locked product row instead
+        while True:
+            try:
+                return func(*args)
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                time.sleep(0.001)
+
+    def test_parallel_checkouts_on_a_hot_sku_never_oversell(self):
+        hot = Product.objects.create(name="Hot item", price=10, stock=self.STOCK)
+        side = Product.objects.create(name="Accessory", price=1, stock=self.STOCK * 10)
+        users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(self.THREADS)
+        ]
+        outcomes, errors = [], []
+
+        def buy(user):
+            try:
+                for i in range(self.ATTEMPTS):
+                    # carts list the products in both orders; locking sorts them
+                    lines = [(hot.pk, 1 + i % 2), (side.pk, 1)] if i % 3 else [(side.pk, 1), (hot.pk, 1)]
+                    try:
+                        self.retry_locked(services.place_order, user, lines)
+                        outcomes.append('ok')
+                    except inventory.InsufficientStock:
+                        outcomes.append('short')
+            except Exception as exc:  # surfaced in the main thread below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        hot.refresh_from_db()
+        side.refresh_from_db()
+        sold = sum(OrderItem.objects.filter(product=hot).values_list('quantity', flat=True))
+        self.assertGreaterEqual(hot.stock, 0)
+        self.assertEqual(hot.stock + sold, self.STOCK)
+        self.assertEqual(side.stock + OrderItem.objects.filter(product=side).count(), self.STOCK * 10)
+        self.assertEqual(Order.objects.count(), outcomes.count('ok'))
+        self.assertIn('short', outcomes)  # demand exceeded supply
+        # every order is whole: two lines and its reservations
+        self.assertFalse(Order.objects.exclude(pk__in=OrderItem.objects.filter(product=side).values('order')).exists())
+        self.assertEqual(Reservation.objects.count(), OrderItem.objects.count())
@@ -0,0 +1,10 @@
+from django.urls import path
+from rest_framework.routers import SimpleRouter
+from .views import CheckoutView, OrderViewSet
+
+router = SimpleRouter()
+router.register(r'orders', OrderViewSet, basename='order')
+
+urlpatterns = [
+    path('checkout/', CheckoutView.as_view(), name='checkout'),
+] + router.urls
@@ -1,3 +1,50 @@
-from django.shortcuts import render
+# orders/views.py
+import logging
 
-# Create your views here.
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from inventory.services import InsufficientStock
+from products.pagination import StandardResultsSetPagination
+from .models import Order
+from .serializers import CheckoutSerializer, OrderSerializer
+from .services import CheckoutError, ProductUnavailable, place_order
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutView(APIView):
+    """
+    POST /api/checkout/ {"items": [{"product": <id>, "quantity": <n>}, ...]}
+
+    Places the order in one transaction (orders/services.py): 201 with the
+    order, 409 when some product hasn't enough stock, 400 for unknown or
+    inactive products. Nothing is written unless the whole cart fits.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            order = place_order(request.user, serializer.lines())
+        except InsufficientStock as e:
+            return Response({'detail': str(e), 'product_ids': e.product_ids}, status=status.HTTP_409_CONFLICT)
+        except ProductUnavailable as e:
+            return Response({'detail': str(e), 'product_ids': e.product_ids}, status=status.HTTP_400_BAD_REQUEST)
+        except CheckoutError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        logger.info("Order placed: reference=%s user=%s total=%s", order.reference, request.user, order.total)
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
+class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+    """The caller's orders, newest first."""
+    serializer_class = OrderSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        return Order.objects.filter(user=self.request.user).prefetch_related('items')
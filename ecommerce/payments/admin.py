@@ -1,3 +1,17 @@
 from django.contrib import admin
+from .models import Payment, WebhookEvent
 
-# Register your models here.
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ("id", "reference", "order", "user", "status", "amount", "created_at")
+    list_filter = ("status",)
+    search_fields = ("reference", "gateway_reference", "idempotency_key")
+    raw_id_fields = ("order", "user")
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("event_id", "type", "payment_reference", "received_at")
+    list_filter = ("type",)
+    search_fields = ("event_id", "payment_reference")
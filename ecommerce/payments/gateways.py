@@ -0,0 +1,192 @@
+# payments/gateways.py
+"""
+Payment gateway interface.
+
+settings.PAYMENT_GATEWAY names the class get_gateway() instantiates. A
+gateway charges and refunds over the network and turns its webhook
+deliveries into normalized events:
+
+    {"id": "evt_...", "type": "payment.succeeded", "status": "succeeded",
+     "reference": <Payment.reference>, "gateway_reference": "ch_...",
+     "failure_reason": "", "payload": <the raw event>}
+
+Every call carries an idempotency key, so a charge retried after a timeout
+is not taken twice at the gateway either. Gateway calls are slow and can
+hang; payments/services.py never makes them inside a database transaction.
+
+FakeGateway runs in-process for tests, benchmarks and local development.
+"""
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# webhook event type -> Payment status it reports
+EVENT_STATUSES = {
+    "payment.processing": "processing",
+    "payment.succeeded": "succeeded",
+    "payment.failed": "failed",
+    "payment.refunded": "refunded",
+}
+
+
+class GatewayError(Exception):
+    """The gateway couldn't be reached or didn't answer; the outcome is unknown."""
+
+
+class InvalidWebhook(GatewayError):
+    """A delivery that isn't validly signed or can't be read."""
+
+
+class Charge:
+    """A gateway's answer to a charge: `status` is "succeeded" or "failed"."""
+
+    def __init__(self, reference, status, failure_reason=""):
+        self.reference = reference
+        self.status = status
+        self.failure_reason = failure_reason
+
+    def __repr__(self):
+        return f"Charge({self.reference!r}, {self.status!r})"
+
+
+class PaymentGateway:
+    def charge(self, amount, currency, reference, idempotency_key):
+        """Charge `amount`; returns a Charge, raises GatewayError when the outcome is unknown."""
+        raise NotImplementedError
+
+    def refund(self, gateway_reference, amount, idempotency_key):
+        raise NotImplementedError
+
+    def parse_webhook(self, body, headers):
+        """The normalized events of one delivery; raises InvalidWebhook for forged ones."""
+        raise NotImplementedError
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Charges succeed, except amounts ending in .13 which are declined (like
+    the test card numbers of real gateways). `latency` adds a sleep to every
+    call and `fail_next(n)` makes the next n calls raise GatewayError, to
+    exercise timeouts. Webhooks are JSON bodies signed with
+    PAYMENT_WEBHOOK_SECRET in the X-Fake-Signature header; event() and
+    sign() build them.
+    """
+
+    SIGNATURE_HEADER = "X-Fake-Signature"
+    SIGNATURE_TOLERANCE = 300  # seconds, against replayed deliveries
+    DECLINED_CENTS = 13
+
+    def __init__(self, secret=None, latency=0.0):
+        secret = secret or getattr(settings, "PAYMENT_WEBHOOK_SECRET", None)
+        if not secret:
+            # an empty key would accept webhooks signed by anyone
+            raise ImproperlyConfigured("FakeGateway needs PAYMENT_WEBHOOK_SECRET.")
+        self.secret = secret.encode()
+        self.latency = latency
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self.charges = {}   # idempotency key -> Charge
+        self.refunds = {}   # idempotency key -> gateway reference
+        self.calls = []
+
+    def fail_next(self, count=1):
+        self._failures = count
+
+    def _call(self, name, idempotency_key):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((name, idempotency_key))
+            if self._failures:
+                self._failures -= 1
+                raise GatewayError("Gateway timed out.")
+
+    def charge(self, amount, currency, reference, idempotency_key):
+        self._call("charge", idempotency_key)
+        with self._lock:
+            if idempotency_key not in self.charges:
+                cents = int(Decimal(amount) * 100) % 100
+                self.charges[idempotency_key] = (
+                    Charge(f"ch_{uuid.uuid4().hex[:24]}", "failed", "Card declined.")
+                    if cents == self.DECLINED_CENTS
+                    else Charge(f"ch_{uuid.uuid4().hex[:24]}", "succeeded")
+                )
+            return self.charges[idempotency_key]
+
+    def refund(self, gateway_reference, amount, idempotency_key):
+        self._call("refund", idempotency_key)
+        with self._lock:
+            self.refunds.setdefault(idempotency_key, gateway_reference)
+
+    # webhooks
+
+    def event(self, type, reference, gateway_reference="", event_id=None, failure_reason=""):
+        return {
+            "id": event_id or f"evt_{uuid.uuid4().hex}",
+            "type": type,
+            "created": int(time.time()),
+            "data": {"reference": reference, "charge": gateway_reference, "failure_reason": failure_reason},
+        }
+
+    def sign(self, body, timestamp=None):
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        digest = hmac.new(self.secret, f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+        return f"t={timestamp},v1={digest}"
+
+    def parse_webhook(self, body, headers):
+        try:
+            parts = dict(part.split("=", 1) for part in headers.get(self.SIGNATURE_HEADER, "").split(","))
+            timestamp = int(parts["t"])
+            signature = parts["v1"]
+        except (KeyError, ValueError):
+            raise InvalidWebhook("Missing or malformed signature.")
+        if abs(time.time() - timestamp) > self.SIGNATURE_TOLERANCE:
+            raise InvalidWebhook("Signature timestamp out of tolerance.")
+        if not hmac.compare_digest(self.sign(body, timestamp), f"t={timestamp},v1={signature}"):
+            raise InvalidWebhook("Signature mismatch.")
+
+        try:
+            data = json.loads(body)
+            # one event per delivery, or {"events": [...]} for a batch
+            return [self._normalize(raw) for raw in data.get("events", [data])]
+        except (ValueError, AttributeError, KeyError, TypeError):
+            raise InvalidWebhook("Malformed event.")
+
+    @staticmethod
+    def _normalize(raw):
+        details = raw.get("data") or {}
+        return {
+            "id": str(raw["id"]),
+            "type": str(raw["type"]),
+            "status": EVENT_STATUSES.get(raw["type"]),
+            "reference": str(details.get("reference") or ""),
+            "gateway_reference": str(details.get("charge") or ""),
+            "failure_reason": str(details.get("failure_reason") or ""),
+            "payload": raw,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    """The configured gateway; one instance per process."""
+    return import_string(settings.PAYMENT_GATEWAY)()
+
+
+@receiver(setting_changed)
+def _reset_gateway(setting, **kwargs):
+    if setting in ("PAYMENT_GATEWAY", "PAYMENT_WEBHOOK_SECRET"):
+        get_gateway.cache_clear()
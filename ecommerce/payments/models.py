@@ -1,3 +1,89 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+def new_reference():
+    return uuid.uuid4().hex
+
+
+# -------------------------
+# Payment
+# -------------------------
+class Payment(models.Model):
+    """
+    One attempt to charge an order.
+
+    A client request is identified by (user, idempotency_key), so a retried
+    POST finds the payment it already made instead of charging again. Status
+    only moves forward (payments/services.py TRANSITIONS), through conditional
+    UPDATEs, so webhook events arriving late or twice can't undo a result.
+    """
+
+    CREATED = "created"
+    PROCESSING = "processing"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    REFUNDED = "refunded"
+    STATUS_CHOICES = [
+        (CREATED, "Created"),
+        (PROCESSING, "Processing"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+        (REFUNDED, "Refunded"),
+    ]
+    ACTIVE = (CREATED, PROCESSING, SUCCEEDED)
+    FINISHED = (SUCCEEDED, FAILED, REFUNDED)
+
+    order = models.ForeignKey("orders.Order", on_delete=models.CASCADE, related_name="payments")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="payments",
+    )
+    idempotency_key = models.CharField(max_length=64)
+    # what the key was first used for; the same key with another request is refused
+    fingerprint = models.CharField(max_length=64)
+    # our id for the charge at the gateway, echoed back in its webhooks
+    reference = models.CharField(max_length=32, unique=True, default=new_reference, editable=False)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=CREATED)
+    gateway_reference = models.CharField(max_length=64, blank=True)
+    failure_reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "idempotency_key"], name="payment_unique_idempotency_key"),
+            # an order can be retried after a failure, but never paid twice
+            models.UniqueConstraint(
+                fields=["order"], condition=models.Q(status__in=["created", "processing", "succeeded"]),
+                name="payment_one_active_per_order",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Payment {self.reference} ({self.status})"
+
+
+# -------------------------
+# Webhook event
+# -------------------------
+class WebhookEvent(models.Model):
+    """A gateway event, stored once per event id whatever the number of deliveries."""
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=64)
+    payment_reference = models.CharField(max_length=32, blank=True, db_index=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-received_at", "-id"]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id}"
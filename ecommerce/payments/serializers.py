@@ -0,0 +1,18 @@
+# payments/serializers.py
+from rest_framework import serializers
+
+from .models import Payment
+
+
+class PaymentCreateSerializer(serializers.Serializer):
+    order = serializers.IntegerField(min_value=1)
+
+
+class PaymentSerializer(serializers.ModelSerializer):
+    order = serializers.ReadOnlyField(source='order.reference')
+
+    class Meta:
+        model = Payment
+        fields = ['id', 'reference', 'order', 'amount', 'currency', 'status', 'failure_reason',
+                  'created_at', 'updated_at']
+        read_only_fields = fields
@@ -0,0 +1,251 @@
+# payments/services.py
+"""
+Paying orders.
+
+    payment, replayed = pay_order(user, order, idempotency_key)
+    new = ingest_events(gateway.parse_webhook(body, headers))
+
+pay_order() is safe to retry with the same key: the first request records
+a Payment for (user, key), claims it CREATED -> PROCESSING with a
+conditional UPDATE and only then calls the gateway, so concurrent retries
+can't both charge; later ones get the recorded result back. A payment left
+PROCESSING by a crashed or timed-out request can be claimed again once its
+lease runs out, and the gateway dedups the charge on the same key.
+
+The gateway is called with no transaction open. The database work around
+it is a few short transactions, so a slow gateway holds a connection but no
+locks; _assert_no_transaction() enforces this, including under
+ATOMIC_REQUESTS, which the payment views opt out of.
+
+Webhook events are stored by event id (a redelivery is skipped) and applied
+as forward-only transitions (TRANSITIONS), so duplicates and out-of-order
+deliveries converge on the same state: a late "processing" after
+"succeeded", or "failed" after "succeeded", matches no row and does nothing.
+Whichever path first moves a payment to SUCCEEDED settles its order, once:
+the order becomes PAID, its stock reservations are committed and its
+confirmation mail is queued (orders/tasks.py). If the
+reservations already expired the order is cancelled and the charge refunded.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from inventory.models import Reservation
+from inventory.services import ReservationNotHeld, commit_many, release_many
+from orders.models import Order
+from orders.tasks import send_order_confirmation
+from .gateways import GatewayError, get_gateway
+from .models import Payment, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# a PROCESSING payment whose request died can be claimed again after this
+PROCESSING_LEASE = timedelta(seconds=30)
+
+# new status -> statuses it may replace
+TRANSITIONS = {
+    Payment.PROCESSING: (Payment.CREATED,),
+    Payment.SUCCEEDED: (Payment.CREATED, Payment.PROCESSING),
+    Payment.FAILED: (Payment.CREATED, Payment.PROCESSING),
+    Payment.REFUNDED: (Payment.CREATED, Payment.PROCESSING, Payment.SUCCEEDED),
+}
+
+
+class PaymentError(Exception):
+    pass
+
+
+class OrderNotPayable(PaymentError):
+    def __init__(self, order):
+        self.order = order
+        super().__init__(f"Order {order.reference} is {order.status}, not awaiting payment.")
+
+
+class PaymentInProgress(PaymentError):
+    """Another request is paying this order right now."""
+
+
+class IdempotencyKeyReused(PaymentError):
+    """The key was already used for a different request."""
+
+
+def _fingerprint(order, currency):
+    return hashlib.sha256(f"{order.pk}:{order.total}:{currency}".encode()).hexdigest()
+
+
+def _assert_no_transaction():
+    if connection.in_atomic_block:
+        raise RuntimeError("Gateway calls must not be made inside a database transaction.")
+
+
+def pay_order(user, order, idempotency_key):
+    """
+    Charge `order` once per (user, idempotency_key). Returns (payment, replayed);
+    the payment is left PROCESSING when the gateway didn't answer.
+    """
+    currency = settings.PAYMENT_CURRENCY
+    fingerprint = _fingerprint(order, currency)
+    payment = Payment.objects.filter(user=user, idempotency_key=idempotency_key).first()
+    replayed = payment is not None
+    if payment is None:
+        if order.status != Order.PENDING:
+            raise OrderNotPayable(order)
+        try:
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    order=order, user=user, idempotency_key=idempotency_key, fingerprint=fingerprint,
+                    amount=order.total, currency=currency,
+                )
+        except IntegrityError:
+            # the same key raced us, or another key is already paying this order
+            payment = Payment.objects.filter(user=user, idempotency_key=idempotency_key).first()
+            if payment is None:
+                raise PaymentInProgress(f"Order {order.reference} already has a payment in progress.")
+            replayed = True
+
+    if payment.fingerprint != fingerprint:
+        raise IdempotencyKeyReused(f"Idempotency key {idempotency_key!r} was used for another request.")
+    if payment.status in Payment.FINISHED:
+        return payment, True
+    if not _claim(payment):
+        raise PaymentInProgress(f"Payment {payment.reference} is being processed.")
+
+    _assert_no_transaction()
+    try:
+        charge = get_gateway().charge(
+            payment.amount, payment.currency, payment.reference, idempotency_key=payment.reference,
+        )
+    except GatewayError:
+        logger.warning("Gateway error charging payment %s; left processing", payment.reference, exc_info=True)
+    else:
+        apply_updates([(payment.reference, charge.status, charge.reference, charge.failure_reason)])
+    payment.refresh_from_db()
+    return payment, replayed
+
+
+def _claim(payment):
+    """CREATED (or PROCESSING past its lease) -> PROCESSING; only one caller wins."""
+    now = timezone.now()
+    claimable = Q(status=Payment.CREATED) | Q(status=Payment.PROCESSING, updated_at__lt=now - PROCESSING_LEASE)
+    return Payment.objects.filter(claimable, pk=payment.pk).update(status=Payment.PROCESSING, updated_at=now) == 1
+
+
+def apply_updates(updates):
+    """
+    Apply (payment reference, status, gateway reference, failure reason)
+    updates as forward-only transitions; returns how many payments changed.
+    """
+    with transaction.atomic():
+        changed, refunds = _apply(updates)
+    for payment in refunds:
+        _refund(payment)
+    return changed
+
+
+def _apply(updates):
+    by_status = {}
+    for reference, status, gateway_reference, failure_reason in updates:
+        if status in TRANSITIONS and reference:
+            by_status.setdefault(status, {})[reference] = (gateway_reference, failure_reason)
+
+    changed, refunds = 0, []
+    now = timezone.now()
+    # in lifecycle order, so a batch holding both "processing" and "succeeded" ends succeeded
+    for status in (Payment.PROCESSING, Payment.SUCCEEDED, Payment.FAILED, Payment.REFUNDED):
+        group = by_status.get(status)
+        if not group:
+            continue
+        winners = list(
+            Payment.objects.select_for_update(of=("self",))
+            .select_related("order")
+            .filter(reference__in=group, status__in=TRANSITIONS[status])
+        )
+        for payment in winners:
+            gateway_reference, failure_reason = group[payment.reference]
+            payment.status = status
+            payment.gateway_reference = gateway_reference or payment.gateway_reference
+            payment.failure_reason = failure_reason
+            payment.updated_at = now
+        Payment.objects.bulk_update(winners, ["status", "gateway_reference", "failure_reason", "updated_at"])
+        changed += len(winners)
+        if status == Payment.SUCCEEDED:
+            refunds += _settle(winners)
+    return changed, refunds
+
+
+def _settle(payments):
+    """Mark the orders of newly succeeded payments paid; returns the payments to refund."""
+    if not payments:
+        return []
+    by_reference = {payment.order.reservation_reference: payment for payment in payments}
+    reservations = {reference: [] for reference in by_reference}
+    for reservation in Reservation.objects.filter(reference__in=by_reference):
+        reservations[reservation.reference].append(reservation)
+
+    paid, cancelled, refunds = [], [], []
+    for reference, payment in by_reference.items():
+        try:
+            commit_many(reservations[reference])
+        except ReservationNotHeld:
+            # paid too late: the stock went back on sale
+            release_many([r for r in reservations[reference] if r.status == Reservation.HELD])
+            cancelled.append(payment.order_id)
+            refunds.append(payment)
+        else:
+            paid.append(payment.order_id)
+
+    now = timezone.now()
+    Order.objects.filter(pk__in=paid, status=Order.PENDING).update(status=Order.PAID, updated_at=now)
+    for order_id in paid:
+        send_order_confirmation.delay(order_id)
+    if cancelled:
+        Order.objects.filter(pk__in=cancelled, status=Order.PENDING).update(status=Order.CANCELLED, updated_at=now)
+    return refunds
+
+
+def _refund(payment):
+    _assert_no_transaction()
+    try:
+        get_gateway().refund(payment.gateway_reference, payment.amount, idempotency_key=f"refund:{payment.reference}")
+    except GatewayError:
+        # the order is cancelled either way; the refund needs a retry from the gateway dashboard
+        logger.error("Gateway error refunding payment %s", payment.reference, exc_info=True)
+        return
+    logger.info("Refunded payment %s for expired order %s", payment.reference, payment.order.reference)
+    apply_updates([(payment.reference, Payment.REFUNDED, "", "Order expired before payment.")])
+
+
+def ingest_events(events):
+    """
+    Store and apply normalized webhook events (see gateways.py). Returns how
+    many were new; events already stored are skipped.
+    """
+    events = {event["id"]: event for event in events}
+    seen = set(WebhookEvent.objects.filter(event_id__in=events).values_list("event_id", flat=True))
+    fresh = [event for event_id, event in events.items() if event_id not in seen]
+    if not fresh:
+        return 0
+    with transaction.atomic():
+        # recorded in the same transaction as their effect: a failed delivery is retried whole
+        WebhookEvent.objects.bulk_create(
+            [
+                WebhookEvent(
+                    event_id=event["id"], type=event["type"],
+                    payment_reference=event["reference"], payload=event["payload"],
+                )
+                for event in fresh
+            ],
+            ignore_conflicts=True,   # a concurrent redelivery; its transitions are no-ops
+        )
+        _, refunds = _apply(
+            (event["reference"], event["status"], event["gateway_reference"], event["failure_reason"])
+            for event in fresh
+        )
+    for payment in refunds:
+        _refund(payment)
+    return len(fresh)
@@ -1,3 +1,215 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from inventory.models import Reservation
+from orders import services as orders
+from orders.models import Order
+from payments import services
+from payments.gateways import get_gateway
+from payments.models import Payment, WebhookEvent
+from products.models import Product
+
+User = get_user_model()
+
+
+def retry_locked(func, *args):
+    # SQLite allows one writer at a time and reports contention as an error
+    while True:
+        try:
+            return func(*args)
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            time.sleep(0.001)
+
+
+# TransactionTestCase: payments refuse to call the gateway inside a transaction,
+# and TestCase wraps every test in one
+class PaymentTestCase(TransactionTestCase):
+    def setUp(self):
+        self.gateway = get_gateway()
+        self.gateway.reset()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.phone = Product.objects.create(name="Phone", price=Decimal('199.99'), stock=5)
+        self.order = orders.place_order(self.user, [(self.phone.pk, 2)])
+
+    def pay(self, order=None, key='key-1'):
+        return self.client.post(reverse('payment-list'), {'order': (order or self.order).pk},
+                                format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def charges(self):
+        return [call for call in self.gateway.calls if call[0] == 'charge']
+
+    def test_payment_settles_order(self):
+        response = self.pay()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['status'], response.data['amount']), (Payment.SUCCEEDED, '399.98'))
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.PAID)
+        self.assertEqual(list(Reservation.objects.values_list('status', flat=True)), [Reservation.COMMITTED])
+        self.assertEqual(self.client.get(reverse('payment-list')).data['count'], 1)
+
+    def test_retries_replay_without_charging_again(self):
+        first = self.pay()
+        for _ in range(3):
+            response = self.pay()
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response['Idempotent-Replayed'], 'true')
+            self.assertEqual(response.data, first.data)
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertEqual(len(self.charges()), 1)
+        # a new key can't pay the order again
+        self.assertEqual(self.pay(key='key-2').status_code, status.HTTP_409_CONFLICT)
+
+    def test_key_reused_for_another_order(self):
+        self.pay()
+        other = orders.place_order(self.user, [(self.phone.pk, 1)])
+        self.assertEqual(self.pay(other).status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_key_is_required(self):
+        response = self.client.post(reverse('payment-list'), {'order': self.order.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.pay().status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_declined_payment_can_be_retried_with_a_new_key(self):
+        cheap = Product.objects.create(name="Cable", price=Decimal('3.13'), stock=5)
+        order = orders.place_order(self.user, [(cheap.pk, 1)])
+        response = self.pay(order)
+        self.assertEqual(response.status_code, status.HTTP_402_PAYMENT_REQUIRED)
+        self.assertEqual(response.data['failure_reason'], "Card declined.")
+        self.assertEqual(self.pay(order)['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.pay(order, key='key-2').status_code, status.HTTP_402_PAYMENT_REQUIRED)
+        self.assertEqual(len(self.charges()), 2)
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.PENDING)
+
+    def test_gateway_timeout_is_retried_with_the_same_key(self):
+        self.gateway.fail_next()
+        response = self.pay()
+        self.assertEqual((response.status_code, response.data['status']), (status.HTTP_202_ACCEPTED, Payment.PROCESSING))
+        # still within the lease of the first request
+        self.assertEqual(self.pay().status_code, status.HTTP_409_CONFLICT)
+
+        Payment.objects.update(updated_at=timezone.now() - services.PROCESSING_LEASE - timedelta(seconds=1))
+        response = self.pay()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        payment = Payment.objects.get()
+        # both attempts reached the gateway with the payment's own key: one charge
+        self.assertEqual(self.charges(), [('charge', payment.reference)] * 2)
+        self.assertEqual(len(self.gateway.charges), 1)
+
+    def test_gateway_is_never_called_inside_a_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                services.pay_order(self.user, self.order, 'key-1')
+        self.assertEqual(self.charges(), [])
+
+    def test_concurrent_retries_charge_once(self):
+        self.gateway.latency = 0.02
+        results, errors = [], []
+
+        def pay():
+            try:
+                results.append(retry_locked(services.pay_order, self.user, self.order, 'key-1'))
+            except services.PaymentInProgress:
+                results.append(None)
+            except Exception as exc:  # surfaced in the main thread below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=pay) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.charges()), 1)
+        self.assertEqual(Payment.objects.get().status, Payment.SUCCEEDED)
+
+
+class WebhookTestCase(TransactionTestCase):
+    def setUp(self):
+        self.gateway = get_gateway()
+        self.gateway.reset()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.client = APIClient()
+        self.phone = Product.objects.create(name="Phone", price=Decimal('10.00'), stock=5)
+        self.order = orders.place_order(self.user, [(self.phone.pk, 1)])
+        # a payment whose charge request timed out: only the gateway knows the outcome
+        self.payment = Payment.objects.create(
+            order=self.order, user=self.user, idempotency_key='key-1', fingerprint='x',
+            amount=self.order.total, currency='usd', status=Payment.PROCESSING,
+        )
+
+    def deliver(self, *events, signature=None):
+        body = json.dumps(events[0] if len(events) == 1 else {'events': list(events)}).encode()
+        return self.client.post(reverse('payment-webhook'), body, content_type='application/json',
+                                HTTP_X_FAKE_SIGNATURE=signature or self.gateway.sign(body))
+
+    def event(self, type, **kwargs):
+        return self.gateway.event(type, self.payment.reference, gateway_reference='ch_1', **kwargs)
+
+    def test_out_of_order_and_duplicate_events(self):
+        succeeded = self.event('payment.succeeded')
+        response = self.deliver(succeeded)
+        self.assertEqual(response.data, {'received': 1, 'new': 1})
+        # redelivered, then older events arriving late
+        self.assertEqual(self.deliver(succeeded).data, {'received': 1, 'new': 0})
+        self.assertEqual(self.deliver(self.event('payment.processing'), self.event('payment.failed')).data['new'], 2)
+
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.gateway_reference), (Payment.SUCCEEDED, 'ch_1'))
+        self.assertEqual(self.order.status, Order.PAID)
+        self.assertEqual(Reservation.objects.get().status, Reservation.COMMITTED)
+        self.assertEqual(WebhookEvent.objects.count(), 3)
+
+    def test_batch_in_any_order_ends_the_same(self):
+        self.deliver(self.event('payment.succeeded'), self.event('payment.processing'))
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.SUCCEEDED)
+
+    def test_payment_after_reservation_expired_is_refunded(self):
+        Reservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.deliver(self.event('payment.succeeded'))
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.phone.refresh_from_db()
+        self.assertEqual((self.payment.status, self.order.status), (Payment.REFUNDED, Order.CANCELLED))
+        self.assertEqual(self.gateway.refunds, {f'refund:{self.payment.reference}': 'ch_1'})
+        self.assertEqual(self.phone.stock, 5)
+
+    def test_forged_deliveries_are_rejected(self):
+        response = self.deliver(self.event('payment.succeeded'), signature='t=1,v1=bad')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        body = b'{"id": "evt_1"}'
+        response = self.client.post(reverse('payment-webhook'), body, content_type='application/json',
+                                    HTTP_X_FAKE_SIGNATURE=self.gateway.sign(body))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WebhookEvent.objects.exists())
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PROCESSING)
+
+    @override_settings(PAYMENT_WEBHOOK_SECRET='')
+    def test_gateway_needs_a_webhook_secret(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_gateway()
@@ -0,0 +1,10 @@
+from django.urls import path
+from rest_framework.routers import SimpleRouter
+from .views import PaymentViewSet, PaymentWebhookView
+
+router = SimpleRouter()
+router.register(r'payments', PaymentViewSet, basename='payment')
+
+urlpatterns = [
+    path('payments/webhook/', PaymentWebhookView.as_view(), name='payment-webhook'),
+] + router.urls
@@ -1,3 +1,93 @@
-from django.shortcuts import render
+# payments/views.py
+import logging
 
-# Create your views here.
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from rest_framework import status, viewsets
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from orders.models import Order
+from products.pagination import StandardResultsSetPagination
+from .gateways import InvalidWebhook, get_gateway
+from .models import Payment
+from .serializers import PaymentCreateSerializer, PaymentSerializer
+from .services import IdempotencyKeyReused, OrderNotPayable, PaymentInProgress, ingest_events, pay_order
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# the response a payment's outcome gets, the same on every replay
+OUTCOME_STATUS = {
+    Payment.SUCCEEDED: status.HTTP_201_CREATED,
+    Payment.REFUNDED: status.HTTP_201_CREATED,
+    Payment.FAILED: status.HTTP_402_PAYMENT_REQUIRED,
+    Payment.PROCESSING: status.HTTP_202_ACCEPTED,   # gateway timed out; the webhook settles it
+    Payment.CREATED: status.HTTP_202_ACCEPTED,
+}
+
+
+# gateway calls are made outside transactions (payments/services.py), so these
+# views opt out of ATOMIC_REQUESTS
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    GET  /api/payments/       the caller's payments
+    POST /api/payments/ {"order": <id>} with an Idempotency-Key header
+
+    Retrying a POST with the same key never charges twice: it returns the
+    first request's outcome with `Idempotent-Replayed: true`. 201 paid,
+    402 declined, 202 still processing (retry later with the same key),
+    409 when the order can't be paid or another payment for it is running,
+    422 when the key was used for a different request.
+    """
+    serializer_class = PaymentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        return Payment.objects.filter(user=self.request.user).select_related('order')
+
+    def create(self, request):
+        key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+        if not key or len(key) > 64:
+            return Response({'detail': f'An {IDEMPOTENCY_HEADER} header of at most 64 characters is required.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = PaymentCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = get_object_or_404(Order, pk=serializer.validated_data['order'], user=request.user)
+        try:
+            payment, replayed = pay_order(request.user, order, key)
+        except IdempotencyKeyReused as e:
+            return Response({'detail': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except (OrderNotPayable, PaymentInProgress) as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        logger.info("Payment %s for order %s: %s", payment.reference, order.reference, payment.status)
+        response = Response(PaymentSerializer(payment).data, status=OUTCOME_STATUS[payment.status])
+        if replayed:
+            response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class PaymentWebhookView(APIView):
+    """
+    POST /api/payments/webhook/, called by the gateway.
+
+    Deliveries are authenticated by the gateway's signature, not a user.
+    Each event is stored once by id and applied as a forward-only status
+    change, so redeliveries and out-of-order events are cheap no-ops.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        try:
+            events = get_gateway().parse_webhook(request.body, request.headers)
+        except InvalidWebhook as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        new = ingest_events(events)
+        return Response({'received': len(events), 'new': new})
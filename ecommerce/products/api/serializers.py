@@ -1,27 +1,33 @@
 from rest_framework import serializers
 from django.utils.text import slugify
 from products.models import Category, Product
+from products.serializers import CategorySerializer as CategoryBriefSerializer, SparseFieldsMixin
 
-class ProductBriefSerializer(serializers.ModelSerializer):
+class ProductBriefSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = ('id', 'title', 'price')  # keep brief; expand as needed
+        fields = ('id', 'name', 'price')  # keep brief; expand as needed
+        expandable = {'category': CategoryBriefSerializer}
 
 class CategorySerializer(serializers.ModelSerializer):
     products_count = serializers.IntegerField(read_only=True)
+    active_products_count = serializers.IntegerField(read_only=True)
     products = serializers.SerializerMethodField()
     slug = serializers.SlugField(required=False)
 
     class Meta:
         model = Category
-        fields = ('id', 'name', 'slug', 'description', 'products_count', 'products', 'created_at')
-        read_only_fields = ('created_at', 'products_count')
+        fields = ('id', 'name', 'slug', 'description', 'products_count', 'active_products_count', 'products', 'created_at')
+        read_only_fields = ('created_at', 'products_count', 'active_products_count')
 
     def get_products(self, obj):
         # include nested products only when client asks: ?include_products=true
         request = self.context.get('request', None)
         if request and request.query_params.get('include_products', 'false').lower() in ('1','true','yes'):
-            qs = obj.products.all()  # related_name 'products'
+            # CategoryViewSet prefetches these for the whole page; fall back for other callers
+            qs = getattr(obj, 'prefetched_products', None)
+            if qs is None:
+                qs = obj.products.all()  # related_name 'products'
             return ProductBriefSerializer(qs, many=True).data
         return []
 
@@ -2,34 +2,37 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Count
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
 
+from products import conditional
 from products.models import Category, Product
-from .serializers import CategorySerializer
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 15
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+from products.pagination import CategoryProductsPagination, StandardResultsSetPagination
+from products.row_serializers import RowSerializer
+from .serializers import CategorySerializer, ProductBriefSerializer
 
 class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all().annotate(products_count=Count('products'))
+    queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['name', 'slug']                    # simple exact filters
     search_fields = ['name', 'description']                # full-text-ish search
-    ordering_fields = ['name', 'created_at', 'products_count']
+    ordering_fields = ['name', 'created_at', 'products_count', 'active_products_count']
     ordering = ['name']
     pagination_class = StandardResultsSetPagination
+    max_products_limit = 100
+    # list() fast paths; nested products (?include_products=true) still go through CategorySerializer
+    row_serializer = RowSerializer(CategorySerializer, extra=('updated_at',), computed={'products': lambda row: []})
+    product_row_serializer = RowSerializer(ProductBriefSerializer, extra=('created_at', 'id'))
 
     def get_queryset(self):
-        # annotate products_count (ensure present if not)
-        qs = Category.objects.all().annotate(products_count=Count('products'))
-        # optional filtering by min_products / max_products
+        # products_count is a stored column kept in step by Product writes, no GROUP BY needed
+        qs = Category.objects.all()
         request = self.request
+        if self.action in ('list', 'retrieve') and self.include_products():
+            qs = qs.prefetch_related(self.get_products_prefetch())
+        # optional filtering by min_products / max_products
         minp = request.query_params.get('min_products')
         maxp = request.query_params.get('max_products')
         if minp is not None:
@@ -46,6 +49,70 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 pass
         return qs
 
+    def list(self, request, *args, **kwargs):
+        """
+        Same payload as ModelViewSet.list, plus an ETag computed
+        from the fetched page so If-None-Match gets a 304 without serializing.
+        """
+        queryset = self.list_queryset()
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        etag = conditional.collection_etag(
+            request, rows, self.row_validator_parts,
+            conditional.page_envelope(self.paginator) if page is not None else None,
+        )
+        response = conditional.not_modified(request, etag)
+        if response is None:
+            data = self.serialize_list(rows)
+            response = self.get_paginated_response(data) if page is not None else Response(data)
+        return conditional.set_validators(response, etag)
+
+    def include_products(self):
+        return self.request.query_params.get('include_products', 'false').lower() in ('1','true','yes')
+
+    def list_queryset(self):
+        """The filtered list: dict rows unless nested products were asked for. Shared with the async view."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset if self.include_products() else self.row_serializer.queryset(queryset)
+
+    def serialize_list(self, rows):
+        if self.include_products():
+            return self.get_serializer(rows, many=True).data
+        return self.row_serializer.serialize(rows)
+
+    @staticmethod
+    def row_validator_parts(category):
+        # the counters are written with F() updates that leave updated_at alone
+        if isinstance(category, dict):
+            return (
+                category['id'], category['updated_at'].isoformat(),
+                category['products_count'], category['active_products_count'], None,
+            )
+        products = getattr(category, 'prefetched_products', None)
+        return (
+            category.pk, category.updated_at.isoformat(),
+            category.products_count, category.active_products_count,
+            None if products is None else [(p.pk, p.updated_at.isoformat()) for p in products],
+        )
+
+    def get_products_prefetch(self):
+        """
+        One extra query for the whole page instead of one per category.
+        ?products_limit=N keeps only the N newest products of each category;
+        Django turns the sliced prefetch into a ROW_NUMBER() window partitioned
+        by category, so the cap is applied in the database.
+        """
+        products = Product.objects.order_by('-created_at', '-id').only('id', 'name', 'price', 'category_id', 'updated_at')
+        limit = self.request.query_params.get('products_limit')
+        if limit is not None:
+            try:
+                limit = min(int(limit), self.max_products_limit)
+                if limit >= 0:
+                    products = products[:limit]
+            except ValueError:
+                pass
+        return Prefetch('products', queryset=products, to_attr='prefetched_products')
+
     def destroy(self, request, *args, **kwargs):
         """
         Delete behavior:
@@ -55,7 +122,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         """
         instance = self.get_object()
         products_qs = instance.products.all()
-        count = products_qs.count()
+        count = instance.products_count
 
         delete_products = request.query_params.get('delete_products', 'false').lower() in ('1','true','yes')
         reassign_to = request.query_params.get('reassign_to')
@@ -73,7 +140,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 new_cat = Category.objects.get(pk=int(reassign_to))
             except (ValueError, Category.DoesNotExist):
                 return Response({"detail": "Invalid reassign_to category id."}, status=status.HTTP_400_BAD_REQUEST)
-            # reassign
+            # reassign (ProductQuerySet.update moves the counters along with the rows)
             products_qs.update(category=new_cat)
             instance.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -82,19 +149,38 @@ class CategoryViewSet(viewsets.ModelViewSet):
             "detail": "Category contains products. Use ?delete_products=true to delete products, or ?reassign_to=<id> to move products before deletion."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=True, methods=['get'], url_path='products', url_name='category-products')
+    @action(detail=True, methods=['get'], url_path='products', url_name='category-products',
+            pagination_class=CategoryProductsPagination)
     def list_products(self, request, pk=None):
         """
         Extra endpoint: /categories/{pk}/products/ to list products belonging to a category.
         Accepts pagination, ordering, filtering via query params if desired.
+        ?fields=id,name and ?expand=category work as on /products/.
+        ?pagination=cursor switches to keyset pagination for deep pages.
+        ?include_descendants=true also lists products of every subcategory.
         """
         category = self.get_object()
-        qs = category.products.all()
+        qs = self.category_products_queryset(category)
         # simple pagination using view's pagination_class
         page = self.paginate_queryset(qs)
-        from products.api.serializers import ProductBriefSerializer
+        rows = self.get_product_row_serializer()
         if page is not None:
-            serializer = ProductBriefSerializer(page, many=True, context={'request': request})
-            return self.get_paginated_response(serializer.data)
-        serializer = ProductBriefSerializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(qs))
+
+    def get_product_row_serializer(self):
+        """product_row_serializer narrowed by ?fields= / ?expand=category, as on /products/."""
+        options = ProductBriefSerializer.sparse_options(self.request.query_params)
+        return self.product_row_serializer.variant(**options)
+
+    def category_products_queryset(self, category):
+        """
+        The products of `category` as dict rows with just the brief fields asked
+        for (plus created_at and id for cursors); the category is joined only when expanded.
+        """
+        include_descendants = self.request.query_params.get('include_descendants', 'false').lower() in ('1','true','yes')
+        if include_descendants:
+            qs = Product.objects.filter(category_id__in=category.subtree_ids())
+        else:
+            qs = category.products.all()
+        return self.get_product_row_serializer().queryset(qs)
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+SEARCH_MIGRATION = ('products', '0007_product_search_index')
+
+
+def repair_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+    from .search import install_search_index
+
+    # only while the search migration is applied (not after migrating back past it)
+    if SEARCH_MIGRATION in MigrationRecorder(connections[using]).applied_migrations():
+        install_search_index(using=using)
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        # SQLite table rebuilds during later migrations drop the FTS triggers
+        post_migrate.connect(repair_search_index, sender=self)
@@ -0,0 +1,169 @@
+# products/async_views.py
+"""
+ASGI-native versions of the hot catalog reads:
+
+    GET /api/async/products/                      ProductViewSet.list
+    GET /api/async/products/<id>/                 ProductViewSet.retrieve
+    GET /api/async/categories/                    CategoryViewSet.list
+    GET /api/async/categories/<id>/products/      CategoryViewSet.list_products
+
+They return the same payloads, ETags/304s and X-Cache behaviour as the sync
+endpoints. The viewsets still build the querysets, filters, serializers and
+pagination envelopes, all pure Python; only the I/O moves to the async ORM
+(aget/acount/async iteration) and the async cache API. Under an ASGI server a
+request waiting on the cache, the database or a slow client then doesn't
+pin a worker thread. Django's database drivers are still synchronous, so
+each query itself runs on the request's thread-sensitive executor.
+
+Users are authenticated from the session (request.auser()). The views are
+read-only and opt out of ATOMIC_REQUESTS, which async views can't use.
+"""
+from functools import wraps
+
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from . import cache as product_cache, conditional
+from .api.views import CategoryViewSet
+from .views import ProductViewSet
+
+_renderer = JSONRenderer()
+
+
+def render(data, status=200, headers=None):
+    """What DRF's JSONRenderer would send for `data`, without the APIView machinery."""
+    response = HttpResponse(_renderer.render(data), status=status, content_type=_renderer.media_type)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def render_data(data):
+    """render(), keeping the payload on the response so cached() can store it."""
+    response = render(data)
+    response.data = data
+    return response
+
+
+def async_api_view(view):
+    """
+    Wrap an async view taking a DRF Request: session user resolved with
+    auser(), DRF exceptions rendered the way DRF's exception handler does.
+    """
+    @require_safe
+    @transaction.non_atomic_requests
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        drf_request = Request(request, authenticators=())
+        drf_request.user = await request.auser()
+        drf_request.auth = None
+        try:
+            return await view(drf_request, *args, **kwargs)
+        except (APIException, Http404, PermissionDenied) as exc:
+            response = exception_handler(exc, {'request': drf_request})
+            # keep WWW-Authenticate / Retry-After, not the unrendered response's Content-Type
+            headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+            return render(response.data, response.status_code, headers)
+    return wrapper
+
+
+def viewset(cls, action, request, **kwargs):
+    """A viewset instance set up the way the router would for `action`, checked against its permissions."""
+    initkwargs = getattr(getattr(cls, action), 'kwargs', {})
+    view = cls(action=action, request=request, args=(), kwargs=kwargs, format_kwarg=None, **initkwargs)
+    view.check_permissions(request)
+    return view
+
+
+async def paginated(view, queryset):
+    """(rows, envelope, payload builder) for one page of `queryset`, fetched asynchronously."""
+    request = view.request
+    page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+    if page is None:
+        # no page size configured: stream the rows instead of holding one big result cache
+        rows = [row async for row in queryset.aiterator(chunk_size=2000)]
+        return rows, None, lambda data: data
+    return page, conditional.page_envelope(view.paginator), lambda data: view.paginator.get_paginated_response(data).data
+
+
+async def render_collection(view, queryset, row_parts, serialize):
+    """The list() flow of both viewsets: page, ETag from the rows, 304 or serialized payload."""
+    rows, envelope, wrap = await paginated(view, queryset)
+    etag = conditional.collection_etag(view.request, rows, row_parts, envelope)
+    response = conditional.not_modified(view.request, etag)
+    if response is None:
+        response = render_data(wrap(serialize(rows)))
+    return conditional.set_validators(response, etag)
+
+
+async def cached(view, kind, make_key, build):
+    """ProductViewSet.cached_response with async cache calls."""
+    if not product_cache.is_enabled():
+        return await build()
+    key = await make_key()
+    entry = await product_cache.alookup(kind, key)
+    if entry is not None:
+        data, etag, last_modified = entry
+        response = conditional.not_modified(view.request, etag, last_modified) or render(data)
+        conditional.set_validators(response, etag, last_modified)
+        response['X-Cache'] = 'HIT'
+        return response
+    response = await build()
+    if response.status_code == 200:
+        await product_cache.astore(key, response.data, *conditional.response_validators(response))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+# --- products ---
+
+@async_api_view
+async def product_list(request):
+    view = viewset(ProductViewSet, 'list', request)
+
+    def build():
+        return render_collection(view, view.list_queryset(), view.row_validator_parts, view.serialize_list)
+
+    return await cached(view, 'list', lambda: product_cache.alist_key(request), build)
+
+
+@async_api_view
+async def product_detail(request, pk):
+    view = viewset(ProductViewSet, 'retrieve', request, pk=pk)
+
+    async def build():
+        instance = await aget_object_or_404(view.filter_queryset(view.get_queryset()), pk=pk)
+        view.check_object_permissions(request, instance)
+        etag, last_modified = view.detail_validators(instance)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = render_data(view.get_serializer(instance).data)
+        return conditional.set_validators(response, etag, last_modified)
+
+    return await cached(view, 'detail', lambda: product_cache.adetail_key(request, pk), build)
+
+
+# --- categories ---
+
+@async_api_view
+async def category_list(request):
+    view = viewset(CategoryViewSet, 'list', request)
+    return await render_collection(view, view.list_queryset(), view.row_validator_parts, view.serialize_list)
+
+
+@async_api_view
+async def category_products(request, pk):
+    view = viewset(CategoryViewSet, 'list_products', request, pk=pk)
+    category = await aget_object_or_404(view.filter_queryset(view.get_queryset()), pk=pk)
+    view.check_object_permissions(request, category)
+    rows, _, wrap = await paginated(view, view.category_products_queryset(category))
+    return render(wrap(view.get_product_row_serializer().serialize(rows)))
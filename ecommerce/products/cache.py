@@ -0,0 +1,257 @@
+# products/cache.py
+"""
+Versioned read-through cache for ProductViewSet list/retrieve responses.
+
+Entries never expire on a timer. Instead every key embeds a version that
+writes bump, so stale entries simply stop being addressed (and age out of
+the cache backend's LRU):
+
+- list pages: keyed by the global catalog generation, bumped by every
+  product write, stock movements (checkout, reservations) included;
+- detail responses: keyed by the product's own version, bumped when that
+  product changes or is deleted (or touched by a bulk queryset write), and
+  by the detail generation, bumped instead when a write touches more than
+  PRODUCT_CACHE_INVALIDATE_THRESHOLD products at once;
+- responses with ?expand= embed categories, so their keys also carry the
+  category generation, bumped by every category save.
+
+Both are split by audience, because non-staff users only see active products.
+Entries keep the response's ETag/Last-Modified next to its data, so a
+conditional request that hits the cache is answered without the database.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import conditional
+
+GENERATION_KEY = 'products:generation'
+VERSION_KEY = 'products:version:{pk}'
+DETAILS_KEY = 'products:details'
+CATEGORIES_KEY = 'products:categories'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'PRODUCT_CACHE_ALIAS', 'default')]
+
+
+def is_enabled():
+    return getattr(settings, 'PRODUCT_CACHE_ENABLED', True)
+
+
+def invalidate_threshold():
+    # more products than this in one write: drop every detail entry rather than write a version each
+    return getattr(settings, 'PRODUCT_CACHE_INVALIDATE_THRESHOLD', 100)
+
+
+def cache_timeout():
+    # None = keep until evicted; versions make expiry unnecessary for correctness
+    return getattr(settings, 'PRODUCT_CACHE_TIMEOUT', None)
+
+
+# --- version counters ---
+
+def _read_counter(key):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        # Seed from the clock rather than 1: if the counter was evicted, a
+        # restart at 1 could readdress entries written under the old value.
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def _read_counters(*keys):
+    # _read_counter for several keys in one round trip (two on a miss)
+    cache = get_cache()
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        values.update(cache.get_many(missing))
+    return [values[key] for key in keys]
+
+
+def _bump_counter(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def catalog_generation():
+    return _read_counter(GENERATION_KEY)
+
+
+def product_version(pk):
+    """The product's own version and the detail generation, as one key part."""
+    return '.'.join(map(str, _read_counters(VERSION_KEY.format(pk=pk), DETAILS_KEY)))
+
+
+def _now_and_on_commit(func):
+    # Bump immediately so this request stops reading old entries, and again
+    # after commit in case a concurrent reader re-cached pre-commit data.
+    func()
+    transaction.on_commit(func)
+
+
+def invalidate_catalog():
+    if is_enabled():
+        _now_and_on_commit(lambda: _bump_counter(GENERATION_KEY))
+
+
+def invalidate_categories():
+    if is_enabled():
+        _now_and_on_commit(lambda: _bump_counter(CATEGORIES_KEY))
+
+
+def invalidate_products(pks):
+    """
+    Bump the catalog generation and the versions of `pks`, in two cache round
+    trips. `pks` is read up to one past invalidate_threshold(); past that the
+    detail generation is bumped instead, so pass a sliced queryset for writes
+    that may touch the whole catalog.
+    """
+    if not is_enabled():
+        return
+    threshold = invalidate_threshold()
+    pks = list(islice(pks, threshold + 1))
+
+    def bump():
+        if len(pks) > threshold:
+            _bump_counter(DETAILS_KEY)
+        else:
+            get_cache().set_many({VERSION_KEY.format(pk=pk): time.time_ns() for pk in pks}, timeout=None)
+        _bump_counter(GENERATION_KEY)
+
+    _now_and_on_commit(bump)
+
+
+# --- response keys ---
+
+def audience(request):
+    user = request.user
+    return 'staff' if user.is_authenticated and user.is_staff else 'public'
+
+
+def _params_digest(request):
+    params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+    # the path tells the sync and async endpoints apart: their pagination links differ
+    raw = repr((request.get_host(), request.path, params))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _expands(request):
+    return 'expand' in request.query_params
+
+
+def _categories_part(request):
+    return f':{_read_counter(CATEGORIES_KEY)}' if _expands(request) else ''
+
+
+def list_key(request):
+    return (f'products:list:{catalog_generation()}{_categories_part(request)}:'
+            f'{audience(request)}:{_params_digest(request)}')
+
+
+def detail_key(request, pk):
+    return (f'products:detail:{pk}:{product_version(pk)}{_categories_part(request)}:'
+            f'{audience(request)}:{_params_digest(request)}')
+
+
+# --- read-through ---
+
+def _record(kind, outcome):
+    with _stats_lock:
+        _stats[f'{kind}_{outcome}'] += 1
+
+
+def cache_stats():
+    """Hit/miss counters for this process, e.g. {'list_hit': 10, 'list_miss': 2}."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _checked(kind, entry):
+    if not isinstance(entry, tuple):
+        entry = None  # also drops bare-data entries written before validators were kept
+    _record(kind, 'miss' if entry is None else 'hit')
+    return entry
+
+
+def lookup(kind, key):
+    """The cached (data, etag, last_modified) for `key`, or None."""
+    return _checked(kind, get_cache().get(key))
+
+
+def store(key, response):
+    # only successful responses, and only their .data, so rendering still
+    # follows content negotiation on a hit
+    if response.status_code == 200:
+        entry = (response.data, *conditional.response_validators(response))
+        get_cache().set(key, entry, timeout=cache_timeout())
+
+
+# --- async counterparts, for products/async_views.py ---
+
+async def _aread_counter(key):
+    cache = get_cache()
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        value = await cache.aget(key)
+    return value
+
+
+async def _aread_counters(*keys):
+    cache = get_cache()
+    values = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            await cache.aadd(key, now, timeout=None)
+        values.update(await cache.aget_many(missing))
+    return [values[key] for key in keys]
+
+
+async def _acategories_part(request):
+    return f':{await _aread_counter(CATEGORIES_KEY)}' if _expands(request) else ''
+
+
+async def alist_key(request):
+    generation = await _aread_counter(GENERATION_KEY)
+    return (f'products:list:{generation}{await _acategories_part(request)}:'
+            f'{audience(request)}:{_params_digest(request)}')
+
+
+async def adetail_key(request, pk):
+    version = '.'.join(map(str, await _aread_counters(VERSION_KEY.format(pk=pk), DETAILS_KEY)))
+    return (f'products:detail:{pk}:{version}{await _acategories_part(request)}:'
+            f'{audience(request)}:{_params_digest(request)}')
+
+
+async def alookup(kind, key):
+    return _checked(kind, await get_cache().aget(key))
+
+
+async def astore(key, data, etag, last_modified=None):
+    await get_cache().aset(key, (data, etag, last_modified), timeout=cache_timeout())
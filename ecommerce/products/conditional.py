@@ -0,0 +1,81 @@
+# products/conditional.py
+"""
+Conditional GET helpers (ETag / Last-Modified) for the catalog endpoints.
+
+Validators are computed from model rows the view has already loaded, never
+from the serialized payload, so a matching If-None-Match / If-Modified-Since
+is answered with 304 before any serializer or renderer runs.
+
+- a single object: its pk, updated_at and the foreign keys the payload
+  exposes (a category deleted under a product nulls category_id without
+  touching updated_at);
+- a collection page: the request's query string, the page envelope (total
+  count or has-next/has-previous) and every row's validator parts. Pages get
+  an ETag only: a row leaving the page doesn't move the newest updated_at,
+  so a Last-Modified date could answer If-Modified-Since wrongly.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def make_etag(parts):
+    """Strong ETag over an arbitrary tuple of values."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def _attribute(instance, path):
+    for name in path.split('.'):
+        if instance is None:
+            return None
+        instance = getattr(instance, name)
+    return instance
+
+
+def object_validators(instance, *related):
+    """
+    (etag, last_modified) for one row; `related` names extra attributes to
+    fold in, dotted to reach into loaded relations ('category.updated_at').
+    """
+    parts = (type(instance).__name__, instance.pk, instance.updated_at.isoformat(),
+             tuple(_attribute(instance, name) for name in related))
+    return make_etag(parts), _timestamp(instance.updated_at)
+
+
+def page_envelope(paginator):
+    """What a paginated response reports besides its rows."""
+    # PageOrCursorPagination wraps the paginator actually used for this request
+    paginator = getattr(paginator, 'paginator', paginator)
+    page = getattr(paginator, 'page', None)
+    if hasattr(page, 'paginator'):
+        return ('page', page.number, page.paginator.count)
+    return ('cursor', getattr(paginator, 'has_next', None), getattr(paginator, 'has_previous', None))
+
+
+def collection_etag(request, rows, row_parts, envelope=None):
+    """ETag for a list response built from `rows`."""
+    params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+    return make_etag((params, envelope, [row_parts(row) for row in rows]))
+
+
+def not_modified(request, etag, last_modified=None):
+    """A 304 response when the client's copy is current, else None."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def response_validators(response):
+    """Read the validators back from a response, e.g. to keep them with a cached copy."""
+    return response.get('ETag'), parse_http_date_safe(response.get('Last-Modified', ''))
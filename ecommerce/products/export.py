@@ -0,0 +1,102 @@
+# products/export.py
+"""
+Streaming catalog export, shared by /api/products/export/ and
+`manage.py export_products`.
+
+Rows are read with values_list().iterator(), so no Product instances or
+serializers are built and memory stays flat: the database cursor is walked
+`chunk_size` rows at a time and every row is encoded and handed to the
+consumer before the next chunk is fetched.
+"""
+import csv
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+
+from .models import CategoryClosure, Product
+
+# (output column, ORM path)
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('slug', 'slug'),
+    ('name', 'name'),
+    ('description', 'description'),
+    ('price', 'price'),
+    ('stock', 'stock'),
+    ('is_active', 'is_active'),
+    ('category_id', 'category_id'),
+    ('category_slug', 'category__slug'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 2000
+
+
+def parse_since(value):
+    """A timestamp or a date (midnight, current time zone); None if unparseable."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(category=None, is_active=None, since=None, queryset=None):
+    """
+    Products to export, in id order. `category` includes its whole subtree;
+    `since` keeps rows updated at or after it, for incremental syncs.
+    """
+    qs = Product.objects.all() if queryset is None else queryset
+    if category is not None:
+        qs = qs.filter(category_id__in=CategoryClosure.objects.filter(ancestor_id=category).values('descendant_id'))
+    if is_active is not None:
+        qs = qs.filter(is_active=is_active)
+    if since is not None:
+        qs = qs.filter(updated_at__gte=since)
+    return qs.order_by('id').values_list(*[path for _, path in EXPORT_COLUMNS])
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder()
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def iter_export(fmt, rows):
+    return iter_csv(rows) if fmt == 'csv' else iter_ndjson(rows)
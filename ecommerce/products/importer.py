@@ -0,0 +1,259 @@
+# products/importer.py
+"""
+Streaming product import behind `manage.py import_products`.
+
+    records  -> normalize (optionally in a process pool) -> resolve categories -> upsert
+    (lazy)      (pure Python, no database)                  (in-memory map)       (one transaction per batch)
+
+The input is never held in memory: records are read lazily, cut into
+batches, and at most a few batches are in flight at a time. Rows with a
+slug are upserted by slug with bulk_create(update_conflicts=True); rows
+without one get newly allocated slugs. Category counters are kept exact by
+ProductQuerySet.bulk_create and the imported slugs are claimed in
+SlugCounter, so later allocations can't collide with them.
+
+Model imports happen inside functions: normalize_batch() runs in worker
+processes, which may be spawned without Django set up.
+"""
+import csv
+import json
+import time
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+MAX_PRICE = Decimal('99999999.99')  # Product.price: max_digits=10, decimal_places=2
+SLUG_MAX_LENGTH = 50
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+FALSE_VALUES = ('0', 'false', 'no', 'n', 'f')
+UPDATE_FIELDS = ['name', 'description', 'price', 'stock', 'is_active', 'category', 'updated_at']
+
+
+class RowError(ValueError):
+    pass
+
+
+# --- reading ---
+
+def read_records(stream, fmt):
+    """(line number, raw record) pairs: dicts for CSV, unparsed lines for NDJSON."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                yield number, line
+
+
+def batched(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+# --- normalizing (runs in worker processes) ---
+
+def _text(record, key):
+    value = record.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def _boolean(value, default):
+    if isinstance(value, bool):
+        return value
+    value = '' if value is None else str(value).strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f"is_active: '{value}' is not a boolean.")
+
+
+def normalize(record):
+    """Validate one parsed record into the values the importer writes."""
+    if not isinstance(record, dict):
+        raise RowError("Expected an object.")
+    name = _text(record, 'name')
+    if not name:
+        raise RowError("name: This field is required.")
+    try:
+        price = Decimal(_text(record, 'price')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise RowError(f"price: '{_text(record, 'price')}' is not a number.")
+    if not price.is_finite() or not Decimal(0) < price <= MAX_PRICE:
+        raise RowError("price: Must be greater than 0 and fit in 10 digits.")
+    stock = _text(record, 'stock') or '0'
+    try:
+        stock = int(stock)
+    except ValueError:
+        raise RowError(f"stock: '{stock}' is not an integer.")
+    if stock < 0:
+        raise RowError("stock: Cannot be negative.")
+    slug = _text(record, 'slug') or None
+    if slug is not None and (len(slug) > SLUG_MAX_LENGTH or not slug.replace('-', '').replace('_', '').isalnum()):
+        raise RowError(f"slug: '{slug}' is not a valid slug.")
+    # the first category reference present wins: slug, then slug-or-name, then id
+    category = None
+    for key, kind in (('category_slug', 'slug'), ('category', 'any'), ('category_id', 'id')):
+        if _text(record, key):
+            category = (kind, _text(record, key))
+            break
+    return {
+        'slug': slug,
+        'name': name[:255],
+        'description': _text(record, 'description'),
+        'price': price,
+        'stock': stock,
+        'is_active': _boolean(record.get('is_active'), True),
+        'category': category,
+    }
+
+
+def normalize_batch(batch):
+    """[(line, raw)] -> [(line, values or None, error or None)]. Worker entry point."""
+    results = []
+    for line, raw in batch:
+        try:
+            if isinstance(raw, str):
+                try:
+                    raw = json.loads(raw)
+                except ValueError as exc:
+                    raise RowError(f"Invalid JSON: {exc}")
+            results.append((line, normalize(raw), None))
+        except RowError as exc:
+            results.append((line, None, str(exc)))
+    return results
+
+
+# --- writing ---
+
+class CategoryMap:
+    """Category slug/name/id -> pk, loaded with one query and extended as categories are created."""
+
+    def __init__(self, create_missing=False):
+        from .models import Category
+
+        self.create_missing = create_missing
+        self.ids, self.by_slug, self.by_name = set(), {}, {}
+        for pk, slug, name in Category.objects.values_list('pk', 'slug', 'name').iterator():
+            self._add(pk, slug, name)
+
+    def _add(self, pk, slug, name):
+        self.ids.add(pk)
+        self.by_slug[slug] = pk
+        self.by_name[name.lower()] = pk
+
+    def resolve(self, reference):
+        if reference is None:
+            return None
+        kind, value = reference
+        if kind in ('slug', 'any') and value in self.by_slug:
+            return self.by_slug[value]
+        if kind == 'any' and value.lower() in self.by_name:
+            return self.by_name[value.lower()]
+        if kind == 'id':
+            if value.isdigit() and int(value) in self.ids:
+                return int(value)
+            raise RowError(f"category_id: No category with id {value}.")
+        if not self.create_missing:
+            raise RowError(f"category: No category '{value}'.")
+        return self._create(value)
+
+    def _create(self, value):
+        from django.utils.text import slugify
+        from .models import Category
+
+        slug = slugify(value)[:50] or 'category'
+        category, _ = Category.objects.get_or_create(slug=slug, defaults={'name': value[:100]})
+        self._add(category.pk, category.slug, category.name)
+        return category.pk
+
+
+class ProductImporter:
+    def __init__(self, batch_size=1000, workers=0, create_categories=False, owner=None, max_errors=20):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.owner = owner
+        self.max_errors = max_errors
+        self.categories = CategoryMap(create_missing=create_categories)
+        self.rows = 0
+        self.written = 0
+        self.failed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def run(self, records):
+        start = time.perf_counter()
+        batches = batched(records, self.batch_size)
+        if self.workers:
+            from multiprocessing import Pool
+
+            with Pool(self.workers) as pool:
+                for batch in self._bounded(pool, batches):
+                    self.write(batch)
+        else:
+            for batch in batches:
+                self.write(normalize_batch(batch))
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def _bounded(self, pool, batches):
+        # Pool.imap would drain the whole input into its task queue; keep only
+        # a couple of batches per worker in flight so memory stays flat
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(normalize_batch, (batch,)))
+            if len(pending) >= self.workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def _error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def write(self, batch):
+        from django.db import reset_queries, transaction
+        from django.utils import timezone
+        from .models import Product, SlugCounter
+
+        # with DEBUG on, every multi-KB INSERT would otherwise stay in connection.queries
+        reset_queries()
+        self.rows += len(batch)
+        keyed, new = {}, []
+        now = timezone.now()
+        for line, values, error in batch:
+            if error is None:
+                try:
+                    category_id = self.categories.resolve(values.pop('category'))
+                except RowError as exc:
+                    error = str(exc)
+            if error is not None:
+                self._error(line, error)
+                continue
+            product = Product(category_id=category_id, owner=self.owner, created_at=now, **values)
+            if product.slug:
+                keyed[product.slug] = product  # a repeated slug: the last row wins
+            else:
+                new.append(product)
+
+        with transaction.atomic():
+            if keyed:
+                Product.objects.bulk_create(
+                    list(keyed.values()), update_conflicts=True,
+                    unique_fields=['slug'], update_fields=UPDATE_FIELDS,
+                )
+                SlugCounter.claim(keyed)
+            if new:
+                Product.allocate_slugs(new)
+                Product.objects.bulk_create(new)
+        self.written += len(keyed) + len(new)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products import export
+
+
+class Command(BaseCommand):
+    help = "Stream the product catalog to a CSV or NDJSON file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=export.FORMATS, default="csv")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+        parser.add_argument("--category", type=int, help="Only this category and its subcategories.")
+        active = parser.add_mutually_exclusive_group()
+        active.add_argument("--active", dest="is_active", action="store_true", default=None)
+        active.add_argument("--inactive", dest="is_active", action="store_false")
+        parser.add_argument("--since", help="Only products updated at or after this ISO timestamp or date.")
+        parser.add_argument("--chunk-size", type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        if since is not None:
+            since = export.parse_since(since)
+            if since is None:
+                raise CommandError("--since must be an ISO 8601 timestamp or date.")
+        queryset = export.export_queryset(
+            category=options["category"], is_active=options["is_active"], since=since,
+        )
+        rows = export.iter_rows(queryset, chunk_size=options["chunk_size"])
+
+        out = open(options["output"], "w", newline="", encoding="utf-8") if options["output"] else None
+        written = -1 if options["format"] == "csv" else 0  # don't count the CSV header
+        try:
+            for line in export.iter_export(options["format"], rows):
+                if out:
+                    out.write(line)
+                else:
+                    self.stdout.write(line, ending="")
+                written += 1
+        finally:
+            if out:
+                out.close()
+        if out:
+            self.stdout.write(self.style.SUCCESS(f"Exported {written} products to {options['output']}."))
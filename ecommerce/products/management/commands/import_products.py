@@ -0,0 +1,84 @@
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import ProductImporter, read_records
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its finished children, in MB."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None, None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return tuple(
+        round(resource.getrusage(who).ru_maxrss / scale, 1)
+        for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream products from a CSV or NDJSON file into the catalog, upserting by slug. "
+        "Columns/keys: slug, name, description, price, stock, is_active and one of "
+        "category_slug, category (slug or name) or category_id."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=("auto", "csv", "ndjson"), default="auto",
+                            help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction (default: 1000).")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Parse and validate rows in this many worker processes (default: 0, inline).")
+        parser.add_argument("--create-categories", action="store_true",
+                            help="Create categories that don't exist instead of rejecting their rows.")
+        parser.add_argument("--owner", help="Email of the user that owns imported products.")
+        parser.add_argument("--max-errors", type=int, default=20, help="Row errors to print (default: 20).")
+
+    def handle(self, *args, **options):
+        path, fmt = options["path"], options["format"]
+        if fmt == "auto":
+            extension = os.path.splitext(path)[1].lower()
+            if extension == ".csv":
+                fmt = "csv"
+            elif extension in (".ndjson", ".jsonl"):
+                fmt = "ndjson"
+            else:
+                raise CommandError("Can't tell the format from the file name; pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        owner = None
+        if options["owner"]:
+            try:
+                owner = get_user_model().objects.get(email=options["owner"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}.")
+
+        importer = ProductImporter(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            create_categories=options["create_categories"],
+            owner=owner,
+            max_errors=options["max_errors"],
+        )
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            importer.run(read_records(stream, fmt))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for line, message in importer.errors:
+            self.stderr.write(f"line {line}: {message}")
+        peak, children = peak_rss_mb()
+        memory = "" if peak is None else f", peak RSS {peak} MB" + (f" (workers {children} MB)" if options["workers"] else "")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.written} of {importer.rows} rows ({importer.failed} failed) "
+            f"in {importer.seconds:.1f}s: {importer.rows_per_second:,.0f} rows/s{memory}."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Category
+
+
+class Command(BaseCommand):
+    help = "Recount Category.products_count / active_products_count from the products table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "categories", nargs="*", type=int,
+            help="Only rebuild these category ids (default: all categories).",
+        )
+
+    def handle(self, *args, **options):
+        category_ids = options["categories"] or None
+        qs = Category.objects.all() if category_ids is None else Category.objects.filter(pk__in=category_ids)
+        before = {pk: (total, active) for pk, total, active in qs.values_list("pk", "products_count", "active_products_count")}
+        updated = Category.refresh_product_counts(category_ids)
+        after = {pk: (total, active) for pk, total, active in qs.values_list("pk", "products_count", "active_products_count")}
+        drifted = sum(1 for pk, counts in after.items() if before.get(pk) != counts)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt product counts for {updated} categories ({drifted} were out of date)."
+        ))
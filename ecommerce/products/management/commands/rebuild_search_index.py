@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from products.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Create the product full-text index if missing and reindex every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if install_search_index(using=options["database"], rebuild=True):
+            self.stdout.write(self.style.SUCCESS("Product search index rebuilt."))
+        else:
+            self.stderr.write("Product search is not supported on this database backend.")
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:39
+
+import re
+
+from django.db import migrations, models
+
+
+SUFFIXED_SLUG = re.compile(r"^(.+)-(\d+)$")
+
+
+def seed_slug_counters(apps, schema_editor):
+    """Start each counter past the slugs that already exist."""
+    Product = apps.get_model('products', 'Product')
+    SlugCounter = apps.get_model('products', 'SlugCounter')
+    counters = {}
+    for slug in Product.objects.exclude(slug__isnull=True).exclude(slug='').values_list('slug', flat=True).iterator():
+        counters.setdefault(slug, 0)
+        match = SUFFIXED_SLUG.match(slug)
+        if match:
+            base, suffix = match.group(1), int(match.group(2))
+            counters[base] = max(counters.get(base, 0), suffix)
+    SlugCounter.objects.bulk_create(
+        [SlugCounter(base=base, last_suffix=last) for base, last in counters.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_owner_and_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.SlugField(max_length=255, unique=True)),
+                ('last_suffix', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_slug_counters, migrations.RunPython.noop),
+    ]
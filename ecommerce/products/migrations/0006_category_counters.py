@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:44
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_product_counts(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    products = Product.objects.filter(category=OuterRef('pk')).order_by().values('category')
+    Category.objects.update(
+        products_count=Coalesce(Subquery(products.annotate(n=Count('pk')).values('n')), 0),
+        active_products_count=Coalesce(
+            Subquery(products.filter(is_active=True).annotate(n=Count('pk')).values('n')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_category_closure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_product_counts, migrations.RunPython.noop),
+    ]
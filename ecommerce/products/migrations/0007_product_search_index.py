@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from products.search import install_search_index
+    install_search_index(using=schema_editor.connection.alias, rebuild=True)
+
+
+def uninstall(apps, schema_editor):
+    from products.search import uninstall_search_index
+    uninstall_search_index(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    """
+    tsvector column + trigger + GIN index on PostgreSQL, FTS5 table + triggers
+    on SQLite; see products/search.py. Not represented in model state.
+    """
+
+    dependencies = [
+        ('products', '0006_category_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_profile_favorite_category'),
+        ('products', '0009_user_token_version'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='UserProfile',
+        ),
+    ]
@@ -1,9 +1,24 @@
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.text import slugify
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from . import cache as product_cache
+
+
+_SUFFIXED_SLUG_RE = re.compile(r"^(.+)-(\d+)$")
 
 
 # -------------------------
@@ -11,6 +26,8 @@ from django.db import models
 # -------------------------
 class User(AbstractUser):
     email = models.EmailField(unique=True)
+    # bumped to revoke every signed token issued so far (accounts/tokens.py)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
@@ -32,23 +49,15 @@ class User(AbstractUser):
 
 
 # -------------------------
-# User Profile
+# Category (supports nesting)
 # -------------------------
-class UserProfile(models.Model):
-    user = models.OneToOneField(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
-        related_name="product_profile"   # 👈 different unique name
-    )
-    favorite_category = models.CharField(max_length=100, blank=True)
+_UNLOADED = object()
 
 
-# -------------------------
-# Category (supports nesting)
-# -------------------------
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True)
+    description = models.TextField(blank=True)
     parent = models.ForeignKey(
         "self",
         on_delete=models.SET_NULL,
@@ -56,6 +65,13 @@ class Category(models.Model):
         null=True,
         related_name="children",
     )
+    # denormalized from Product; see apply_product_count_deltas / refresh_product_counts
+    products_count = models.PositiveIntegerField(default=0, editable=False)
+    active_products_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    COUNTER_FIELDS = ("products_count", "active_products_count")
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -63,11 +79,420 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored parent so save() can tell a reparent apart
+        instance._loaded_parent_id = instance.__dict__.get("parent_id", _UNLOADED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if not adding and not args and kwargs.get("update_fields") is None:
+            # the counters only move through F() updates; a stale in-memory copy must not overwrite them
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        previous_parent_id = getattr(self, "_loaded_parent_id", _UNLOADED)
+        if not adding and previous_parent_id is _UNLOADED:
+            previous_parent_id = Category.objects.filter(pk=self.pk).values_list("parent_id", flat=True).first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                CategoryClosure.objects.create(ancestor=self, descendant=self, depth=0)
+                self._attach_subtree([(self.pk, 0)])
+            elif previous_parent_id != self.parent_id:
+                self._move_subtree()
+        self._loaded_parent_id = self.parent_id
+
+    # --- tree queries: one indexed join against CategoryClosure at any depth ---
+
+    def descendants(self, include_self=False):
+        return Category.objects.filter(
+            ancestor_links__ancestor=self,
+            ancestor_links__depth__gte=0 if include_self else 1,
+        )
+
+    def ancestors(self, include_self=False):
+        """Ancestors ordered from the root down."""
+        return Category.objects.filter(
+            descendant_links__descendant=self,
+            descendant_links__depth__gte=0 if include_self else 1,
+        ).order_by("-descendant_links__depth")
+
+    def subtree_ids(self):
+        """Lazy id subquery for this category and everything below it."""
+        return CategoryClosure.objects.filter(ancestor=self).values("descendant_id")
+
+    # --- product counters ---
+
+    @classmethod
+    def apply_product_count_deltas(cls, deltas):
+        """Apply {category_id: (total, active)} with one F() update per touched category."""
+        for category_id, (total, active) in deltas.items():
+            if category_id is None or (total == 0 and active == 0):
+                continue
+            cls.objects.filter(pk=category_id).update(
+                products_count=F("products_count") + total,
+                active_products_count=F("active_products_count") + active,
+            )
+
+    @classmethod
+    def refresh_product_counts(cls, category_ids=None):
+        """Recount from the products table in a single UPDATE (all categories by default)."""
+        qs = cls.objects.all() if category_ids is None else cls.objects.filter(pk__in=category_ids)
+        products = Product.objects.filter(category=OuterRef("pk")).order_by().values("category")
+        return qs.update(
+            products_count=Coalesce(Subquery(products.annotate(n=Count("pk")).values("n")), 0),
+            active_products_count=Coalesce(
+                Subquery(products.filter(is_active=True).annotate(n=Count("pk")).values("n")), 0
+            ),
+        )
+
+    # --- closure maintenance ---
+
+    def _attach_subtree(self, subtree):
+        """Link every (descendant, depth) in `subtree` to the new parent's ancestors."""
+        if self.parent_id is None:
+            return
+        parent_ancestors = CategoryClosure.objects.filter(descendant_id=self.parent_id).values_list("ancestor_id", "depth")
+        CategoryClosure.objects.bulk_create([
+            CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+            for ancestor_id, up in parent_ancestors
+            for descendant_id, down in subtree
+        ])
+
+    def _move_subtree(self):
+        subtree = list(CategoryClosure.objects.filter(ancestor=self).values_list("descendant_id", "depth"))
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        if self.parent_id in subtree_ids:
+            raise ValidationError({"parent": "A category cannot be moved under itself or its descendants."})
+        CategoryClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        self._attach_subtree(subtree)
+
+
+class CategoryClosure(models.Model):
+    """
+    One row per (ancestor, descendant) pair, including each category paired
+    with itself at depth 0. Kept in step by Category.save and the pre_delete
+    handler below; queryset.update(parent=...) bypasses both and must not be used.
+    """
+    ancestor = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="descendant_links")
+    descendant = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="ancestor_links")
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ancestor", "descendant"], name="category_closure_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="category_closure_desc_idx"),
+        ]
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_category_products(sender, instance, **kwargs):
+    # the products' category is about to be SET_NULL without going through save();
+    # the queryset update invalidates their cache entries and moves updated_at
+    instance.products.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def invalidate_expanded_products(sender, instance, **kwargs):
+    # product responses with ?expand=category embed the category
+    product_cache.invalidate_categories()
+
+
+@receiver(pre_delete, sender=Category)
+def detach_category_subtree(sender, instance, **kwargs):
+    # children become roots (parent is SET_NULL), so cut their links to everything above
+    CategoryClosure.objects.filter(
+        ancestor_id__in=CategoryClosure.objects.filter(descendant=instance).values("ancestor_id"),
+        descendant_id__in=CategoryClosure.objects.filter(ancestor=instance, depth__gt=0).values("descendant_id"),
+    ).delete()
+
+
+# -------------------------
+# Slug allocation
+# -------------------------
+class SlugCounter(models.Model):
+    """
+    Highest numeric suffix handed out per base slug ("iphone-case" -> 3 means
+    "iphone-case", "iphone-case-1" .. "iphone-case-3" are taken), so a new
+    slug costs one counter bump instead of probing for a free suffix.
+    """
+    base = models.SlugField(max_length=255, unique=True)
+    last_suffix = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.base} ({self.last_suffix})"
+
+    @staticmethod
+    def format_slug(base, suffix):
+        return base if suffix == 0 else f"{base}-{suffix}"
+
+    @classmethod
+    def reserve(cls, base, count=1):
+        """
+        Reserve `count` consecutive slugs for `base` and return them in order.
+        Costs two queries whatever the number of existing products sharing the base.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(base=base).update(last_suffix=F("last_suffix") + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(base=base, last_suffix=count - 1)
+                    return [cls.format_slug(base, i) for i in range(count)]
+                except IntegrityError:
+                    # lost the race to create the counter; take the next block instead
+                    cls.objects.filter(base=base).update(last_suffix=F("last_suffix") + count)
+            last = cls.objects.filter(base=base).values_list("last_suffix", flat=True).get()
+        return [cls.format_slug(base, i) for i in range(last - count + 1, last + 1)]
+
+    @classmethod
+    def reserve_many(cls, counts, batch_size=300):
+        """
+        reserve() for many bases at once: {base: count} -> {base: [slugs]}.
+        Costs at most four queries per `batch_size` bases instead of two per base.
+        """
+        items = list(counts.items())
+        slugs = {}
+        for start in range(0, len(items), batch_size):
+            slugs.update(cls._reserve_batch(dict(items[start:start + batch_size])))
+        return slugs
+
+    @classmethod
+    def _reserve_batch(cls, counts):
+        with transaction.atomic():
+            existing = set(cls.objects.filter(base__in=counts).values_list("base", flat=True))
+            missing = [base for base in counts if base not in existing]
+            if missing:
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create([cls(base=base, last_suffix=counts[base] - 1) for base in missing])
+                except IntegrityError:
+                    # another allocator created one of these counters meanwhile
+                    return {base: cls.reserve(base, count) for base, count in counts.items()}
+            last = {}
+            if existing:
+                cls.objects.filter(base__in=existing).update(last_suffix=F("last_suffix") + Case(
+                    *[When(base=base, then=Value(counts[base])) for base in existing],
+                    output_field=models.PositiveIntegerField(),
+                ))
+                last = dict(cls.objects.filter(base__in=existing).values_list("base", "last_suffix"))
+        slugs = {base: [cls.format_slug(base, i) for i in range(counts[base])] for base in missing}
+        for base in existing:
+            slugs[base] = [cls.format_slug(base, i) for i in range(last[base] - counts[base] + 1, last[base] + 1)]
+        return slugs
+
+    @classmethod
+    def claim(cls, slugs, batch_size=500):
+        """
+        Move counters past slugs written without reserve() (imports, feeds),
+        so later allocations don't collide with them: "phone" marks the
+        "phone" base as taken, "phone-7" takes its counter to at least 7.
+        Counters only ever move forward.
+        """
+        highest = {}
+        for slug in slugs:
+            match = _SUFFIXED_SLUG_RE.match(slug)
+            base, suffix = (match.group(1), int(match.group(2))) if match else (slug, 0)
+            highest[base] = max(highest.get(base, 0), suffix)
+        items = list(highest.items())
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            current = dict(cls.objects.filter(base__in=batch).values_list("base", "last_suffix"))
+            cls.objects.bulk_create(
+                [cls(base=base, last_suffix=n) for base, n in batch.items() if base not in current],
+                ignore_conflicts=True,
+            )
+            for base, n in batch.items():
+                if base in current and current[base] < n:
+                    cls.objects.filter(base=base, last_suffix__lt=n).update(last_suffix=n)
+
+    @classmethod
+    def resync(cls, base):
+        """
+        Move the counter past any slug written without it (admin edits, imports).
+        Only used on the rare collision path, so scanning the matches is fine.
+        """
+        pattern = re.compile(rf"^{re.escape(base)}-(\d+)$")
+        highest = 0
+        for slug in Product.objects.filter(slug__startswith=f"{base}-").values_list("slug", flat=True).iterator():
+            match = pattern.match(slug)
+            if match:
+                highest = max(highest, int(match.group(1)))
+        counter, _ = cls.objects.get_or_create(base=base)
+        if counter.last_suffix < highest:
+            cls.objects.filter(pk=counter.pk, last_suffix__lt=highest).update(last_suffix=highest)
+
 
 # -------------------------
 # Product
 # -------------------------
+# While a queryset-level delete runs, post_delete only collects pks here; the
+# queryset then applies counters and cache invalidation once for all of them.
+_bulk_deleted_pks = ContextVar("bulk_deleted_pks", default=None)
+# Set while ProductQuerySet.bulk_update runs: it counts its rows once for all
+# batches, so the update() calls it makes underneath must not count them again.
+_counting_bulk_update = ContextVar("counting_bulk_update", default=False)
+
+
+@contextmanager
+def _collect_bulk_deletes():
+    pks = []
+    token = _bulk_deleted_pks.set(pks)
+    try:
+        yield pks
+    finally:
+        _bulk_deleted_pks.reset(token)
+
+
+def _count_deltas(rows):
+    """Fold (category_id, is_active, n) rows into {category_id: (total, active)}."""
+    deltas = defaultdict(lambda: (0, 0))
+    for category_id, is_active, n in rows:
+        total, active = deltas[category_id]
+        deltas[category_id] = (total + n, active + (n if is_active else 0))
+    return deltas
+
+
+def _count_changes(before, after):
+    """{category_id: (total, active)} differences between two _count_rows() snapshots."""
+    deltas = _count_deltas(after)
+    for category_id, (total, active) in _count_deltas(before).items():
+        new_total, new_active = deltas[category_id]
+        deltas[category_id] = (new_total - total, new_active - active)
+    return deltas
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    Keeps Category.products_count / active_products_count exact for the bulk
+    paths that bypass Product.save: one GROUP BY before the write and one
+    F() update per touched category after it, however many rows move.
+    Also invalidates the response cache (products/cache.py) for those paths.
+    """
+
+    def _count_rows(self):
+        return [
+            (row["category_id"], row["is_active"], row["n"])
+            for row in self.order_by().values("category_id", "is_active").annotate(n=Count("pk"))
+        ]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        unique_fields = kwargs.get("unique_fields") or ()
+        if kwargs.get("update_conflicts") and len(unique_fields) == 1:
+            return self._upsert(objs, unique_fields[0], *args, **kwargs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            # with ignore_conflicts we can't tell which rows landed, so recount instead
+            if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+                Category.refresh_product_counts({obj.category_id for obj in objs if obj.category_id})
+            else:
+                Category.apply_product_count_deltas(_count_deltas((obj.category_id, obj.is_active, 1) for obj in objs))
+            product_cache.invalidate_catalog()
+        return created
+
+    def _upsert(self, objs, unique_field, *args, **kwargs):
+        # Snapshot the rows the upsert can touch before and after, so updated
+        # rows that changed category (whose old category isn't in objs) are
+        # counted correctly, and their cached detail responses invalidated.
+        attname = self.model._meta.get_field(unique_field).attname
+        touched = self.model.objects.filter(**{f"{unique_field}__in": [getattr(obj, attname) for obj in objs]})
+        with transaction.atomic(using=self.db):
+            before = touched._count_rows()
+            existing_pks = list(touched.values_list("pk", flat=True))
+            created = super().bulk_create(objs, *args, **kwargs)
+            Category.apply_product_count_deltas(_count_changes(before, touched._count_rows()))
+            product_cache.invalidate_products(existing_pks)
+        return created
+
+    def update(self, **kwargs):
+        # auto_now only fires in save(); bump it here too so ETags/Last-Modified move
+        kwargs.setdefault("updated_at", timezone.now())
+        # at most threshold + 1 pks: a catalog-wide update bumps generations instead
+        product_cache.invalidate_products(
+            self.values_list("pk", flat=True)[:product_cache.invalidate_threshold() + 1]
+        )
+        counted = {"category", "category_id", "is_active"} & kwargs.keys()
+        if not counted or _counting_bulk_update.get():
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = self._count_rows()
+            rows = super().update(**kwargs)
+            values = [kwargs[field] for field in counted]
+            if any(hasattr(value, "resolve_expression") for value in values):
+                # can't predict where F()/Case() values land; recount everything touched
+                Category.refresh_product_counts(None)
+                return rows
+            new_category = kwargs.get("category_id", kwargs.get("category", _UNLOADED))
+            if isinstance(new_category, models.Model):
+                new_category = new_category.pk
+            new_active = kwargs.get("is_active", _UNLOADED)
+            after = [
+                (
+                    category_id if new_category is _UNLOADED else new_category,
+                    is_active if new_active is _UNLOADED else new_active,
+                    n,
+                )
+                for category_id, is_active, n in before
+            ]
+            Category.apply_product_count_deltas(_count_changes(before, after))
+        return rows
+
+    def update_stock(self, pks, stock):
+        """
+        update(stock=stock) for rows that are all among `pks`. Stock moves on
+        every checkout, so this invalidates `pks` as given rather than running
+        the SELECT of affected pks that update() does.
+        """
+        product_cache.invalidate_products(pks)
+        return super().update(stock=stock, updated_at=timezone.now())
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        counted = {"category", "is_active"} & {self.model._meta.get_field(name).name for name in fields}
+        if not counted or not objs:
+            return super().bulk_update(objs, fields, batch_size=batch_size)
+        # Django writes these as CASE expressions; compare GROUP BY snapshots of
+        # the touched rows instead of recounting every category
+        touched = self.model.objects.filter(pk__in=[obj.pk for obj in objs])
+        with transaction.atomic(using=self.db):
+            before = touched._count_rows()
+            token = _counting_bulk_update.set(True)
+            try:
+                rows = super().bulk_update(objs, fields, batch_size=batch_size)
+            finally:
+                _counting_bulk_update.reset(token)
+            Category.apply_product_count_deltas(_count_changes(before, touched._count_rows()))
+        return rows
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            before = self._count_rows()
+            with _collect_bulk_deletes() as deleted_pks:
+                result = super().delete()
+            Category.apply_product_count_deltas(
+                {category_id: (-total, -active) for category_id, (total, active) in _count_deltas(before).items()}
+            )
+            product_cache.invalidate_products(deleted_pks)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Product(models.Model):
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="products",
+        null=True,
+        blank=True,
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,   # safer than CASCADE
@@ -86,19 +511,124 @@ class Product(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # keyset pagination walks (created_at, id) in either direction
+            models.Index(fields=['-created_at', '-id'], name='product_created_id_idx'),
+        ]
+
+    # leave room in the 50-char slug column for a "-<n>" suffix
+    SLUG_BASE_MAX_LENGTH = 40
+    SLUG_ALLOCATION_ATTEMPTS = 3
+
+    @classmethod
+    def slug_base(cls, name):
+        return slugify(name)[:cls.SLUG_BASE_MAX_LENGTH].strip("-") or "product"
+
+    @classmethod
+    def allocate_slugs(cls, products, batch_size=500):
+        """
+        Give every product in `products` that has a name but no slug one, in
+        bulk: the bulk_create counterpart of _save_with_new_slug. Checks the
+        allocated slugs against the table and retries collisions with slugs
+        written around the counter.
+        """
+        pending = [product for product in products if not product.slug and product.name]
+        explicit = {product.slug for product in products if product.slug}
+        for attempt in range(cls.SLUG_ALLOCATION_ATTEMPTS):
+            by_base = defaultdict(list)
+            for product in pending:
+                by_base[cls.slug_base(product.name)].append(product)
+            reserved = SlugCounter.reserve_many({base: len(group) for base, group in by_base.items()})
+            for base, group in by_base.items():
+                for product, slug in zip(group, reserved[base]):
+                    product.slug = slug
+            slugs = [product.slug for product in pending]
+            taken = explicit.intersection(slugs)
+            for start in range(0, len(slugs), batch_size):
+                taken.update(
+                    Product.objects.filter(slug__in=slugs[start:start + batch_size]).values_list("slug", flat=True)
+                )
+            if not taken:
+                return
+            pending = [product for product in pending if product.slug in taken]
+            for product in pending:
+                product.slug = None
+            if attempt < cls.SLUG_ALLOCATION_ATTEMPTS - 1:
+                for base in {cls.slug_base(product.name) for product in pending}:
+                    SlugCounter.resync(base)
+        raise IntegrityError(f"Could not allocate unique slugs for {len(pending)} products.")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # what the category counters currently include for this row
+        instance._counted_state = (
+            instance.__dict__.get("category_id", _UNLOADED),
+            instance.__dict__.get("is_active", _UNLOADED),
+        )
+        return instance
+
+    def _stored_count_state(self):
+        state = getattr(self, "_counted_state", (_UNLOADED, _UNLOADED))
+        if _UNLOADED in state:
+            state = Product.objects.filter(pk=self.pk).values_list("category_id", "is_active").get()
+        return state
+
     def save(self, *args, **kwargs):
-        if not self.slug and self.name:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        previous = None if adding else self._stored_count_state()
+        with transaction.atomic():
+            if self.slug or not self.name:
+                super().save(*args, **kwargs)
+            else:
+                self._save_with_new_slug(*args, **kwargs)
+            current = (self.category_id, self.is_active)
+            update_fields = kwargs.get("update_fields")
+            if previous is not None and update_fields is not None:
+                # fields left out of update_fields kept their stored values
+                update_fields = set(update_fields)
+                current = (
+                    current[0] if {"category", "category_id"} & update_fields else previous[0],
+                    current[1] if "is_active" in update_fields else previous[1],
+                )
+            if current != previous:
+                rows = [(*current, 1)] + ([(*previous, -1)] if previous else [])
+                Category.apply_product_count_deltas(_count_deltas(rows))
+            product_cache.invalidate_products([self.pk])
+        self._counted_state = current
+
+    def _save_with_new_slug(self, *args, **kwargs):
+        # Insert-and-retry rather than check-then-insert: the unique index on
+        # slug is the arbiter, and a collision means the counter fell behind.
+        base = self.slug_base(self.name)
+        for attempt in range(self.SLUG_ALLOCATION_ATTEMPTS):
+            self.slug = SlugCounter.reserve(base)[0]
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = Product.objects.filter(slug=self.slug).exists()
+                self.slug = None
+                if not taken or attempt == self.SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+                SlugCounter.resync(base)
 
     def __str__(self):
         return self.name
 
-class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    # instance.delete() and cascades land here; ProductQuerySet.delete() handles its rows in bulk
+    bulk_pks = _bulk_deleted_pks.get()
+    if bulk_pks is not None:
+        bulk_pks.append(instance.pk)
+        return
+    state = getattr(instance, "_counted_state", (_UNLOADED, _UNLOADED))
+    category_id, is_active = (instance.category_id, instance.is_active) if _UNLOADED in state else state
+    Category.apply_product_count_deltas(_count_deltas([(category_id, is_active, -1)]))
+    product_cache.invalidate_products([instance.pk])
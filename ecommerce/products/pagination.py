@@ -0,0 +1,244 @@
+# products/pagination.py
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, CursorPagination, PageNumberPagination as DRFPageNumberPagination,
+)
+
+
+async def afetch(queryset):
+    """
+    Evaluate a page-sized `queryset` with the async ORM. `async for` runs the
+    query and its prefetches in one executor hop; aiterator() would take one
+    per chunk, and pages are small enough to hold whole.
+    """
+    return [row async for row in queryset]
+
+
+class PageNumberPagination(DRFPageNumberPagination):
+    """
+    DRF's page-number pagination plus apaginate_queryset(), the same page
+    and envelope fetched with acount()/aiterator() for the async views.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property: prime it so nothing below queries synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        rows = await afetch(queryset[bottom:top]) if top > bottom else []
+        self.page = paginator._get_page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 15
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over the composite key (created_at, id).
+
+    DRF's CursorPagination only filters on the first ordering field and falls
+    back to an offset for ties; here the position holds both columns, so each
+    page is a single indexed range scan with no COUNT(*) and no OFFSET, however
+    deep the client goes. Tokens stay opaque (base64) and may still carry an
+    optional offset ("o") of rows to skip past the position.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    position_separator = '|'
+
+    def get_ordering(self, request, queryset, view):
+        # the position encodes exactly these columns, so ?ordering= can't override it
+        return tuple(self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        window = self._page_window(queryset, request, view)
+        return None if window is None else self._set_page(list(window))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        window = self._page_window(queryset, request, view)
+        return None if window is None else self._set_page(await afetch(window))
+
+    def _page_window(self, queryset, request, view):
+        """The slice to fetch for this request: the page plus one row, to tell whether a next page exists."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[self._invert(o) for o in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._position_filter(current_position, reverse))
+        self._walk = (offset, reverse, current_position)
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _set_page(self, results):
+        offset, reverse, current_position = self._walk
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _invert(self, ordering):
+        return ordering[1:] if ordering.startswith('-') else '-' + ordering
+
+    def _position_filter(self, position, reverse):
+        """
+        Build the row-value comparison `(created_at, id) < (c, i)` as
+        `created_at < c OR (created_at = c AND id < i)`, flipped for
+        ascending or reversed walks.
+        """
+        try:
+            raw_created, raw_id = position.split(self.position_separator, 1)
+            created_at = parse_datetime(raw_created)
+            pk = int(raw_id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        time_field, id_field = self.ordering
+        descending = time_field.startswith('-')
+        lookup = 'gt' if descending == reverse else 'lt'
+        time_attr, id_attr = time_field.lstrip('-'), id_field.lstrip('-')
+        return (
+            Q(**{f'{time_attr}__{lookup}': created_at})
+            | Q(**{time_attr: created_at, f'{id_attr}__{lookup}': pk})
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return self.position_separator.join(values)
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Lets the client pick the pagination mode per request.
+
+    Page-number pagination stays the default. Passing ?pagination=cursor, or
+    following a link that already carries a cursor token, switches to
+    keyset pagination for that request.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    page_number_class = PageNumberPagination
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    def get_paginator(self, request):
+        cursor_param = self.cursor_class.cursor_query_param
+        if (request.query_params.get(self.mode_query_param) == self.cursor_mode
+                or cursor_param in request.query_params):
+            return self.cursor_class()
+        return self.page_number_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [{
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Pagination mode: "page" (default) or "cursor".',
+            'schema': {'type': 'string', 'enum': ['page', self.cursor_mode]},
+        }]
+        seen = set()
+        for paginator in (self.page_number_class(), self.cursor_class()):
+            for param in paginator.get_schema_operation_parameters(view):
+                if param['name'] not in seen:
+                    seen.add(param['name'])
+                    parameters.append(param)
+        return parameters
+
+
+class CategoryProductsPagination(PageOrCursorPagination):
+    page_number_class = StandardResultsSetPagination
@@ -0,0 +1,33 @@
+# products/parsers.py
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON, one object per line.
+
+    Parsing is lazy: request.data is an iterator over the rows, so a large
+    upload is consumed a line at a time instead of being held in memory.
+    A line that isn't valid JSON comes through as a ParseError in its place,
+    letting the view report it against that row and carry on.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        return self.iter_rows(stream, encoding)
+
+    @staticmethod
+    def iter_rows(stream, encoding):
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line.decode(encoding))
+            except ValueError as exc:
+                yield ParseError(f'JSON parse error - {exc}')
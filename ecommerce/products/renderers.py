@@ -0,0 +1,18 @@
+# products/renderers.py
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """Lets ?format=csv / Accept: text/csv negotiate; streaming views write the body themselves."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # only reached for error responses such as 403/400
+        return '' if data is None else str(data)
+
+
+class NDJSONRenderer(CSVRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
@@ -0,0 +1,230 @@
+# products/row_serializers.py
+"""
+Read-only fast path for the list endpoints.
+
+A RowSerializer is compiled once from an existing ModelSerializer: each
+field becomes a `.values()` column plus a converter that reproduces what the
+DRF field's to_representation() would return. Lists are then built from
+plain dict rows, with no model instances, no per-row field binding and no
+get_attribute() walk, and render to the same bytes as the serializer they
+were compiled from (tests/test_row_serializers.py checks this).
+
+Supported fields are the ones the catalog serializers use: model columns,
+PrimaryKeyRelatedField on a foreign key, ReadOnlyField with a dotted source
+across a foreign key, a ModelSerializer nested over a foreign key (what
+?expand= switches a relation to), and SerializerMethodFields given in `computed`.
+Anything else raises ImproperlyConfigured when the serializer is compiled,
+rather than silently drifting from the DRF output.
+"""
+import decimal
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils.functional import cached_property
+from rest_framework import fields as drf_fields, relations, serializers
+from rest_framework.settings import api_settings
+
+from ecommerce import metrics
+
+# model columns whose values() already have the type the DRF field returns
+_NATIVE = (
+    (drf_fields.CharField, (models.CharField, models.TextField)),
+    (drf_fields.IntegerField, (models.IntegerField,)),
+    (drf_fields.BooleanField, (models.BooleanField,)),
+)
+
+
+def _constant(convert):
+    return lambda: convert
+
+
+def _decimal(field):
+    if (field.decimal_places is None or field.normalize_output or field.localize
+            or not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)):
+        return _constant(field.to_representation)
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+
+    def make():
+        # DecimalField.quantize() works in a copy of the current context
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                return field.to_representation(value)
+            return f'{value.quantize(exponent, rounding=field.rounding, context=context):f}'
+        return convert
+    return make
+
+
+def _datetime(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != drf_fields.ISO_8601:
+        return _constant(field.to_representation)
+
+    def make():
+        # the current time zone may be activated per request
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is None:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            text = value.astimezone(tz).isoformat()
+            return text[:-6] + 'Z' if text.endswith('+00:00') else text
+        return convert
+    return make
+
+
+def _converter(field, model_field):
+    """A factory returning the converter for one serialize() call; the converter None means as-is."""
+    if isinstance(field, drf_fields.ReadOnlyField):
+        return _constant(None)
+    if isinstance(field, drf_fields.DateTimeField):
+        return _datetime(field)
+    if isinstance(field, drf_fields.DecimalField):
+        return _decimal(field)
+    for field_class, columns in _NATIVE:
+        if isinstance(field, field_class) and isinstance(model_field, columns):
+            return _constant(None)
+    return _constant(field.to_representation)
+
+
+def _prepare(compiled):
+    return [(name, column, make(), guard) for name, column, make, guard in compiled]
+
+
+def _build(fields, row):
+    item = {}
+    for name, column, convert, guard in fields:
+        if guard is not None and row[guard] is None:
+            continue
+        if column is None:
+            item[name] = convert(row)
+        else:
+            value = row[column]
+            item[name] = value if value is None or convert is None else convert(value)
+    return item
+
+
+class RowSerializer:
+    """
+    RowSerializer(ProductSerializer, extra=('owner_id',)).
+
+    `extra` names more columns to fetch (for ETags, cursors...) without
+    exposing them; `computed` maps a SerializerMethodField name to a
+    callable taking the row. Other keyword arguments are passed to the
+    serializer, e.g. the sparse fieldset options of SparseFieldsMixin;
+    variant() returns (and caches) a copy with different ones.
+    """
+
+    def __init__(self, serializer_class, extra=(), computed=None, **serializer_kwargs):
+        self.serializer_class = serializer_class
+        self.extra = tuple(extra)
+        self.computed = computed or {}
+        self.serializer_kwargs = serializer_kwargs
+        self._variants = lru_cache(maxsize=256)(self._make_variant)
+
+    def variant(self, extra=(), **serializer_kwargs):
+        """This serializer with more `extra` columns and other serializer kwargs (hashable values)."""
+        if not extra and not serializer_kwargs:
+            return self
+        return self._variants(tuple(extra), tuple(sorted(serializer_kwargs.items())))
+
+    def _make_variant(self, extra, serializer_kwargs):
+        return RowSerializer(
+            self.serializer_class, self.extra + extra, self.computed, **{**self.serializer_kwargs, **dict(serializer_kwargs)},
+        )
+
+    @cached_property
+    def _compiled(self):
+        # compiled on first use: building the serializer's fields needs the app registry
+        compiled, columns = self._compile_serializer(self.serializer_class(**self.serializer_kwargs))
+        return compiled, tuple(dict.fromkeys(list(self.extra) + columns))
+
+    def _compile_serializer(self, serializer, prefix=''):
+        model = serializer.Meta.model
+        compiled, columns = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            entry, entry_columns = self._compile(name, field, model, prefix)
+            compiled.append(entry)
+            columns.extend(entry_columns)
+        return compiled, columns
+
+    def _compile(self, name, field, model, prefix):
+        """
+        ((name, column, converter factory, guard column), columns to fetch).
+        A None column hands the whole row to the converter (computed and nested fields).
+        """
+        label = f"{type(field.parent).__name__}.{name}"
+        if not prefix and name in self.computed:
+            return (name, None, _constant(self.computed[name]), None), []
+        if isinstance(field, drf_fields.SerializerMethodField):
+            raise ImproperlyConfigured(f"{label}: pass a method field in `computed`.")
+
+        source = field.source_attrs
+        try:
+            model_field = model._meta.get_field(source[0])
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f"{label}: no column for {field.source!r}.")
+
+        if isinstance(field, serializers.ModelSerializer):
+            if len(source) > 1 or not model_field.many_to_one or getattr(field, 'many', False):
+                raise ImproperlyConfigured(f"{label}: only a foreign key can be nested.")
+            nested, columns = self._compile_serializer(field, f'{prefix}{model_field.name}__')
+            key = prefix + model_field.attname
+
+            def make():
+                fields = _prepare(nested)
+                # a null relation serializes as None, like DRF's nested serializer
+                return lambda row: None if row[key] is None else _build(fields, row)
+            return (name, None, make, None), [key] + columns
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if len(source) > 1 or not model_field.many_to_one or field.pk_field is not None:
+                raise ImproperlyConfigured(f"{label}: unsupported relation.")
+            return (name, prefix + model_field.attname, _constant(None), None), [prefix + model_field.attname]
+
+        if len(source) > 1:
+            if len(source) > 2 or not model_field.many_to_one or type(field) is not drf_fields.ReadOnlyField:
+                raise ImproperlyConfigured(f"{label}: unsupported source {field.source!r}.")
+            if field.default is not drf_fields.empty or field.allow_null or field.required:
+                raise ImproperlyConfigured(f"{label}: unsupported null handling.")
+            # DRF skips the key when the relation is null (AttributeError -> SkipField)
+            column, guard = prefix + '__'.join(source), prefix + model_field.attname
+            return (name, column, _constant(None), guard), [column, guard]
+
+        if model_field.is_relation or not model_field.concrete:
+            # serializers over related managers, other relation fields...
+            raise ImproperlyConfigured(f"{label}: unsupported field {type(field).__name__}.")
+        column = prefix + model_field.attname
+        return (name, column, _converter(field, model_field), None), [column]
+
+    @property
+    def columns(self):
+        return self._compiled[1]
+
+    def queryset(self, queryset):
+        """`queryset` as dict rows holding exactly the columns serialize() needs."""
+        return queryset.values(*self.columns)
+
+    def restrict(self, queryset):
+        """
+        `queryset` loading model instances with only these columns, joined
+        only to the relations they reach, for paths that still serialize
+        instances (detail, search).
+        """
+        joins = sorted({column.rsplit('__', 1)[0] for column in self.columns if '__' in column})
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset.only(*self.columns)
+
+    def serialize(self, rows):
+        """The list the serializer would return for these rows (as dicts from queryset())."""
+        with metrics.serializing():
+            fields = _prepare(self._compiled[0])
+            return [_build(fields, row) for row in rows]
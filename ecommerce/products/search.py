@@ -0,0 +1,198 @@
+# products/search.py
+"""
+Full-text search over Product.name / Product.description.
+
+The index lives in the database and is maintained by triggers, so every
+write path (save, bulk_create, queryset.update, raw SQL) keeps it current:
+
+- PostgreSQL: a `search_vector tsvector` column on products_product, filled
+  by a BEFORE INSERT/UPDATE trigger and covered by a GIN index.
+- SQLite (local and test runs): an FTS5 external-content table
+  products_product_fts kept in step by AFTER INSERT/UPDATE/DELETE triggers.
+
+The column and the FTS table are deliberately not model fields, so the ORM
+never reads or writes them.
+"""
+import re
+
+from django.db import connections
+
+PRODUCT_TABLE = 'products_product'
+FTS_TABLE = 'products_product_fts'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Reduce free text to plain word tokens, so no user input reaches the query syntax."""
+    return _TOKEN_RE.findall(query or '')[:16]
+
+
+class SearchBackend:
+    vendor = None
+
+    def install(self, cursor):
+        raise NotImplementedError
+
+    def uninstall(self, cursor):
+        raise NotImplementedError
+
+    def rebuild(self, cursor):
+        raise NotImplementedError
+
+    def needs_rebuild(self, cursor):
+        return False
+
+    def search(self, queryset, query):
+        """Filter `queryset` to matches of `query`, best match first."""
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    vendor = 'postgresql'
+    config = 'english'
+
+    def install(self, cursor):
+        cursor.execute(f"ALTER TABLE {PRODUCT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {PRODUCT_TABLE}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('{self.config}', coalesce(NEW.name, '')), 'A') ||
+                    setweight(to_tsvector('{self.config}', coalesce(NEW.description, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute(f"DROP TRIGGER IF EXISTS {PRODUCT_TABLE}_search_vector_trigger ON {PRODUCT_TABLE}")
+        cursor.execute(f"""
+            CREATE TRIGGER {PRODUCT_TABLE}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, description ON {PRODUCT_TABLE}
+            FOR EACH ROW EXECUTE FUNCTION {PRODUCT_TABLE}_search_vector_update()
+        """)
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PRODUCT_TABLE}_search_vector_idx "
+            f"ON {PRODUCT_TABLE} USING GIN (search_vector)"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {PRODUCT_TABLE}_search_vector_trigger ON {PRODUCT_TABLE}")
+        cursor.execute(f"DROP FUNCTION IF EXISTS {PRODUCT_TABLE}_search_vector_update()")
+        cursor.execute(f"ALTER TABLE {PRODUCT_TABLE} DROP COLUMN IF EXISTS search_vector")
+
+    def rebuild(self, cursor):
+        # touching name fires the trigger for every row
+        cursor.execute(f"UPDATE {PRODUCT_TABLE} SET name = name")
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        # every word must match; the last one also as a prefix (search-as-you-type)
+        tsquery = ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+        return queryset.extra(
+            select={'search_rank': f"ts_rank_cd({PRODUCT_TABLE}.search_vector, to_tsquery('{self.config}', %s))"},
+            select_params=[tsquery],
+            where=[f"{PRODUCT_TABLE}.search_vector @@ to_tsquery('{self.config}', %s)"],
+            params=[tsquery],
+        ).order_by('-search_rank', '-id')
+
+
+class SQLiteSearchBackend(SearchBackend):
+    vendor = 'sqlite'
+    # bm25 column weights: name, description
+    weights = (10.0, 1.0)
+
+    def install(self, cursor):
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                name, description,
+                content='{PRODUCT_TABLE}', content_rowid='id',
+                tokenize='porter unicode61'
+            )
+        """)
+        # The triggers are re-created idempotently after every migrate, because
+        # Django's SQLite schema editor rebuilds tables (dropping their triggers)
+        # for many ALTERs.
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+
+    def uninstall(self, cursor):
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def rebuild(self, cursor):
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    def needs_rebuild(self, cursor):
+        # missing triggers mean the table was rebuilt and the index may have missed writes
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name LIKE %s",
+            [PRODUCT_TABLE, f'{FTS_TABLE}_%'],
+        )
+        return cursor.fetchone()[0] < 3
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        match = ' '.join([f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+        weights = ', '.join(str(w) for w in self.weights)
+        # bm25() is lower-is-better
+        return queryset.extra(
+            select={'search_rank': f"bm25({FTS_TABLE}, {weights})"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE} MATCH %s", f"{FTS_TABLE}.rowid = {PRODUCT_TABLE}.id"],
+            params=[match],
+        ).order_by('search_rank', '-id')
+
+
+BACKENDS = {backend.vendor: backend for backend in (PostgresSearchBackend, SQLiteSearchBackend)}
+
+
+def get_search_backend(using='default'):
+    vendor = connections[using].vendor
+    try:
+        return BACKENDS[vendor]()
+    except KeyError:
+        raise NotImplementedError(f"Product search is not available on {vendor}.")
+
+
+def install_search_index(using='default', rebuild=False):
+    """Create (or repair) the index structures; safe to run repeatedly."""
+    connection = connections[using]
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return False
+    backend = backend()
+    with connection.cursor() as cursor:
+        rebuild = rebuild or backend.needs_rebuild(cursor)
+        backend.install(cursor)
+        if rebuild:
+            backend.rebuild(cursor)
+    return True
+
+
+def uninstall_search_index(using='default'):
+    connection = connections[using]
+    backend = BACKENDS.get(connection.vendor)
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend().uninstall(cursor)
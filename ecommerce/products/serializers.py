@@ -7,9 +7,128 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name']
 
-class ProductSerializer(serializers.ModelSerializer):
+def _split(value):
+    names = {name.strip() for name in (value or '').split(',')} - {''}
+    return tuple(sorted(names)) or None
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for read responses.
+
+    fields=(...) keeps only the named fields; expand=(...) swaps each named
+    relation for the nested serializer in Meta.expandable (adding it if the
+    serializer doesn't have it). Expanded relations are always kept.
+    sparse_options() reads both from ?fields=a,b and ?expand=c.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            self.fields[name] = self.Meta.expandable[name](read_only=True)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and name not in expand:
+                    self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls):
+        names = cls.__dict__.get('_field_names')
+        if names is None:
+            names = cls._field_names = frozenset(cls().fields)
+        return names
+
+    @classmethod
+    def sparse_options(cls, query_params):
+        """Serializer kwargs for the request's ?fields= / ?expand=; {} when neither is given."""
+        expandable = getattr(cls.Meta, 'expandable', {})
+        fields = _split(query_params.get(cls.fields_query_param))
+        expand = _split(query_params.get(cls.expand_query_param))
+        errors = {}
+        if fields is not None:
+            unknown = [name for name in fields if name not in cls.field_names() and name not in expandable]
+            if unknown:
+                errors[cls.fields_query_param] = [f"Unknown field(s): {', '.join(unknown)}."]
+        if expand is not None:
+            unknown = [name for name in expand if name not in expandable]
+            if unknown:
+                errors[cls.expand_query_param] = [f"Cannot expand: {', '.join(unknown)}."]
+        if errors:
+            raise serializers.ValidationError(errors)
+        options = {}
+        if fields is not None:
+            options['fields'] = fields
+        if expand is not None:
+            options['expand'] = expand
+        return options
+
+
+class CategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves ids from context['categories']
+    ({pk: Category}) when the caller preloaded them, as bulk writes do,
+    instead of one query per row.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context.get('categories')
+        if categories is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return categories[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+class ProductBulkSerializer(serializers.ListSerializer):
+    """
+    many=True serializer for bulk writes.
+
+    Rows carrying an "id" are validated as updates of the product found in
+    context['products'] ({pk: Product}); the rest as creates. Invalid rows
+    don't fail the batch: validated_data holds the valid rows and
+    row_errors maps each invalid row's position to its errors.
+    """
+
+    def run_child_validation(self, data):
+        pk = data.get('id') if isinstance(data, dict) else None
+        self.child.instance = None
+        if pk is not None:
+            try:
+                self.child.instance = self.context.get('products', {}).get(int(pk))
+            except (TypeError, ValueError):
+                pass
+        if pk is not None and self.child.instance is None:
+            raise serializers.ValidationError({'id': ["Product not found."]})
+        return super().run_child_validation(data)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        self.row_errors = {}
+        self.row_instances = []
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                attrs = self.run_child_validation(item)
+            except serializers.ValidationError as exc:
+                self.row_errors[index] = exc.detail
+            else:
+                validated.append(attrs)
+                self.row_instances.append((index, self.child.instance))
+        self.child.instance = None
+        return validated
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False, allow_null=True)
+    category = CategoryField(queryset=Category.objects.all(), required=False, allow_null=True)
 
     class Meta:
         model = Product
@@ -18,6 +137,8 @@ class ProductSerializer(serializers.ModelSerializer):
             'stock', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
+        list_serializer_class = ProductBulkSerializer
+        expandable = {'category': CategorySerializer}
 
     def validate_name(self, value):
         if len(value.strip()) < 3:
@@ -0,0 +1,159 @@
+# products/synthetic.py
+"""
+Deterministic synthetic catalog behind `manage.py generate_dataset`, used
+by the benchmarks/ suite.
+
+The same seed and sizes always produce the same categories, users and
+products (names, slugs, prices, stock, owners and created_at), so runs on
+different machines or branches benchmark identical data:
+
+- a category tree `depth` levels deep with `fanout` children per node
+  (5 levels x 5 = 3,905 categories); closure rows are computed in Python
+  and bulk inserted instead of going through Category.save();
+- `users` users sharing one pre-computed password hash, so no time goes
+  into hashing;
+- `products` products on the leaf categories, inserted in id order in
+  batches that each touch only a few categories, so the per-batch counter
+  updates in ProductQuerySet.bulk_create stay cheap.
+
+Everything is written with bulk_create, which bypasses model signals.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import reset_queries, transaction
+
+from .models import Category, CategoryClosure, Product, SlugCounter
+
+ADJECTIVES = (
+    'red', 'blue', 'green', 'black', 'white', 'silver', 'compact', 'wireless', 'portable', 'classic',
+    'smart', 'ergonomic', 'vintage', 'organic', 'deluxe', 'mini', 'heavy-duty', 'waterproof',
+)
+NOUNS = (
+    'lamp', 'phone', 'mouse', 'keyboard', 'chair', 'desk', 'mug', 'kettle', 'backpack', 'jacket',
+    'speaker', 'camera', 'watch', 'novel', 'blender', 'monitor', 'charger', 'bottle', 'pillow', 'tent',
+)
+DESCRIPTION_WORDS = (
+    'durable', 'lightweight', 'premium', 'quality', 'everyday', 'design', 'warranty', 'steel', 'cotton',
+    'battery', 'fast', 'quiet', 'eco', 'gift', 'travel', 'home', 'office', 'outdoor', 'kids', 'pro',
+)
+PASSWORD = 'benchmark'
+# fixed so the hash is reproducible; 22 characters is enough entropy that
+# check_password() doesn't flag the hash for an upgrade (and re-save the user)
+PASSWORD_SALT = 'syntheticdatasetsalt22'
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class DatasetGenerator:
+    def __init__(self, products=1_000_000, users=100_000, depth=5, fanout=5, seed=42,
+                 batch_size=5000, inactive_ratio=0.05, log=None):
+        self.products = products
+        self.users = users
+        self.depth = depth
+        self.fanout = fanout
+        self.seed = seed
+        self.batch_size = batch_size
+        self.inactive_ratio = inactive_ratio
+        self.log = log or (lambda message: None)
+        self.timings = {}
+
+    def run(self):
+        category_ids = self._timed('categories', self.create_categories)
+        user_ids = self._timed('users', self.create_users)
+        self._timed('products', lambda: self.create_products(category_ids, user_ids))
+        return self
+
+    def _timed(self, name, step):
+        start = time.perf_counter()
+        result = step()
+        self.timings[name] = round(time.perf_counter() - start, 2)
+        self.log(f"{name}: {self.timings[name]}s")
+        return result
+
+    # --- categories ---
+
+    def create_categories(self):
+        """Build the tree level by level; returns the leaf category ids in tree order."""
+        # tree path, e.g. (2, 5, 1) -> [its pk, then its ancestors' pks, nearest first]
+        ancestors = {(): []}
+        level = [()]
+        with transaction.atomic():
+            for depth in range(1, self.depth + 1):
+                nodes = [parent + (i,) for parent in level for i in range(1, self.fanout + 1)]
+                created = Category.objects.bulk_create([
+                    Category(
+                        name=f"Category {'.'.join(map(str, node))}",
+                        slug=f"category-{'-'.join(map(str, node))}",
+                        description=f"Synthetic category at depth {depth}",
+                        parent_id=ancestors[node[:-1]][0] if node[:-1] else None,
+                    )
+                    for node in nodes
+                ], batch_size=self.batch_size)
+                closure = []
+                for node, category in zip(nodes, created):
+                    chain = [category.pk] + ancestors[node[:-1]]
+                    ancestors[node] = chain
+                    closure.extend(
+                        CategoryClosure(ancestor_id=ancestor_id, descendant_id=category.pk, depth=distance)
+                        for distance, ancestor_id in enumerate(chain)
+                    )
+                CategoryClosure.objects.bulk_create(closure, batch_size=self.batch_size)
+                level = nodes
+        return [ancestors[node][0] for node in level]
+
+    # --- users ---
+
+    def create_users(self):
+        User = get_user_model()
+        password = make_password(PASSWORD, salt=PASSWORD_SALT)
+        ids = []
+        for start in range(0, self.users, self.batch_size):
+            batch = [
+                User(username=f"user{i}", email=f"user{i}@example.com", password=password,
+                     first_name="Bench", last_name=f"User {i}", date_joined=EPOCH + timedelta(minutes=i))
+                for i in range(start, min(start + self.batch_size, self.users))
+            ]
+            ids.extend(user.pk for user in User.objects.bulk_create(batch))
+        return ids
+
+    # --- products ---
+
+    def product(self, rng, i, category_id, owner_id):
+        name = f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} {i}"
+        return Product(
+            name=name,
+            slug=Product.slug_base(name),  # ends in -<i>, so unique
+            description=' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(8, 24))),
+            price=Decimal(rng.randint(99, 99999)) / 100,
+            stock=rng.randint(0, 500),
+            is_active=rng.random() >= self.inactive_ratio,
+            category_id=category_id,
+            owner_id=owner_id,
+            created_at=EPOCH + timedelta(seconds=i * 17),
+        )
+
+    def create_products(self, category_ids, user_ids):
+        rng = random.Random(self.seed)
+        highest = {}  # slug base -> highest suffix, claimed once at the end
+        for start in range(0, self.products, self.batch_size):
+            reset_queries()
+            batch = [
+                # contiguous runs per leaf: batch k touches ~batch_size / (products / leaves) categories
+                self.product(
+                    rng, i, category_ids[i * len(category_ids) // self.products],
+                    user_ids[rng.randrange(len(user_ids))] if user_ids else None,
+                )
+                for i in range(start, min(start + self.batch_size, self.products))
+            ]
+            Product.objects.bulk_create(batch)
+            for product in batch:
+                base, _, suffix = product.slug.rpartition('-')
+                highest[base] = max(highest.get(base, 0), int(suffix))
+            done = start + len(batch)
+            if done % (self.batch_size * 20) == 0 or done == self.products:
+                self.log(f"  {done:,} / {self.products:,} products")
+        SlugCounter.claim([f"{base}-{suffix}" for base, suffix in highest.items()])
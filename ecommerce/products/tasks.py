@@ -0,0 +1,16 @@
+# products/tasks.py
+import logging
+
+from jobs.registry import task
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+
+@task
+def announce_product(product_id):
+    """Post-create side effects of a new product, off the request path."""
+    product = Product.objects.filter(pk=product_id).select_related("owner").only("pk", "owner__email").first()
+    if product is None:
+        return  # deleted since
+    logger.info("Product created: id=%s owner=%s", product.pk, product.owner)
@@ -1,5 +1,6 @@
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.settings import api_settings
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
 from ..models import Product, Category
@@ -9,9 +10,9 @@ User = get_user_model()
 class ProductAPITestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
-        self.user = User.objects.create_user(username='user1', password='pass123')
-        self.other_user = User.objects.create_user(username='user2', password='pass123')
-        self.staff = User.objects.create_user(username='staff', password='pass123', is_staff=True)
+        self.user = User.objects.create_user(username='user1', email='user1@example.com', password='pass123')
+        self.other_user = User.objects.create_user(username='user2', email='user2@example.com', password='pass123')
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='pass123', is_staff=True)
         self.category = Category.objects.create(name='Default')
 
         self.product = Product.objects.create(
@@ -46,12 +47,13 @@ class ProductAPITestCase(APITestCase):
             'stock': 1,
             'category': self.category.id
         }
-        resp = self.client.post(self.list_url, data)
-        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        resp = self.client.post(self.list_url, data, format='json')
+        # session authentication comes first and sends no WWW-Authenticate challenge, hence 403
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
 
         # authenticated
         self.client.force_authenticate(self.user)
-        resp = self.client.post(self.list_url, data)
+        resp = self.client.post(self.list_url, data, format='json')
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
         self.assertEqual(resp.data['owner'], self.user.username)
 
@@ -60,12 +62,12 @@ class ProductAPITestCase(APITestCase):
         data = {'name': 'Updated name', 'price': '19.99', 'stock': 5}
         # other user cannot update
         self.client.force_authenticate(self.other_user)
-        resp = self.client.put(url, data)
+        resp = self.client.put(url, data, format='json')
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
 
         # owner can update
         self.client.force_authenticate(self.user)
-        resp = self.client.put(url, data)
+        resp = self.client.put(url, data, format='json')
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.product.refresh_from_db()
         self.assertEqual(self.product.name, 'Updated name')
@@ -111,6 +113,6 @@ class ProductAPITestCase(APITestCase):
             )
         resp = self.client.get(self.list_url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        # default page size set to 10 in settings example
         self.assertIn('results', resp.data)
-        self.assertTrue(len(resp.data['results']) <= 12)  # depending on pagination settings
+        self.assertEqual(len(resp.data['results']), api_settings.PAGE_SIZE)
+        self.assertEqual(resp.data['count'], 26)
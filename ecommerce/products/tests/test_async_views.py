@@ -0,0 +1,108 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from products import cache as product_cache
+from products.models import Category, Product
+
+User = get_user_model()
+
+
+class AsyncReadViewsTestCase(TestCase):
+    """The async endpoints must answer exactly like their sync twins."""
+
+    def setUp(self):
+        cache.clear()
+        product_cache.reset_cache_stats()
+        self.electronics = Category.objects.create(name="Electronics", slug="electronics")
+        self.phones = Category.objects.create(name="Phones", slug="phones", parent=self.electronics)
+        self.products = [
+            Product.objects.create(name=f"Phone {i}", price=10 + i, category=self.phones) for i in range(20)
+        ]
+        self.hidden = Product.objects.create(name="Hidden", price=1, category=self.electronics, is_active=False)
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345', is_staff=True
+        )
+
+    async def login(self, user):
+        # a session written by hand: the login signal path isn't under test here
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        await session.asave()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def compare(self, sync_name, async_name, args=(), params=None):
+        sync = await self.async_client.get(reverse(sync_name, args=args), params or {})
+        response = await self.async_client.get(reverse(async_name, args=args), params or {})
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(response['Content-Type'], sync['Content-Type'])
+        # pagination links point at the endpoint that served them
+        self.assertEqual(response.content.replace(b'/api/async/', b'/api/'), sync.content)
+        return sync, response
+
+    async def test_product_list_matches_sync(self):
+        for params in ({}, {'page': 2}, {'page_size': 5, 'ordering': 'price'}, {'pagination': 'cursor'}):
+            with self.subTest(params=params):
+                sync, response = await self.compare('product-list', 'async-product-list', params=params)
+                self.assertEqual(response['ETag'], sync['ETag'])
+
+    async def test_cursor_links_are_followable(self):
+        first = await self.async_client.get(reverse('async-product-list'), {'pagination': 'cursor', 'page_size': 8})
+        second = await self.async_client.get(first.json()['next'])
+        ids = [row['id'] for row in first.json()['results'] + second.json()['results']]
+        self.assertEqual(ids, [p.pk for p in reversed(self.products)][:16])
+
+    async def test_product_detail_matches_sync(self):
+        sync, response = await self.compare('product-detail', 'async-product-detail', args=[self.products[0].pk])
+        self.assertEqual(response['Last-Modified'], sync['Last-Modified'])
+
+    async def test_inactive_products_are_staff_only(self):
+        url = reverse('async-product-detail', args=[self.hidden.pk])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'No Product matches the given query.'})
+        await self.login(self.staff)
+        self.assertEqual((await self.async_client.get(url)).status_code, 200)
+
+    async def test_category_endpoints_match_sync(self):
+        await self.compare('category-list', 'async-category-list', params={'include_products': 'true'})
+        await self.compare('category-list', 'async-category-list', params={'ordering': '-products_count'})
+        await self.compare('category-category-products', 'async-category-products',
+                           args=[self.electronics.pk], params={'include_descendants': 'true', 'page': 2})
+
+    async def test_conditional_get(self):
+        url = reverse('async-product-list')
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_response_cache(self):
+        url = reverse('async-product-detail', args=[self.products[0].pk])
+        self.assertEqual((await self.async_client.get(url))['X-Cache'], 'MISS')
+        self.assertEqual((await self.async_client.get(url))['X-Cache'], 'HIT')
+        await Product.objects.filter(pk=self.products[0].pk).aupdate(name="Renamed")
+        response = await self.async_client.get(url)
+        self.assertEqual((response['X-Cache'], response.json()['name']), ('MISS', "Renamed"))
+
+    @override_settings(PRODUCT_CACHE_ENABLED=False)
+    async def test_without_cache(self):
+        response = await self.async_client.get(reverse('async-product-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
+
+    async def test_bad_page_and_writes(self):
+        response = await self.async_client.get(reverse('async-product-list'), {'page': 99})
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+        response = await self.async_client.post(reverse('async-product-list'), {})
+        self.assertEqual(response.status_code, 405)
+
+    def test_sync_and_async_entries_are_cached_separately(self):
+        self.client.get(reverse('product-list'))
+        self.assertEqual(self.client.get(reverse('async-product-list'))['X-Cache'], 'MISS')
+        self.assertEqual(product_cache.cache_stats().get('list_hit', 0), 0)
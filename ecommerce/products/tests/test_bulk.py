@@ -0,0 +1,115 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from jobs.models import Job
+from products.models import Category, Product, SlugCounter
+
+User = get_user_model()
+
+
+class ProductBulkTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.books = Category.objects.create(name="Books", slug="books")
+        self.url = reverse('product-bulk')
+        self.client.force_authenticate(self.user)
+
+    def row(self, name, **extra):
+        return {'name': name, 'price': '9.99', 'category': self.category.pk, **extra}
+
+    def post_ndjson(self, rows):
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        return self.client.post(self.url, body.encode(), content_type='application/x-ndjson')
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        resp = self.client.post(self.url, [self.row("Phone")], format='json')
+        self.assertIn(resp.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_json_array_creates_products(self):
+        resp = self.client.post(self.url, [self.row("Phone"), self.row("Phone"), self.row("Tablet")], format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data['created'], resp.data['failed']), (3, 0))
+        products = Product.objects.order_by('pk')
+        self.assertEqual([p.slug for p in products], ["phone", "phone-1", "tablet"])
+        self.assertEqual([item['id'] for item in resp.data['items']], [p.pk for p in products])
+        self.assertTrue(all(p.owner_id == self.user.pk for p in products))
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.products_count, 3)
+
+    def test_created_products_are_announced(self):
+        existing = Product.objects.create(name="Lamp", price=1, owner=self.user)
+        resp = self.client.post(self.url, [self.row("Phone"), self.row("Tablet"), self.row("Lamp", id=existing.pk)],
+                                format='json')
+        self.assertEqual(resp.data['created'], 2)
+        created = [item['id'] for item in resp.data['items'] if item['status'] == 'created']
+        self.assertEqual(sorted(Job.objects.filter(name='products.tasks.announce_product')
+                                .values_list('args', flat=True)), [[pk] for pk in sorted(created)])
+
+    def test_ndjson_reports_errors_per_row(self):
+        resp = self.post_ndjson([
+            self.row("Phone"),
+            '{not json',
+            self.row("X"),                                   # name too short
+            self.row("Lamp", category=999999),              # unknown category
+            self.row("Tablet"),
+            '[1, 2]',
+        ])
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['created'], 2)
+        self.assertEqual([e['row'] for e in resp.data['errors']], [1, 2, 3, 5])
+        self.assertIn('name', resp.data['errors'][1]['errors'])
+        self.assertIn('category', resp.data['errors'][2]['errors'])
+        self.assertEqual([item['row'] for item in resp.data['items']], [0, 4])
+
+    def test_updates_by_id_respect_ownership(self):
+        mine = Product.objects.create(name="Phone", price=1, owner=self.user, category=self.category)
+        theirs = Product.objects.create(name="Book", price=1, owner=self.other)
+        resp = self.client.post(self.url, [
+            {'id': mine.pk, 'name': "Phone 2", 'price': '5.00', 'category': self.books.pk, 'is_active': False},
+            {'id': theirs.pk, 'name': "Mine now", 'price': '1.00'},
+            {'id': 999999, 'name': "Ghost", 'price': '1.00'},
+        ], format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data['updated'], resp.data['failed']), (1, 2))
+        self.assertEqual([e['row'] for e in resp.data['errors']], [1, 2])
+
+        mine.refresh_from_db()
+        self.assertEqual((mine.name, str(mine.price), mine.category_id, mine.is_active),
+                         ("Phone 2", "5.00", self.books.pk, False))
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.name, "Book")
+        self.books.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual((self.books.products_count, self.books.active_products_count), (1, 0))
+        self.assertEqual(self.category.products_count, 0)
+
+    def test_slug_collisions_with_untracked_slugs_are_retried(self):
+        Product.objects.create(name="Other", price=1, slug="phone")
+        resp = self.client.post(self.url, [self.row("Phone")], format='json')
+        self.assertEqual(resp.data['created'], 1)
+        self.assertEqual(Product.objects.get(pk=resp.data['items'][0]['id']).slug, "phone-1")
+        self.assertEqual(SlugCounter.objects.get(base="phone").last_suffix, 1)
+
+    def test_rejects_non_list_body(self):
+        resp = self.client.post(self.url, self.row("Phone"), format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def queries_for(n):
+            rows = [self.row(f"Item {n} {i}") for i in range(n)]
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(self.url, rows, format='json')
+            self.assertEqual(resp.data['created'], n)
+            return len(ctx)
+
+        # only the INSERTs of the products and their announcement jobs split into
+        # batches (SQLite's bound-parameter limit)
+        self.assertLessEqual(queries_for(200) - queries_for(10), 4)
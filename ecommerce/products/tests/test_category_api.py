@@ -9,7 +9,7 @@ class CategoryAPITestCase(APITestCase):
         self.cat2 = Category.objects.create(name="Books", slug="books")
         # products in cat1
         for i in range(5):
-            Product.objects.create(title=f"Phone {i}", category=self.cat1, price=100 + i)
+            Product.objects.create(name=f"Phone {i}", category=self.cat1, price=100 + i)
         self.list_url = reverse('category-list')
 
     def test_list_categories_contains_products_count(self):
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+
+
+class CategoryCountersTestCase(APITestCase):
+    def setUp(self):
+        self.cat1 = Category.objects.create(name="Electronics", slug="electronics")
+        self.cat2 = Category.objects.create(name="Books", slug="books")
+        for i in range(4):
+            Product.objects.create(name=f"Phone {i}", category=self.cat1, price=100 + i)
+        Product.objects.create(name="Old phone", category=self.cat1, price=1, is_active=False)
+        self.list_url = reverse('category-list')
+
+    def assertCounts(self, category, total, active):
+        category.refresh_from_db()
+        self.assertEqual((category.products_count, category.active_products_count), (total, active))
+
+    def test_create_counts_products(self):
+        self.assertCounts(self.cat1, 5, 4)
+        self.assertCounts(self.cat2, 0, 0)
+
+    def test_recategorize_and_toggle_active(self):
+        product = Product.objects.filter(category=self.cat1, is_active=True).first()
+        product.category = self.cat2
+        product.save()
+        self.assertCounts(self.cat1, 4, 3)
+        self.assertCounts(self.cat2, 1, 1)
+
+        product = Product.objects.get(pk=product.pk)
+        product.is_active = False
+        product.save(update_fields=['is_active'])
+        self.assertCounts(self.cat2, 1, 0)
+
+    def test_unrelated_update_issues_no_counter_query(self):
+        product = Product.objects.filter(category=self.cat1).first()
+        product.price = 5
+        with CaptureQueriesContext(connection) as ctx:
+            product.save()
+        self.assertFalse(any('products_category' in q['sql'] and 'UPDATE' in q['sql'] for q in ctx))
+
+    def test_instance_and_queryset_delete(self):
+        Product.objects.filter(category=self.cat1, is_active=False).get().delete()
+        self.assertCounts(self.cat1, 4, 4)
+        Product.objects.filter(category=self.cat1, price__lt=102).delete()
+        self.assertCounts(self.cat1, 2, 2)
+
+    def test_bulk_update_and_bulk_create(self):
+        Product.objects.filter(category=self.cat1).update(is_active=True)
+        self.assertCounts(self.cat1, 5, 5)
+        Product.objects.bulk_create([Product(name="Novel", category=self.cat2, price=1) for _ in range(3)])
+        self.assertCounts(self.cat2, 3, 3)
+
+    def test_destroy_with_reassign_moves_counts(self):
+        url = reverse('category-detail', args=[self.cat1.pk]) + f'?reassign_to={self.cat2.pk}'
+        resp = self.client.delete(url)
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounts(self.cat2, 5, 4)
+
+    def test_destroy_with_delete_products(self):
+        url = reverse('category-detail', args=[self.cat1.pk]) + '?delete_products=true'
+        resp = self.client.delete(url)
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Product.objects.exists())
+
+    def test_list_filters_and_orders_on_stored_column(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.list_url, {'min_products': 1, 'ordering': '-products_count'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('GROUP BY' in q['sql'] for q in ctx))
+        results = resp.json()['results']
+        self.assertEqual([c['id'] for c in results], [self.cat1.id])
+        self.assertEqual(results[0]['products_count'], 5)
+        self.assertEqual(results[0]['active_products_count'], 4)
+
+        resp = self.client.get(self.list_url, {'max_products': 0})
+        self.assertEqual([c['id'] for c in resp.json()['results']], [self.cat2.id])
+
+    def test_rebuild_command_repairs_drift(self):
+        Category.objects.filter(pk=self.cat1.pk).update(products_count=42, active_products_count=0)
+        out = StringIO()
+        call_command('rebuild_category_counts', stdout=out)
+        self.assertCounts(self.cat1, 5, 4)
+        self.assertIn('1 were out of date', out.getvalue())
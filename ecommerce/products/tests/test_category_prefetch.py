@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+
+
+class CategoryIncludeProductsTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            category = Category.objects.create(name=f"Category {i:02}", slug=f"category-{i}")
+            Product.objects.bulk_create(
+                [Product(name=f"Item {i}-{j}", category=category, price=j + 1) for j in range(4)]
+            )
+        cls.list_url = reverse('category-list')
+
+    def get_list(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.list_url, {'include_products': 'true', **params})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()['results'], len(ctx)
+
+    def test_query_count_constant_across_page_sizes(self):
+        small, small_queries = self.get_list(page_size=5)
+        large, large_queries = self.get_list(page_size=30)
+        self.assertEqual(len(small), 5)
+        self.assertEqual(len(large), 30)
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(large_queries, 3)  # count, page, products prefetch
+        self.assertTrue(all(len(c['products']) == 4 for c in large))
+
+    def test_products_limit_caps_each_category(self):
+        results, queries = self.get_list(page_size=30, products_limit=2)
+        self.assertEqual(queries, 3)
+        for category in results:
+            self.assertEqual(len(category['products']), 2)
+            # newest first
+            self.assertEqual([p['name'][-1] for p in category['products']], ['3', '2'])
+
+    def test_without_flag_products_are_not_loaded(self):
+        with self.assertNumQueries(2):
+            resp = self.client.get(self.list_url, {'page_size': 30})
+        self.assertTrue(all(c['products'] == [] for c in resp.json()['results']))
+
+    def test_retrieve_uses_prefetch(self):
+        category = Category.objects.first()
+        url = reverse('category-detail', args=[category.pk])
+        with self.assertNumQueries(2):
+            resp = self.client.get(url, {'include_products': 'true'})
+        self.assertEqual(len(resp.json()['products']), 4)
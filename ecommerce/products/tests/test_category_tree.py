@@ -0,0 +1,70 @@
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products.models import Category, CategoryClosure, Product
+
+
+class CategoryTreeTestCase(APITestCase):
+    def setUp(self):
+        # electronics > phones > smartphones > android > flagship, plus a sibling branch
+        self.chain = []
+        parent = None
+        for name in ["Electronics", "Phones", "Smartphones", "Android", "Flagship"]:
+            parent = Category.objects.create(name=name, slug=name.lower(), parent=parent)
+            self.chain.append(parent)
+        self.root, self.leaf = self.chain[0], self.chain[-1]
+        self.laptops = Category.objects.create(name="Laptops", slug="laptops", parent=self.root)
+        self.books = Category.objects.create(name="Books", slug="books")
+        for category in self.chain + [self.laptops, self.books]:
+            Product.objects.create(name=f"{category.name} item", category=category, price=1)
+
+    def test_descendants_in_one_query(self):
+        with self.assertNumQueries(1):
+            names = set(self.root.descendants().values_list('name', flat=True))
+        self.assertEqual(names, {"Phones", "Smartphones", "Android", "Flagship", "Laptops"})
+        self.assertIn(self.root, self.root.descendants(include_self=True))
+
+    def test_ancestors_in_one_query_root_first(self):
+        with self.assertNumQueries(1):
+            ancestors = list(self.leaf.ancestors())
+        self.assertEqual(ancestors, self.chain[:-1])
+        self.assertEqual(list(self.root.ancestors()), [])
+
+    def test_reparent_moves_whole_subtree(self):
+        phones = self.chain[1]
+        phones.parent = self.books
+        phones.save()
+        self.assertEqual(list(self.leaf.ancestors()), [self.books] + self.chain[1:-1])
+        self.assertEqual(set(self.root.descendants()), {self.laptops})
+        self.assertEqual(
+            CategoryClosure.objects.get(ancestor=self.books, descendant=self.leaf).depth, 4
+        )
+
+    def test_reparent_under_own_descendant_is_rejected(self):
+        self.root.parent = self.leaf
+        with self.assertRaises(ValidationError):
+            self.root.save()
+        self.assertEqual(self.root.descendants().count(), 5)
+
+    def test_delete_detaches_children(self):
+        self.chain[1].delete()
+        smartphones = Category.objects.get(pk=self.chain[2].pk)
+        self.assertIsNone(smartphones.parent_id)
+        self.assertEqual(list(self.leaf.ancestors()), self.chain[2:-1])
+        self.assertEqual(set(self.root.descendants()), {self.laptops})
+
+    def test_list_products_include_descendants(self):
+        url = reverse('category-category-products', args=[self.root.pk])
+        resp = self.client.get(url)
+        self.assertEqual(resp.data['count'], 1)
+
+        with self.assertNumQueries(3):  # category lookup, count, page
+            resp = self.client.get(url, {'include_descendants': 'true'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 6)
+
+        leaf_url = reverse('category-category-products', args=[self.leaf.pk])
+        with self.assertNumQueries(3):
+            resp = self.client.get(leaf_url, {'include_descendants': 'true'})
+        self.assertEqual(resp.data['count'], 1)
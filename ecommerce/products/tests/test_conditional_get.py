@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+from products.serializers import ProductSerializer
+from products.api.serializers import CategorySerializer
+
+
+class ProductConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.product = Product.objects.create(name="Phone", category=self.category, price=10)
+        Product.objects.create(name="Tablet", category=self.category, price=20)
+        self.list_url = reverse('product-list')
+        self.detail_url = reverse('product-detail', args=[self.product.pk])
+
+    def test_detail_has_strong_etag_and_last_modified(self):
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', resp)
+
+    def test_detail_if_none_match_is_304_without_serializing(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        for cached in (True, False):
+            with self.subTest(cached=cached), override_settings(PRODUCT_CACHE_ENABLED=cached), \
+                    mock.patch.object(ProductSerializer, 'to_representation') as to_representation:
+                resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(resp['ETag'], etag)
+            self.assertEqual(resp.content, b'')
+            to_representation.assert_not_called()
+
+    def test_cached_304_skips_database(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(0):
+            resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        resp = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_changes_detail_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.product.price = 11
+        self.product.save()
+        resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp['ETag'], etag)
+
+    def test_queryset_update_changes_etags(self):
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+        Product.objects.filter(pk=self.product.pk).update(price=12)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_category_delete_changes_detail_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        Category.objects.filter(pk=self.category.pk).delete()
+        resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNone(resp.data['category'])
+
+    def test_list_etag_round_trip(self):
+        first = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', first)
+        with override_settings(PRODUCT_CACHE_ENABLED=False), \
+                mock.patch.object(ProductSerializer, 'to_representation') as to_representation:
+            resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+    def test_list_etag_depends_on_page_and_rows(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertNotEqual(self.client.get(self.list_url, {'page_size': 1})['ETag'], etag)
+        Product.objects.create(name="Laptop", category=self.category, price=30)
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_cursor_list_etag_keeps_single_query(self):
+        params = {'pagination': 'cursor', 'page_size': 1}
+        etag = self.client.get(self.list_url, params)['ETag']
+        cache.clear()
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class CategoryConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.product = Product.objects.create(name="Phone", category=self.category, price=10)
+        self.list_url = reverse('category-list')
+
+    def test_list_if_none_match_is_304_without_serializing(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with mock.patch.object(CategorySerializer, 'to_representation') as to_representation:
+            resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+    def test_category_edit_and_counter_change_move_etag(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.category.description = "Gadgets"
+        self.category.save()
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        etag = resp['ETag']
+        Product.objects.create(name="Tablet", category=self.category, price=20)
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['results'][0]['products_count'], 2)
+
+    def test_nested_product_change_moves_etag(self):
+        params = {'include_products': 'true'}
+        etag = self.client.get(self.list_url, params)['ETag']
+        self.product.name = "Smartphone"
+        self.product.save()
+        resp = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['results'][0]['products'][0]['name'], "Smartphone")
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products import export
+from products.models import Category, Product
+
+User = get_user_model()
+
+
+class ProductExportTestCase(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345', is_staff=True
+        )
+        self.electronics = Category.objects.create(name="Electronics", slug="electronics")
+        self.phones = Category.objects.create(name="Phones", slug="phones", parent=self.electronics)
+        self.books = Category.objects.create(name="Books", slug="books")
+        self.phone = Product.objects.create(name="Phone", price='10.50', category=self.phones, stock=3)
+        self.cable = Product.objects.create(name="Cable, USB", price=2, category=self.electronics)
+        self.novel = Product.objects.create(name="Novel", price=5, category=self.books, is_active=False)
+        self.url = reverse('product-export')
+        self.client.force_authenticate(self.staff)
+
+    def stream(self, params=None):
+        resp = self.client.get(self.url, params or {})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        return resp, b''.join(resp.streaming_content).decode()
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user(username='u', email='u@example.com', password='x'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_is_default(self):
+        resp, body = self.stream()
+        self.assertEqual(resp['Content-Type'], 'text/csv')
+        self.assertIn('products.csv', resp['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([int(r['id']) for r in rows], [self.phone.pk, self.cable.pk, self.novel.pk])
+        self.assertEqual(rows[1]['name'], "Cable, USB")
+        self.assertEqual((rows[0]['price'], rows[0]['category_slug'], rows[2]['is_active']),
+                         ('10.50', 'phones', 'false'))
+
+    def test_ndjson(self):
+        resp, body = self.stream({'format': 'ndjson'})
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(rows[0]['name'], "Phone")
+        self.assertEqual(rows[0]['category_id'], self.phones.pk)
+        self.assertEqual(set(rows[0]), {column for column, _ in export.EXPORT_COLUMNS})
+
+    def test_filters(self):
+        _, body = self.stream({'format': 'ndjson', 'category': self.electronics.pk})
+        self.assertEqual({json.loads(l)['id'] for l in body.splitlines()}, {self.phone.pk, self.cable.pk})
+
+        _, body = self.stream({'format': 'ndjson', 'is_active': 'false'})
+        self.assertEqual([json.loads(l)['id'] for l in body.splitlines()], [self.novel.pk])
+
+        Product.objects.filter(pk=self.cable.pk).update(updated_at=timezone.now() - timedelta(days=2))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        _, body = self.stream({'format': 'ndjson', 'since': since})
+        self.assertNotIn(self.cable.pk, {json.loads(l)['id'] for l in body.splitlines()})
+
+    def test_invalid_since(self):
+        resp = self.client.get(self.url, {'since': 'yesterday'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reads_without_instantiating_models(self):
+        rows = export.iter_rows(export.export_queryset(), chunk_size=2)
+        self.assertIsInstance(next(rows), tuple)
+
+    def test_management_command(self):
+        out = io.StringIO()
+        call_command('export_products', '--format', 'ndjson', '--active', stdout=out)
+        self.assertEqual([json.loads(l)['id'] for l in out.getvalue().splitlines()], [self.phone.pk, self.cable.pk])
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from products.models import Category, Product, SlugCounter
+
+
+class ImportProductsTestCase(TestCase):
+    def setUp(self):
+        self.electronics = Category.objects.create(name="Electronics", slug="electronics")
+        self.books = Category.objects.create(name="Books", slug="books")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_products', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def assertCounts(self, category, total, active):
+        category.refresh_from_db()
+        self.assertEqual((category.products_count, category.active_products_count), (total, active))
+
+    def test_csv_creates_and_reports_throughput(self):
+        path = self.write('feed.csv', (
+            'slug,name,description,price,stock,is_active,category\n'
+            'phone,Phone,"Smart, fast",10.5,3,true,electronics\n'
+            ',Novel,,5,,false,Books\n'
+        ))
+        out, _ = self.run_import(path)
+        self.assertIn('Imported 2 of 2 rows (0 failed)', out)
+        self.assertIn('rows/s', out)
+        self.assertIn('peak RSS', out)
+        phone = Product.objects.get(slug='phone')
+        self.assertEqual((phone.description, str(phone.price), phone.stock), ("Smart, fast", '10.50', 3))
+        self.assertEqual(Product.objects.get(name='Novel').slug, 'novel')
+        self.assertCounts(self.electronics, 1, 1)
+        self.assertCounts(self.books, 1, 0)
+
+    def test_ndjson_upserts_by_slug_and_moves_counters(self):
+        existing = Product.objects.create(name="Phone", slug="phone", price=1, category=self.electronics)
+        created_at = existing.created_at
+        path = self.write('feed.ndjson', '\n'.join(json.dumps(row) for row in [
+            {'slug': 'phone', 'name': 'Phone v2', 'price': '12.00', 'category_slug': 'books', 'is_active': False},
+            {'slug': 'lamp', 'name': 'Lamp', 'price': 3, 'category_id': self.electronics.pk},
+        ]))
+        out, _ = self.run_import(path)
+        self.assertIn('Imported 2 of 2 rows', out)
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.category_id, existing.is_active), ("Phone v2", self.books.pk, False))
+        self.assertEqual(existing.created_at, created_at)
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertCounts(self.electronics, 1, 1)
+        self.assertCounts(self.books, 1, 0)
+
+    def test_row_errors_are_reported_and_skipped(self):
+        path = self.write('feed.ndjson', '\n'.join([
+            '{"name": "Phone", "price": "10"}',
+            '{broken',
+            '{"name": "Free", "price": "0"}',
+            '{"name": "Ghost", "price": "1", "category": "nope"}',
+            '{"name": "Void", "price": "NaN"}',
+        ]))
+        out, err = self.run_import(path)
+        self.assertIn('Imported 1 of 5 rows (4 failed)', out)
+        self.assertIn('line 2: Invalid JSON', err)
+        self.assertIn('line 3: price', err)
+        self.assertIn("line 4: category: No category 'nope'", err)
+        self.assertIn('line 5: price', err)
+
+    def test_create_categories(self):
+        path = self.write('feed.csv', 'name,price,category\nMug,4,Kitchen Ware\n')
+        self.run_import(path, '--create-categories')
+        kitchen = Category.objects.get(slug='kitchen-ware')
+        self.assertCounts(kitchen, 1, 1)
+
+    def test_imported_slugs_are_claimed(self):
+        path = self.write('feed.csv', 'slug,name,price\nmug-7,Mug,4\n')
+        self.run_import(path)
+        self.assertEqual(SlugCounter.objects.get(base='mug').last_suffix, 7)
+        self.assertEqual(Product.objects.create(name="Mug", price=1).slug, 'mug-8')
+
+    def test_worker_pool_matches_inline(self):
+        rows = '\n'.join(json.dumps({'name': f'Item {i}', 'price': 1, 'slug': f'item-{i}'}) for i in range(50))
+        path = self.write('feed.ndjson', rows)
+        out, _ = self.run_import(path, '--workers', '2', '--batch-size', '7')
+        self.assertIn('Imported 50 of 50 rows', out)
+        self.assertEqual(Product.objects.count(), 50)
+
+    def test_unknown_extension_needs_format(self):
+        path = self.write('feed.txt', '')
+        with self.assertRaises(CommandError):
+            self.run_import(path)
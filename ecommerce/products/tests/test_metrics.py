@@ -0,0 +1,111 @@
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ecommerce import metrics
+from products.models import Category, Product
+
+User = get_user_model()
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, PRODUCT_CACHE_ENABLED=False)
+class RequestMetricsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        self.product = Product.objects.create(name="Phone", category=category, price=10)
+        Product.objects.create(name="Tablet", category=category, price=20)
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345', is_staff=True
+        )
+
+    def server_timing(self, resp):
+        return dict(
+            (part.split(';')[0], part) for part in resp['Server-Timing'].split(', ')
+        )
+
+    def test_server_timing_counts_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('product-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        timing = self.server_timing(resp)
+        self.assertEqual(set(timing), {'db', 'serialize', 'total'})
+        self.assertIn(f'desc="{len(ctx)} queries"', timing['db'])
+
+    def test_structured_log_line(self):
+        with self.assertLogs('ecommerce.metrics', 'INFO') as logs:
+            self.client.get(reverse('product-detail', args=[self.product.pk]))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['url_name'], 'product-detail')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['queries'], 0)
+        self.assertGreater(line['serializer_ms'], 0)
+        self.assertGreaterEqual(line['total_ms'], line['db_ms'])
+
+    def test_histogram_per_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse('product-list'))
+        self.client.get(reverse('product-detail', args=[self.product.pk]))
+        self.client.force_authenticate(self.staff)
+        data = self.client.get(reverse('request-metrics')).data
+        self.assertTrue(data['enabled'])
+        self.assertEqual(data['endpoints']['product-list']['count'], 3)
+        self.assertEqual(data['endpoints']['product-detail']['count'], 1)
+        listing = data['endpoints']['product-list']
+        self.assertEqual(sum(listing['buckets'].values()), 3)
+        self.assertLessEqual(listing['latency_ms']['p50'], listing['latency_ms']['max'])
+
+        self.client.delete(reverse('request-metrics'))
+        self.assertNotIn('product-list', self.client.get(reverse('request-metrics')).data['endpoints'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_async_views_are_measured(self):
+        # the ORM runs on this test's thread, whose connection predates the middleware
+        await sync_to_async(metrics.instrument_connections)()
+        response = await self.async_client.get(reverse('async-product-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertEqual(metrics.registry.snapshot()['async-product-list']['count'], 1)
+
+    def test_nested_serializers_are_timed_once(self):
+        outer = metrics.RequestMetrics()
+        token = metrics._current.set(outer)
+        try:
+            metrics.instrument_serializers()
+            from products.api.serializers import CategorySerializer
+            CategorySerializer(Category.objects.all(), many=True).data
+        finally:
+            metrics._current.reset(token)
+        self.assertFalse(outer.serializing)
+        self.assertGreater(outer.serializer_seconds, 0)
+
+
+class RequestMetricsDisabledTestCase(APITestCase):
+    def test_nothing_is_recorded(self):
+        metrics.registry.reset()
+        resp = self.client.get(reverse('product-list'))
+        self.assertNotIn('Server-Timing', resp)
+        self.assertEqual(metrics.registry.snapshot(), {})
+
+
+class HistogramTestCase(APITestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = metrics.Histogram()
+        for ms in [1] * 90 + [40] * 9 + [700]:
+            histogram.observe(ms, queries=2, db_ms=0.5, serializer_ms=0.1)
+        self.assertEqual(histogram.percentile(50), 5)
+        self.assertEqual(histogram.percentile(95), 50)
+        self.assertEqual(histogram.percentile(100), 700)
+        self.assertEqual(histogram.snapshot()['queries_max'], 2)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.pagination import Cursor
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+from products.pagination import KeysetPagination
+
+
+class KeysetPaginationTestCase(APITestCase):
+    PAGE_SIZE = 2
+    TOTAL = 20000  # enough rows for page 10,000 at page_size=2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Electronics", slug="electronics")
+        start = timezone.now()
+        # pairs share a timestamp so the id tie-breaker is exercised too
+        Product.objects.bulk_create(
+            [
+                Product(
+                    category=cls.category,
+                    name=f"Phone {i}",
+                    price=1,
+                    created_at=start - timedelta(seconds=i // 2),
+                )
+                for i in range(cls.TOTAL)
+            ],
+            batch_size=1000,
+        )
+        cls.ordered_ids = list(
+            Product.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        cls.list_url = reverse('product-list')
+        cls.category_products_url = reverse('category-category-products', args=[cls.category.pk])
+
+    def setUp(self):
+        # keep assertNumQueries about the database, not the response cache
+        cache.clear()
+
+    def cursor_for_page(self, page):
+        """Encode the token a client would hold after walking to `page`."""
+        anchor = Product.objects.get(pk=self.ordered_ids[(page - 1) * self.PAGE_SIZE - 1])
+        paginator = KeysetPagination()
+        paginator.base_url = 'http://testserver/'
+        position = paginator._get_position_from_instance(anchor, paginator.ordering)
+        link = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+        return parse_qs(urlparse(link).query)['cursor'][0]
+
+    def expected_ids(self, page):
+        start = (page - 1) * self.PAGE_SIZE
+        return self.ordered_ids[start:start + self.PAGE_SIZE]
+
+    def test_cursor_mode_first_page_has_no_count(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.list_url, {'pagination': 'cursor', 'page_size': self.PAGE_SIZE})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', resp.data)
+        self.assertIsNone(resp.data['previous'])
+        self.assertIsNotNone(resp.data['next'])
+        self.assertEqual([p['id'] for p in resp.data['results']], self.expected_ids(1))
+
+    def test_constant_query_cost_at_deep_page(self):
+        cursor = self.cursor_for_page(10000)
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.list_url, {'cursor': cursor, 'page_size': self.PAGE_SIZE})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in resp.data['results']], self.expected_ids(10000))
+        self.assertIsNone(resp.data['next'])
+        self.assertIsNotNone(resp.data['previous'])
+
+    def test_next_and_previous_links_round_trip(self):
+        resp = self.client.get(self.list_url, {'pagination': 'cursor', 'page_size': self.PAGE_SIZE})
+        page2 = self.client.get(resp.data['next'])
+        self.assertEqual([p['id'] for p in page2.data['results']], self.expected_ids(2))
+        page3 = self.client.get(page2.data['next'])
+        self.assertEqual([p['id'] for p in page3.data['results']], self.expected_ids(3))
+        back = self.client.get(page3.data['previous'])
+        self.assertEqual([p['id'] for p in back.data['results']], self.expected_ids(2))
+
+    def test_ordering_param_cannot_break_keyset(self):
+        resp = self.client.get(
+            self.list_url, {'pagination': 'cursor', 'page_size': self.PAGE_SIZE, 'ordering': 'price'}
+        )
+        self.assertEqual([p['id'] for p in resp.data['results']], self.expected_ids(1))
+
+    def test_invalid_cursor_is_404(self):
+        resp = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_still_default(self):
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], self.TOTAL)
+
+    def test_category_products_supports_cursor_mode(self):
+        cursor = self.cursor_for_page(10000)
+        first = self.client.get(
+            self.category_products_url, {'pagination': 'cursor', 'page_size': self.PAGE_SIZE}
+        )
+        with self.assertNumQueries(2):  # category lookup + one page query
+            deep = self.client.get(self.category_products_url, {'cursor': cursor, 'page_size': self.PAGE_SIZE})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in first.data['results']], self.expected_ids(1))
+        self.assertEqual([p['id'] for p in deep.data['results']], self.expected_ids(10000))
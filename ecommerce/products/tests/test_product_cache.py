@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from inventory.services import reserve_many
+from products import cache as product_cache
+from products.models import Category, Product
+
+User = get_user_model()
+
+
+class ProductResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        product_cache.reset_cache_stats()
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345', is_staff=True
+        )
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.product = Product.objects.create(name="Phone", category=self.category, price=10)
+        self.hidden = Product.objects.create(name="Prototype", price=10, is_active=False)
+        self.list_url = reverse('product-list')
+        self.detail_url = reverse('product-detail', args=[self.product.pk])
+
+    def test_list_hit_skips_database(self):
+        first = self.client.get(self.list_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(product_cache.cache_stats(), {'list_miss': 1, 'list_hit': 1})
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(self.list_url)
+        resp = self.client.get(self.list_url, {'page_size': 1})
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+    def test_staff_and_public_are_cached_separately(self):
+        public = self.client.get(self.list_url).json()
+        self.client.force_authenticate(self.staff)
+        staff = self.client.get(self.list_url)
+        self.assertEqual(staff['X-Cache'], 'MISS')
+        self.assertEqual(public['count'], 1)
+        self.assertEqual(staff.json()['count'], 2)
+
+    def test_write_bumps_generation_and_version(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.product.name = "Renamed phone"
+        self.product.save()
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp.json()['name'], "Renamed phone")
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'MISS')
+
+    def test_other_products_detail_survives_unrelated_write(self):
+        self.client.get(self.detail_url)
+        Product.objects.create(name="Another", price=1)
+        self.assertEqual(self.client.get(self.detail_url)['X-Cache'], 'HIT')
+
+    def test_bulk_update_and_delete_invalidate(self):
+        self.client.get(self.detail_url)
+        Product.objects.filter(pk=self.product.pk).update(price=99)
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp.json()['price'], '99.00')
+        Product.objects.filter(pk=self.product.pk).delete()
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stock_movements_invalidate_list_and_detail(self):
+        first = self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            Product.objects.filter(pk=self.product.pk).update_stock([self.product.pk], 7)
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp.json()['stock'], 7)
+
+        reserve_many({self.product.pk: 3})
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp.json()['results'][0]['stock'], 4)
+
+    @override_settings(PRODUCT_CACHE_INVALIDATE_THRESHOLD=1)
+    def test_catalog_wide_updates_bump_the_detail_generation(self):
+        other = Product.objects.create(name="Tablet", category=self.category, price=10)
+        self.client.get(self.detail_url)
+        keys = [product_cache.VERSION_KEY.format(pk=pk) for pk in (self.product.pk, other.pk)]
+        versions = cache.get_many(keys)
+        Product.objects.filter(category=self.category).update(price=5)
+        # no version key per product, but no detail entry survives either
+        self.assertEqual(cache.get_many(keys), versions)
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual(resp.json()['price'], '5.00')
+
+    def test_api_destroy_invalidates(self):
+        self.product.owner = self.staff
+        self.product.save()
+        self.client.get(self.detail_url)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.delete(self.detail_url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_not_found_is_not_cached(self):
+        url = reverse('product-detail', args=[self.hidden.pk])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(product_cache.cache_stats(), {'detail_miss': 2})
+
+    def test_evicted_generation_does_not_resurrect_old_entries(self):
+        self.client.get(self.list_url)
+        cache.delete(product_cache.GENERATION_KEY)
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'MISS')
+
+    @override_settings(PRODUCT_CACHE_ENABLED=False)
+    def test_disabled(self):
+        self.client.get(self.list_url)
+        resp = self.client.get(self.list_url)
+        self.assertNotIn('X-Cache', resp)
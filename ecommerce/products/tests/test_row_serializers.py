@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from products.api.serializers import CategorySerializer, ProductBriefSerializer
+from products.models import Category, Product
+from products.row_serializers import RowSerializer
+from products.serializers import ProductSerializer
+
+User = get_user_model()
+
+
+class RowSerializerTestCase(TestCase):
+    """Fast-path output must render to exactly the bytes of the serializer it was compiled from."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        self.category = Category.objects.create(name="Electronics", slug="electronics", description="Gadgets")
+        Category.objects.create(name="Empty", slug="empty")
+        Product.objects.create(name="Phone", price=Decimal('10'), stock=3, category=self.category, owner=self.owner)
+        Product.objects.create(name="Cable", price=Decimal('0.5'), description="USB-C", category=self.category)
+        Product.objects.create(name="Server", price=Decimal('12345678.99'), is_active=False, stock=0)
+
+    def assertSameBytes(self, serializer_class, queryset, **options):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        rows = RowSerializer(serializer_class, **options)
+        self.assertEqual(JSONRenderer().render(rows.serialize(rows.queryset(queryset))), expected)
+
+    def test_product_serializer(self):
+        # null owner (key omitted), null category, null description, decimals needing padding
+        self.assertSameBytes(ProductSerializer, Product.objects.all())
+
+    def test_current_time_zone_is_honoured(self):
+        with timezone.override('America/New_York'):
+            self.assertSameBytes(ProductSerializer, Product.objects.all())
+
+    def test_brief_and_category_serializers(self):
+        self.assertSameBytes(ProductBriefSerializer, Product.objects.all())
+        self.assertSameBytes(CategorySerializer, Category.objects.all(), computed={'products': lambda row: []})
+
+    def test_unsupported_fields_fail_loudly(self):
+        with self.assertRaises(ImproperlyConfigured):
+            RowSerializer(CategorySerializer).columns
+
+        class Nested(serializers.ModelSerializer):
+            category = CategorySerializer()
+
+            class Meta:
+                model = Product
+                fields = ['id', 'category']
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowSerializer(Nested).columns
+
+    def test_only_needed_columns_are_selected(self):
+        rows = RowSerializer(ProductBriefSerializer, extra=('created_at',))
+        self.assertEqual(rows.columns, ('created_at', 'id', 'name', 'price'))
+
+    def assertPageBytes(self, response, count, results):
+        self.assertEqual(response.content, JSONRenderer().render({
+            'count': count, 'next': None, 'previous': None, 'results': results,
+        }))
+
+    def test_list_endpoints_match_serializers(self):
+        response = self.client.get(reverse('product-list'))
+        self.assertPageBytes(response, 2, ProductSerializer(Product.objects.filter(is_active=True), many=True).data)
+
+        response = self.client.get(reverse('category-category-products', args=[self.category.pk]))
+        self.assertPageBytes(response, 2, ProductBriefSerializer(self.category.products.all(), many=True).data)
+
+        response = self.client.get(reverse('category-list'))
+        self.assertPageBytes(response, 2, CategorySerializer(Category.objects.order_by('name'), many=True).data)
@@ -0,0 +1,83 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+
+
+class ProductSearchTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.electronics = Category.objects.create(name="Electronics", slug="electronics")
+        cls.phones = Category.objects.create(name="Phones", slug="phones", parent=cls.electronics)
+        cls.books = Category.objects.create(name="Books", slug="books")
+        cls.case = Product.objects.create(
+            name="Leather iPhone case", description="Slim case", category=cls.phones, price=20
+        )
+        cls.charger = Product.objects.create(
+            name="USB charger", description="Fast charger, fits every iPhone", category=cls.electronics, price=35
+        )
+        cls.book = Product.objects.create(
+            name="iPhone photography", description="A book about phones", category=cls.books, price=15
+        )
+        cls.hidden = Product.objects.create(name="iPhone prototype", price=999, is_active=False)
+        cls.url = reverse('product-search')
+
+    def search(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [p['id'] for p in resp.data['results']]
+
+    def test_name_matches_rank_above_description_matches(self):
+        ids = self.search(q='iphone')
+        self.assertEqual(set(ids), {self.case.id, self.charger.id, self.book.id})
+        self.assertEqual(ids[-1], self.charger.id)
+
+    def test_inactive_products_hidden_from_anonymous(self):
+        self.assertNotIn(self.hidden.id, self.search(q='prototype'))
+
+    def test_stemming_and_prefix(self):
+        self.assertEqual(self.search(q='chargers'), [self.charger.id])
+        self.assertEqual(self.search(q='photo'), [self.book.id])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search(q='leather iphone'), [self.case.id])
+
+    def test_category_subtree_and_price_filters(self):
+        self.assertEqual(set(self.search(q='iphone', category=self.electronics.id)), {self.case.id, self.charger.id})
+        self.assertEqual(self.search(q='iphone', category=self.phones.id), [self.case.id])
+        self.assertEqual(set(self.search(q='iphone', min_price='16', max_price='30')), {self.case.id})
+
+    def test_price_filters_must_be_finite_numbers(self):
+        for value in ('abc', 'NaN', 'sNaN', 'Infinity', '-inf'):
+            resp = self.client.get(self.url, {'q': 'iphone', 'min_price': value})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, value)
+            self.assertIn('min_price', resp.data)
+        resp = self.client.get(self.url, {'q': 'iphone', 'max_price': 'NaN'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('max_price', resp.data)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.case.name = "Leather wallet"
+        self.case.save()
+        self.assertEqual(self.search(q='wallet'), [self.case.id])
+        self.assertNotIn(self.case.id, self.search(q='leather iphone'))
+        self.case.delete()
+        self.assertEqual(self.search(q='wallet'), [])
+
+    def test_bulk_writes_are_indexed(self):
+        Product.objects.bulk_create([Product(name=f"Kettle {i}", price=10) for i in range(3)])
+        Product.objects.filter(name="USB charger").update(name="USB kettle")
+        self.assertEqual(len(self.search(q='kettle')), 4)
+
+    def test_paginated_with_count(self):
+        resp = self.client.get(self.url, {'q': 'iphone', 'page_size': 2})
+        self.assertEqual(resp.data['count'], 3)
+        self.assertEqual(len(resp.data['results']), 2)
+
+    def test_query_syntax_is_not_passed_through(self):
+        self.assertEqual(self.search(q='"iphone OR'), [])
+        self.assertEqual(self.search(q='NEAR(iphone'), [])
+
+    def test_missing_query_is_400(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from products.models import Product, SlugCounter
+
+
+class ProductSlugTestCase(TestCase):
+    def create(self, name, **kwargs):
+        return Product.objects.create(name=name, price=1, **kwargs)
+
+    def test_duplicate_names_get_sequential_suffixes(self):
+        slugs = [self.create("iPhone Case").slug for _ in range(3)]
+        self.assertEqual(slugs, ["iphone-case", "iphone-case-1", "iphone-case-2"])
+
+    def test_query_count_does_not_grow_with_duplicates(self):
+        self.create("iPhone Case")
+        with CaptureQueriesContext(connection) as second:
+            self.create("iPhone Case")
+        for _ in range(48):
+            self.create("iPhone Case")
+        with CaptureQueriesContext(connection) as fifty_first:
+            product = self.create("iPhone Case")
+        self.assertEqual(len(second), len(fifty_first))
+        self.assertEqual(product.slug, "iphone-case-50")
+
+    def test_explicit_slug_is_kept(self):
+        product = self.create("iPhone Case", slug="custom")
+        self.assertEqual(product.slug, "custom")
+        self.assertFalse(SlugCounter.objects.exists())
+
+    def test_collision_with_untracked_slug_is_retried(self):
+        self.create("Widget")
+        # written around the allocator, e.g. through the admin
+        self.create("Other", slug="widget-1")
+        self.create("Other", slug="widget-2")
+        product = self.create("Widget")
+        self.assertEqual(product.slug, "widget-3")
+        self.assertEqual(SlugCounter.objects.get(base="widget").last_suffix, 3)
+
+    def test_unsluggable_name_falls_back(self):
+        self.assertEqual(self.create("!!!").slug, "product")
+
+    def test_reserve_returns_consecutive_block(self):
+        self.assertEqual(SlugCounter.reserve("mug", count=2), ["mug", "mug-1"])
+        self.assertEqual(SlugCounter.reserve("mug", count=3), ["mug-2", "mug-3", "mug-4"])
+
+    def test_reserve_many_mixes_new_and_existing_bases(self):
+        SlugCounter.reserve("mug")
+        slugs = SlugCounter.reserve_many({"mug": 2, "cup": 2}, batch_size=1)
+        self.assertEqual(slugs, {"mug": ["mug-1", "mug-2"], "cup": ["cup", "cup-1"]})
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+from products.serializers import ProductSerializer
+
+
+class SparseFieldsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.phone = Product.objects.create(name="Phone", price=10, description="A phone", category=self.category)
+        self.loose = Product.objects.create(name="Loose", price=5)
+
+    def get(self, name, args=(), **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(name, args=args), params)
+        product_selects = [q['sql'] for q in ctx.captured_queries if 'FROM "products_product"' in q['sql']
+                           and 'COUNT(' not in q['sql']]
+        return response, product_selects[-1]
+
+    def test_fields_shrink_payload_and_select(self):
+        response, sql = self.get('product-list', fields='id,name,price')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0], {'id': self.loose.pk, 'name': "Loose", 'price': '5.00'})
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+        response, sql = self.get('product-detail', args=[self.phone.pk], fields='name')
+        self.assertEqual(response.json(), {'name': "Phone"})
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_default_responses_do_not_join(self):
+        _, sql = self.get('product-list')
+        self.assertNotIn('"products_category"', sql)
+        _, sql = self.get('product-detail', args=[self.phone.pk])
+        self.assertNotIn('"products_category"', sql)
+
+    def test_expand_category(self):
+        response, sql = self.get('product-list', expand='category', fields='id')
+        self.assertIn('JOIN "products_category"', sql)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.loose.pk, 'category': None},
+            {'id': self.phone.pk, 'category': {'id': self.category.pk, 'name': "Electronics"}},
+        ])
+        response, sql = self.get('product-detail', args=[self.phone.pk], expand='category')
+        self.assertIn('JOIN "products_category"', sql)
+        self.assertEqual(response.json()['category'], {'id': self.category.pk, 'name': "Electronics"})
+
+    def test_expanded_list_matches_serializer(self):
+        response, _ = self.get('product-list', expand='category')
+        expected = ProductSerializer(Product.objects.all(), many=True, expand=('category',)).data
+        self.assertEqual(response.content, JSONRenderer().render({
+            'count': 2, 'next': None, 'previous': None, 'results': expected,
+        }))
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('product-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret', str(response.json()['fields']))
+        response = self.client.get(reverse('product-detail', args=[self.phone.pk]), {'expand': 'owner'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_category_rename_reaches_cached_expansions(self):
+        url = reverse('product-detail', args=[self.phone.pk])
+        first = self.client.get(url, {'expand': 'category'})
+        self.assertEqual(self.client.get(url, {'expand': 'category'})['X-Cache'], 'HIT')
+        self.category.name = "Gadgets"
+        self.category.save()
+        response = self.client.get(url, {'expand': 'category'})
+        self.assertEqual((response['X-Cache'], response.json()['category']['name']), ('MISS', "Gadgets"))
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        # plain responses don't embed the category and stay cached
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_category_products(self):
+        response, sql = self.get('category-category-products', args=[self.category.pk], fields='name')
+        self.assertEqual(response.json()['results'], [{'name': "Phone"}])
+        self.assertNotIn('"price"', sql)
+        response, sql = self.get('category-category-products', args=[self.category.pk], expand='category')
+        self.assertIn('JOIN "products_category"', sql)
+        self.assertEqual(response.json()['results'], [{
+            'id': self.phone.pk, 'name': "Phone", 'price': '10.00',
+            'category': {'id': self.category.pk, 'name': "Electronics"},
+        }])
+
+    def test_async_endpoints_agree(self):
+        for name, args in (('product-list', []), ('product-detail', [self.phone.pk])):
+            for params in ({'fields': 'id,price'}, {'expand': 'category'}):
+                with self.subTest(name=name, params=params):
+                    sync = self.client.get(reverse(name, args=args), params)
+                    response = self.client.get(reverse(f'async-{name}', args=args), params)
+                    self.assertEqual(response.content, sync.content)
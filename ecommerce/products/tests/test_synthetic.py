@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from products.models import Category, CategoryClosure, Product
+
+User = get_user_model()
+
+
+class GenerateDatasetTestCase(TestCase):
+    def generate(self, **options):
+        out = StringIO()
+        call_command('generate_dataset', products=200, users=10, depth=3, fanout=2, batch_size=64,
+                     stdout=out, **options)
+        return out.getvalue()
+
+    def snapshot(self):
+        return list(Product.objects.order_by('created_at').values_list(
+            'name', 'slug', 'price', 'stock', 'is_active', 'category__slug', 'owner__email', 'created_at',
+        ))
+
+    def test_tree_users_and_products(self):
+        out = self.generate()
+        self.assertIn('Generated 14 categories, 10 users and 200 products', out)
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Category.objects.filter(parent=None).count(), 2)
+        leaf = Category.objects.get(slug='category-2-1-2')
+        self.assertEqual([c.slug for c in leaf.ancestors()], ['category-2', 'category-2-1'])
+        self.assertEqual(CategoryClosure.objects.count(), 2 * 1 + 4 * 2 + 8 * 3)
+        # products sit on the 8 leaves and the counters match the rows
+        self.assertEqual(Product.objects.values('category').distinct().count(), 8)
+        root = Category.objects.get(slug='category-1')
+        self.assertEqual(Product.objects.filter(category__in=root.subtree_ids()).count(), 100)
+        counts = dict(Category.objects.values_list('pk', 'active_products_count'))
+        Category.refresh_product_counts()
+        self.assertEqual(dict(Category.objects.values_list('pk', 'active_products_count')), counts)
+        self.assertEqual(sum(Category.objects.values_list('products_count', flat=True)), 200)
+
+    def test_same_seed_same_data(self):
+        self.generate(seed=7)
+        first = self.snapshot()
+        Product.objects.all().delete()
+        Category.objects.all().delete()
+        User.objects.all().delete()
+        self.generate(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_user_password_is_usable(self):
+        self.generate()
+        self.assertTrue(User.objects.get(email='user3@example.com').check_password('benchmark'))
+
+    def test_new_products_do_not_collide_with_generated_slugs(self):
+        self.generate()
+        name = Product.objects.order_by('-created_at').values_list('name', flat=True).first()
+        base = name.rsplit(' ', 1)[0]
+        product = Product.objects.create(name=base, price=1)  # an IntegrityError if the counter lagged
+        self.assertNotEqual(product.slug, Product.slug_base(name))
+
+    def test_refuses_non_empty_catalog(self):
+        Category.objects.create(name="Existing", slug="existing")
+        with self.assertRaises(CommandError):
+            self.generate()
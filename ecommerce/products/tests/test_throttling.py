@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from ecommerce.throttling import SlidingWindowLimiter, reset_limits
+
+User = get_user_model()
+
+
+def rates(**rates):
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {scope.replace('_', '.'): rate for scope, rate in rates.items()},
+    })
+
+
+class SlidingWindowTestCase(SimpleTestCase):
+    def setUp(self):
+        reset_limits()
+        self.limiter = SlidingWindowLimiter()
+        clock = mock.patch('ecommerce.throttling.time.time', return_value=600.0)
+        self.clock = clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_limit_within_a_window(self):
+        results = [self.limiter.hit('k', 3, 60) for _ in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertEqual(results[-1][1], 60)
+        self.assertTrue(self.limiter.hit('other', 3, 60)[0])
+
+    def test_previous_window_slides_out(self):
+        for _ in range(3):
+            self.limiter.hit('k', 3, 60)
+        # a quarter into the next window, 3/4 of the last one still counts: 2.25 + 1
+        self.clock.return_value = 675.0
+        allowed, wait = self.limiter.hit('k', 3, 60)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 60 * (1 - 2 / 3) - 15)
+        self.clock.return_value = 675.0 + wait
+        self.assertFalse(self.limiter.hit('k', 3, 60)[0])   # the denied hit counted too
+        self.clock.return_value = 720.0
+        self.assertTrue(self.limiter.hit('k', 3, 60)[0])
+
+    def test_concurrent_hits_are_counted_once_each(self):
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: self.limiter.hit('k', 50, 60)[0], range(200)))
+        self.assertEqual(results.count(True), 50)
+
+
+class ThrottledViewsTestCase(APITestCase):
+    def setUp(self):
+        reset_limits()
+        self.user = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+
+    def login(self, username, address='10.0.0.1'):
+        return self.client.post(reverse('login'), {'username': username, 'password': 'wrong'}, format='json',
+                                REMOTE_ADDR=address)
+
+    @rates(login_ip='100/min', login_username='3/min')
+    def test_login_is_limited_per_username_across_addresses(self):
+        for i in range(3):
+            self.assertEqual(self.login('Bob@example.com', f'10.0.0.{i}').status_code, 400)
+        response = self.login('bob@example.com', '10.0.0.9')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.login('amy@example.com').status_code, 400)
+        # the token endpoint shares the login scope
+        response = self.client.post(reverse('token-obtain'), {'username': 'bob@example.com', 'password': 'x'},
+                                    format='json')
+        self.assertEqual(response.status_code, 429)
+
+    @rates(login_ip='2/min', login_username='100/min')
+    def test_login_is_limited_per_address(self):
+        self.login('a@example.com')
+        self.login('b@example.com')
+        self.assertEqual(self.login('c@example.com').status_code, 429)
+        self.assertEqual(self.login('c@example.com', '10.0.0.2').status_code, 400)
+
+    @rates(products_write_user='2/min')
+    def test_product_writes_are_limited_per_user(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('product-list')
+        for i in range(2):
+            response = self.client.post(url, {'name': f'Lamp {i}', 'price': '1.00'}, format='json')
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post(url, {'name': 'Lamp 3', 'price': '1.00'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        other = User.objects.create_user(username='amy', email='amy@example.com', password='x')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.post(url, {'name': 'Lamp 4', 'price': '1.00'}, format='json').status_code, 201)
+
+    @rates()
+    def test_scopes_without_a_rate_are_not_limited(self):
+        for _ in range(10):
+            self.assertEqual(self.login('bob@example.com').status_code, 400)
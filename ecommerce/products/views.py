@@ -1,11 +1,28 @@
 import logging
+from decimal import Decimal, InvalidOperation
+from itertools import islice
 from rest_framework import viewsets, status
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import DatabaseError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Product
+from django.utils import timezone
+from . import cache as product_cache, conditional, export
+from .models import Category, CategoryClosure, Product
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
 from .serializers import ProductSerializer
+from .row_serializers import RowSerializer
+from .pagination import PageOrCursorPagination, StandardResultsSetPagination
+from .search import get_search_backend
+from .tasks import announce_product
 from .permissions import IsOwnerOrStaffOrReadOnly
+from ecommerce.throttling import UserRateThrottle
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 logger = logging.getLogger(__name__)
@@ -14,10 +31,29 @@ class ProductViewSet(viewsets.ModelViewSet):
     """
     ModelViewSet providing list/retrieve/create/update/destroy for Product.
     Uses select_related to optimize queries for owner and category.
+    Listing is page-numbered by default; ?pagination=cursor switches to
+    keyset pagination on (created_at, id) for deep pages.
+    list/retrieve responses go through the versioned cache in products/cache.py
+    and carry ETag/Last-Modified validators (products/conditional.py).
+    Lists are read with .values() and built by row_serializer, which renders
+    the same bytes as ProductSerializer at a fraction of the cost.
+    Reads accept ?fields=id,name,price and ?expand=category (the category as
+    {id, name} instead of its id); both narrow the SELECT, and the category
+    is joined only when expanded.
     """
     serializer_class = ProductSerializer
+    # the validators' and the cursor's columns are read whatever ?fields= asks for
+    row_serializer = RowSerializer(
+        ProductSerializer, extra=('id', 'updated_at', 'category_id', 'owner_id', 'created_at'),
+    )
+    pagination_class = PageOrCursorPagination
     permission_classes = [IsOwnerOrStaffOrReadOnly]  # object-level permission included
+    # writes only, per user, shared by every worker (ecommerce/throttling.py)
+    throttle_classes = [UserRateThrottle]
+    throttle_scope = 'products.write'
     queryset = Product.objects.select_related('owner', 'category').all()
+    bulk_chunk_size = 1000
+    sparse_actions = ('list', 'retrieve', 'search')
 
     def get_permissions(self):
         # keep default behavior but ensure read-only for unauthenticated
@@ -25,10 +61,100 @@ class ProductViewSet(viewsets.ModelViewSet):
             return [IsAuthenticatedOrReadOnly()]
         return [permission() for permission in self.permission_classes]
 
+    def get_throttles(self):
+        if self.request.method in SAFE_METHODS:
+            return []
+        return super().get_throttles()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response('list', lambda: product_cache.list_key(request),
+                                    lambda: self.render_list(request))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        render = lambda: self.render_detail(request)
+        if not str(pk).isdigit():
+            return render()
+        return self.cached_response('detail', lambda: product_cache.detail_key(request, pk), render)
+
+    def render_list(self, request):
+        queryset = self.list_queryset()
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        # the ETag comes from the fetched rows, so a 304 skips serialization entirely
+        etag = conditional.collection_etag(
+            request, rows, self.row_validator_parts,
+            conditional.page_envelope(self.paginator) if page is not None else None,
+        )
+        response = conditional.not_modified(request, etag)
+        if response is None:
+            data = self.serialize_list(rows)
+            response = self.get_paginated_response(data) if page is not None else Response(data)
+        return conditional.set_validators(response, etag)
+
+    def list_queryset(self):
+        """The filtered list as dict rows, shared with the async list view."""
+        return self.get_row_serializer().queryset(self.filter_queryset(self.get_queryset()))
+
+    def serialize_list(self, rows):
+        return self.get_row_serializer().serialize(rows)
+
+    def sparse_options(self):
+        """?fields= / ?expand= as serializer kwargs, parsed once per request."""
+        if not hasattr(self, '_sparse_options'):
+            self._sparse_options = self.get_serializer_class().sparse_options(self.request.query_params)
+        return self._sparse_options
+
+    def expands_category(self):
+        return 'category' in self.sparse_options().get('expand', ())
+
+    def get_row_serializer(self):
+        # an embedded category is covered by the validators through its updated_at
+        extra = ('category__updated_at',) if self.expands_category() else ()
+        return self.row_serializer.variant(extra=extra, **self.sparse_options())
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_actions:
+            kwargs.update(self.sparse_options())
+        return super().get_serializer(*args, **kwargs)
+
+    def detail_validators(self, instance):
+        related = ('category_id', 'owner_id') + (('category.updated_at',) if self.expands_category() else ())
+        return conditional.object_validators(instance, *related)
+
+    def render_detail(self, request):
+        instance = self.get_object()
+        etag, last_modified = self.detail_validators(instance)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return conditional.set_validators(response, etag, last_modified)
+
+    @staticmethod
+    def row_validator_parts(row):
+        return (row['id'], row['updated_at'].isoformat(), row['category_id'], row['owner_id'],
+                row.get('category__updated_at'))
+
+    def cached_response(self, kind, make_key, render):
+        if not product_cache.is_enabled():
+            return render()
+        key = make_key()
+        entry = product_cache.lookup(kind, key)
+        if entry is not None:
+            data, etag, last_modified = entry
+            response = conditional.not_modified(self.request, etag, last_modified) or Response(data)
+            conditional.set_validators(response, etag, last_modified)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = render()
+        product_cache.store(key, response)
+        response['X-Cache'] = 'MISS'
+        return response
+
     def perform_create(self, serializer):
         try:
             instance = serializer.save(owner=self.request.user)
-            logger.info("Product created: id=%s owner=%s", instance.id, self.request.user)
+            announce_product.delay(instance.pk)
         except Exception as e:
             logger.exception("Failed to create product for user=%s: %s", self.request.user, str(e))
             raise
@@ -40,6 +166,9 @@ class ProductViewSet(viewsets.ModelViewSet):
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        except ValidationError:
+            # field errors keep their shape ({field: [messages]})
+            raise
         except Exception as e:
             logger.exception("Create product error: %s", e)
             # Return validation errors or a 400 with detail
@@ -54,6 +183,8 @@ class ProductViewSet(viewsets.ModelViewSet):
             self.perform_update(serializer)
             logger.info("Product updated: id=%s user=%s", instance.id, request.user)
             return Response(serializer.data)
+        except ValidationError:
+            raise
         except Exception as e:
             logger.exception("Update product error: %s", e)
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -70,8 +201,187 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         # Optionally filter out inactive products for anonymous users, etc.
-        qs = Product.objects.select_related('owner', 'category').all()
+        qs = Product.objects.all()
         # Example filter: non-staff see only active products
         if not (self.request.user.is_staff if self.request.user.is_authenticated else False):
             qs = qs.filter(is_active=True)
-        return qs
+        if self.action == 'list':
+            return qs  # list_queryset() picks the columns
+        if self.action in self.sparse_actions:
+            # only the columns of the requested fields, joined only to the relations they reach
+            return self.get_row_serializer().restrict(qs)
+        return qs.select_related('owner', 'category')
+
+    @action(detail=False, methods=['get'], url_path='search', pagination_class=StandardResultsSetPagination)
+    def search(self, request):
+        """
+        /products/search/?q=<text> - ranked full-text search over name and description.
+        Optional filters: ?category=<id> (includes subcategories), ?min_price=, ?max_price=.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = self.get_queryset()
+        category = request.query_params.get('category')
+        if category is not None:
+            try:
+                qs = qs.filter(category_id__in=CategoryClosure.objects.filter(ancestor_id=int(category)).values('descendant_id'))
+            except ValueError:
+                pass
+        for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+            value = request.query_params.get(param)
+            if value is not None:
+                try:
+                    value = Decimal(value)
+                except InvalidOperation:
+                    value = None
+                # NaN and Infinity parse, but the price field can't compare against them
+                if value is None or not value.is_finite():
+                    return Response({param: ["Enter a number."]}, status=status.HTTP_400_BAD_REQUEST)
+                qs = qs.filter(**{lookup: value})
+
+        qs = get_search_backend(qs.db).search(qs, query)
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAdminUser],
+            renderer_classes=[JSONRenderer, CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        /products/export/ - stream the whole catalog, staff only.
+        ?format=csv (default) or ?format=ndjson (or the matching Accept header).
+        Filters: ?category=<id> (includes subcategories), ?is_active=true|false,
+        ?since=<ISO timestamp or date> for rows updated since the last sync.
+        """
+        params = request.query_params
+        fmt = request.accepted_renderer.format
+        if fmt not in export.FORMATS:
+            fmt = 'csv'
+        category = params.get('category')
+        try:
+            category = int(category) if category is not None else None
+        except ValueError:
+            category = None
+        is_active = params.get('is_active')
+        if is_active is not None:
+            is_active = is_active.lower() in ('1', 'true', 'yes')
+        since = params.get('since')
+        if since is not None:
+            since = export.parse_since(since)
+            if since is None:
+                return Response({'detail': "Invalid 'since'; use an ISO 8601 timestamp or date."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        rows = export.iter_rows(export.export_queryset(category=category, is_active=is_active, since=since))
+        response = StreamingHttpResponse(
+            export.iter_export(fmt, rows),
+            content_type=CSVRenderer.media_type if fmt == 'csv' else NDJSONRenderer.media_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{fmt}"'
+        logger.info("Product export started: format=%s user=%s", fmt, request.user)
+        return response
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        /products/bulk/ - create or update many products in one request.
+        Body: a JSON array, or NDJSON (Content-Type: application/x-ndjson), read row by row.
+        Rows with an "id" update that product (owner or staff only), the others are
+        created for the caller. Rows are written in chunks of bulk_chunk_size with one
+        transaction per chunk; a bad row is reported in "errors" without failing the rest.
+        """
+        rows = request.data
+        if isinstance(rows, dict) or not hasattr(rows, '__iter__') or isinstance(rows, (str, bytes)):
+            return Response({'detail': "Expected a list of products."}, status=status.HTTP_400_BAD_REQUEST)
+
+        items, errors = [], {}
+        rows = enumerate(rows)
+        while chunk := list(islice(rows, self.bulk_chunk_size)):
+            self.write_bulk_chunk(chunk, items, errors)
+
+        created = sum(1 for item in items if item['status'] == 'created')
+        logger.info("Bulk product write by user=%s: created=%s updated=%s failed=%s",
+                    request.user, created, len(items) - created, len(errors))
+        return Response({
+            'created': created,
+            'updated': len(items) - created,
+            'failed': len(errors),
+            'items': sorted(items, key=lambda item: item['row']),
+            'errors': [{'row': row, 'errors': detail} for row, detail in sorted(errors.items())],
+        })
+
+    def write_bulk_chunk(self, chunk, items, errors):
+        """Validate and write one chunk of (row number, row) pairs, recording results in items/errors."""
+        user = self.request.user
+        rows, positions = [], []
+        for index, row in chunk:
+            if isinstance(row, ParseError):
+                errors[index] = {'non_field_errors': [str(row.detail)]}
+            elif not isinstance(row, dict):
+                errors[index] = {'non_field_errors': ["Expected an object."]}
+            else:
+                rows.append(row)
+                positions.append(index)
+
+        # everything the serializer needs to look up, in two queries for the whole chunk
+        products = Product.objects.in_bulk(self.int_values(rows, 'id'))
+        categories = Category.objects.in_bulk(self.int_values(rows, 'category'))
+        permitted = {pk: p for pk, p in products.items() if user.is_staff or p.owner_id == user.pk}
+        seen = set()
+        for position, row in enumerate(rows):
+            pk = self.int_values([row], 'id')
+            if pk and pk[0] in products and pk[0] not in permitted:
+                errors[positions[position]] = {'id': ["You do not have permission to update this product."]}
+            elif pk and pk[0] in seen:
+                errors[positions[position]] = {'id': ["Product appears more than once in this chunk."]}
+            seen.update(pk)
+        keep = [position for position, index in enumerate(positions) if index not in errors]
+        rows, positions = [rows[p] for p in keep], [positions[p] for p in keep]
+
+        context = self.get_serializer_context()
+        context.update(products=permitted, categories=categories)
+        serializer = self.get_serializer_class()(data=rows, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        for position, detail in serializer.row_errors.items():
+            errors[positions[position]] = detail
+
+        creates, updates, fields = [], [], {'updated_at'}
+        now = timezone.now()
+        for (position, instance), attrs in zip(serializer.row_instances, serializer.validated_data):
+            if instance is None:
+                creates.append((positions[position], Product(owner=user, **attrs)))
+            else:
+                for field, value in attrs.items():
+                    setattr(instance, field, value)
+                instance.updated_at = now
+                fields.update(attrs)
+                updates.append((positions[position], instance))
+
+        try:
+            with transaction.atomic():
+                new_products = [product for _, product in creates]
+                Product.allocate_slugs(new_products)
+                Product.objects.bulk_create(new_products)
+                # queued with the rows, like perform_create
+                announce_product.delay_many([(product.pk,) for product in new_products])
+                if updates:
+                    Product.objects.bulk_update([product for _, product in updates], sorted(fields))
+        except DatabaseError as e:
+            logger.exception("Bulk product chunk failed: %s", e)
+            for index, _ in creates + updates:
+                errors[index] = {'non_field_errors': [f"Could not save this chunk: {e}"]}
+            return
+        items.extend({'row': index, 'id': product.pk, 'status': 'created'} for index, product in creates)
+        items.extend({'row': index, 'id': product.pk, 'status': 'updated'} for index, product in updates)
+
+    @staticmethod
+    def int_values(rows, key):
+        values = []
+        for row in rows:
+            try:
+                values.append(int(row[key]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        return values